@@ -3,6 +3,7 @@
 NOX configuration file for:
 * lint
 * test
+* benchmark
 * build
 * doc
 * deploy
@@ -37,6 +38,13 @@ def test(session: nox.Session) -> None:
                 '--min-total-coverage=80')
 
 
+@nox.session(python=False)
+def benchmark(session: nox.Session) -> None:
+    """Run the benchmark suite and compare it with the latest stored results."""
+    print('[BENCHMARK] ----------- Run the benchmark suite -----------')
+    session.run('python', '-m', 'scripts.benchmark_suite', *session.posargs)
+
+
 @nox.session(python=False)
 def install(session: nox.Session) -> None:
     """Install submodules into site-packages."""
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Generate official test reports as docx and PDF documents
+
+The public classes are imported on first access, so importing the package does not load python-docx or parse the
+configuration.
+"""
+import importlib
+
+_LAZY_EXPORTS = {
+    "ReportGenerator": "report_generator.common.generate_interface",
+    "GenerationCancelled": "report_generator.common.generate_interface",
+    "Section": "report_generator.common.section_interface",
+    "CaseSection": "report_generator.common.section_interface",
+    "configure": "report_generator.compontent.settings",
+    "configure_logger": "report_generator.common.logger",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
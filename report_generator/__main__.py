@@ -2,39 +2,76 @@
 """Main script of current project"""
 from report_generator.common.section_interface import CaseSection
 from report_generator.common.generate_interface import ReportGenerator
+from report_generator.common.profiler import PROFILER
 from report_generator.module.args_parse import args_parse
+from report_generator.module.case_loader import load_case_list
+from report_generator.module.pdf_backend import PdfConversionQueue, create_pdf_backend
+from report_generator.compontent.settings import configure, get_config
+
+
+EXAMPLE_CASE_LIST = [
+    {
+        "title": "CCRs_AEB_test_case_1",
+        "result": "PASSED",
+        "settings": {"gvt": "30km/h", "ol": "-50%", "vut": "20km/h"},
+        "condition_result": {
+            "file1": [(['external_relative_longitudinal_distance > 0', 'all'], True)],
+            "file2": [(['external_relative_longitudinal_distance > 0', 'all'], True)]
+        },
+        "image_path": "tests/data_and_request/image_index.json"
+    },
+    {
+        "title": "CCRs_AEB_test_case_2",
+        "result": "FAILED",
+        "settings": {"gvt": "30km/h", "ol": "-50%", "vut": "30km/h"},
+        "condition_result": {
+            "file1": [(['external_relative_longitudinal_distance > 0', 'all'], False)],
+            "file2": [(['external_relative_longitudinal_distance > 0', 'all'], False)]
+        },
+        "image_path": "tests/data_and_request/image_index.json"
+    }
+]
 
 
 def main():
     args = args_parse()
-    doc_gen = ReportGenerator()
-    item_list = [
-        {
-            "title": "CCRs_AEB_test_case_1",
-            "result": "PASSED",
-            "settings": {"gvt": "30km/h", "ol": "-50%", "vut": "20km/h"},
-            "condition_result": {
-                "file1": [(['external_relative_longitudinal_distance > 0', 'all'], True)],
-                "file2": [(['external_relative_longitudinal_distance > 0', 'all'], True)]
-            },
-            "image_path": "tests/data_and_request/image_index.json"
-        },
-        {
-            "title": "CCRs_AEB_test_case_2",
-            "result": "FAILED",
-            "settings": {"gvt": "30km/h", "ol": "-50%", "vut": "30km/h"},
-            "condition_result": {
-                "file1": [(['external_relative_longitudinal_distance > 0', 'all'], False)],
-                "file2": [(['external_relative_longitudinal_distance > 0', 'all'], False)]
-            },
-            "image_path": "tests/data_and_request/image_index.json"
-        }
-    ]
+    configure(args.config)
+    if args.serve:
+        from report_generator.module.render_server import serve
+
+        serve(workers=args.workers, max_pending=args.max_pending, port=args.port, socket_path=args.socket,
+              config_path=args.config, pdf_backend=args.pdf_backend)
+        return
+    if args.profile or args.trace:
+        PROFILER.start()
+    item_list = load_case_list(args.cases) if args.cases else EXAMPLE_CASE_LIST
+    pdf_queue = None
+    if args.pdf_backend:
+        pdf_queue = PdfConversionQueue(create_pdf_backend(args.pdf_backend, workers=get_config().settings.pdf_workers))
+    doc_gen = ReportGenerator(pdf_queue=pdf_queue, streaming=args.stream, render_workers=args.workers,
+                              incremental_pdf=args.incremental_pdf or None)
+    if any("measurements" in item for item in item_list):
+        from report_generator.module.evaluation_scheduler import EvaluationScheduler
+
+        # the sections of evaluated cases are created while the measurement files of later cases are evaluated, the
+        # rendering starts after the last case
+        settings = get_config().settings
+        scheduler = EvaluationScheduler(workers=settings.evaluation_workers, aliases=settings.signal_aliases,
+                                        time_signal=settings.time_signal, cache_dir=settings.measurement_cache_dir)
+        item_list = scheduler.evaluate_cases(item_list)
     for item in item_list:
         case_section = CaseSection(item)
         case_section.create_section()
         doc_gen.add_section(case_section)
-        doc_gen.generate(args.output)
+    # all sections are rendered once, the document is saved and converted once at the end
+    doc_gen.generate(args.output, append=args.append)
+    doc_gen.pdf_queue.shutdown()
+    if PROFILER.enabled:
+        PROFILER.stop()
+        if args.profile:
+            PROFILER.export_json(args.profile)
+        if args.trace:
+            PROFILER.export_chrome_trace(args.trace)
 
 
 if __name__ == "__main__":
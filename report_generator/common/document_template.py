@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""A module for building the base document of the reports once and cloning it for every new report
+
+Opening the default template of python-docx parses all its xml parts, which takes most of the setup time of a small
+report. The base document with the global formatting, the header and the footer is built once per settings
+fingerprint and every new report gets a deep copy of its parsed package, which skips unzipping and parsing.
+"""
+import threading
+from copy import deepcopy
+from typing import Callable
+
+from docx.document import Document
+
+from report_generator.compontent.settings import on_config_reload
+
+
+class DocumentTemplate:
+    """
+    A configured base document, which is never changed itself
+    """
+
+    def __init__(self, document: Document):
+        """
+        Initialize the template
+
+        Parameters
+        ----------
+        document : docx.document.Document
+            The base document, owned by the template afterward
+        """
+        self._document = document
+        self._lock = threading.Lock()
+
+    def clone(self) -> Document:
+        """
+        Get a new document equal to the base document
+
+        Returns
+        -------
+        docx.document.Document
+            The independent copy of the base document with its own package
+        """
+        # the reports generated in concurrent threads copy the same xml trees
+        with self._lock:
+            return deepcopy(self._document)
+
+
+_templates: dict[str, DocumentTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def get_document_template(fingerprint: str, build: Callable[[], Document]) -> DocumentTemplate:
+    """
+    Get the base document template of the settings fingerprint, built once per fingerprint
+
+    Parameters
+    ----------
+    fingerprint : str
+        The fingerprint of all settings the base document depends on
+    build : Callable[[], Document]
+        The function building the base document
+
+    Returns
+    -------
+    DocumentTemplate
+        The shared template
+    """
+    template = _templates.get(fingerprint)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(fingerprint)
+            if template is None:
+                template = _templates[fingerprint] = DocumentTemplate(build())
+    return template
+
+
+def clear_document_templates() -> None:
+    """
+    Remove the cached templates, e.g. after the configuration changed
+    """
+    with _templates_lock:
+        _templates.clear()
+
+
+on_config_reload(clear_document_templates)
@@ -1,51 +1,127 @@
 # -*- coding: utf-8 -*-
-import json
 from abc import ABC
+from copy import deepcopy
+from collections.abc import Iterable, Iterator, Mapping
 from pathlib import Path
 from typing import Tuple
 
 from document import Document
-from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_PARAGRAPH_ALIGNMENT, WD_LINE_SPACING
-from docx.shared import Pt, Inches, Emu
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_PARAGRAPH_ALIGNMENT
+from docx.shared import Pt, Inches, Emu, Length, RGBColor
 from docx.enum.table import WD_CELL_VERTICAL_ALIGNMENT
+from docx.oxml import OxmlElement
+from docx.text.run import Run
 
-from report_generator.compontent.global_setting_interface import add_page_number, string_to_rgb_color
-from report_generator.compontent.settings import TEXT_FORMAT
+from report_generator.common.render_context import RenderContext
+from report_generator.common.table_writer import BulkTableWriter
+from report_generator.compontent.global_setting_interface import add_page_number
+from report_generator.compontent.settings import TextFormatConfig, get_config, on_config_reload
+from report_generator.module.image_index import load_image_index
+from report_generator.module.image_registry import ImageRegistry
 
 
 class Element(ABC):
     """
     Base class for all elements in the document
     """
+    __slots__ = ()
 
-    def render(self, document: Document) -> None:
+    def render(self, document: Document, context: RenderContext | None = None) -> None:
         pass
 
 
 class TextFormat(Element):
     """
     Text format, including font name, font size, bold, italic, alignment
+
+    The formats are immutable after initialization, use `shared` to get the instance built once for all elements.
     """
+    __slots__ = ("font_name", "font_size", "bold", "italic", "color", "line_spacing", "alignment", "_rPr")
 
-    def __init__(self, FORMAT=TEXT_FORMAT['PARAGRAPH']):
+    def __init__(self, FORMAT: TextFormatConfig | Mapping | None = None):
         """
         Initialize the parameters of text format
 
         Parameters
         ----------
-        FORMAT : dict
+        FORMAT : TextFormatConfig | Mapping, optional
             The format of the text, including font name, font size, bold, italic, alignment, color, line
-            spacing
+            spacing, as validated text format or as dictionary of the configuration file, by default the paragraph
+            format of the configuration
+        """
+        if FORMAT is None:
+            FORMAT = get_config().text_formats['PARAGRAPH']
+        elif isinstance(FORMAT, Mapping):
+            FORMAT = TextFormatConfig.from_dict(type(self).__name__, FORMAT)
+        self.font_name = FORMAT.font_name
+        self.font_size = FORMAT.font_size
+        self.bold = FORMAT.bold
+        self.italic = FORMAT.italic
+        self.color = RGBColor(*FORMAT.color)
+        self.line_spacing = FORMAT.line_spacing if FORMAT.line_spacing else 1.5
+        self.alignment = WD_ALIGN_PARAGRAPH.CENTER if FORMAT.alignment == 'center' else WD_ALIGN_PARAGRAPH.LEFT
+        self._rPr = None
+
+    @classmethod
+    def shared(cls, *args, **kwargs) -> 'TextFormat':
+        """
+        Get the format shared by all elements, built once per format class and arguments
+
+        Returns
+        -------
+        TextFormat
+            The shared text format
+        """
+        key = (cls, args, tuple(sorted(kwargs.items())))
+        text_format = _shared_text_formats.get(key)
+        if text_format is None:
+            text_format = _shared_text_formats[key] = cls(*args, **kwargs)
+        return text_format
+
+    def _set_run_properties(self, run) -> None:
+        """
+        Set the format to the run property by property
         """
-        self.font_name = FORMAT.get('font_name')
-        self.font_size = FORMAT.get('font_size')
-        self.bold = False if FORMAT.get('bold') == 'False' else True
-        self.italic = False if FORMAT.get('italic') == 'False' else True
-        self.color = string_to_rgb_color(FORMAT.get('color'))
-        self.line_spacing = FORMAT.get('line_spacing') if FORMAT.get('line_spacing') else 1.5
-        self.alignment = WD_ALIGN_PARAGRAPH.CENTER if FORMAT.get('alignment') == 'center' else WD_ALIGN_PARAGRAPH.LEFT
+        run.font.name = self.font_name
+        run.font.size = Pt(self.font_size)
+        run.font.color.rgb = self.color
+        run.bold = self.bold
+        run.italic = self.italic
+
+    @property
+    def rPr(self):
+        """
+        The run properties `w:rPr` of the format, built once on a scratch run
+
+        Returns
+        -------
+        CT_RPr
+            The run properties element, which must not be modified
+        """
+        if self._rPr is None:
+            run = Run(OxmlElement('w:r'), None)
+            self._set_run_properties(run)
+            self._rPr = run._r.rPr
+        return self._rPr
+
+    def __getstate__(self) -> dict:
+        """
+        Pickle the format without its run properties, e.g. to render a section in a worker process, because the
+        xml element is not picklable and is built again on the first use
+        """
+        state = {name: getattr(self, name) for name in TextFormat.__slots__ if name != "_rPr"}
+        # RGBColor cannot be restored by the default tuple pickling
+        state["color"] = tuple(self.color)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the format from its values
+        """
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.color = RGBColor(*state["color"])
+        self._rPr = None
 
     def apply_format(self, run) -> None:
         """
@@ -55,17 +131,33 @@ class TextFormat(Element):
         ----------
         run : docx.text.run.Run
         """
-        run.font.name = self.font_name
-        run.font.size = Pt(self.font_size)
-        run.font.color.rgb = self.color
-        run.bold = self.bold
-        run.italic = self.italic
+        r = run._r
+        if r.rPr is not None and len(r.rPr):
+            # keep the properties already set on the run
+            self._set_run_properties(run)
+            return
+        r._remove_rPr()
+        r._insert_rPr(deepcopy(self.rPr))
+
+
+_shared_text_formats: dict[tuple, TextFormat] = {}
+
+
+def clear_shared_text_formats() -> None:
+    """
+    Remove the shared text formats, e.g. after the text formats of the configuration changed
+    """
+    _shared_text_formats.clear()
+
+
+on_config_reload(clear_shared_text_formats)
 
 
 class TitleTextFormat(TextFormat):
     """
     Title text format
     """
+    __slots__ = ()
 
     def __init__(self, level: int):
         """
@@ -76,78 +168,81 @@ class TitleTextFormat(TextFormat):
         level : int
             The level of the title
         """
-        if level == 1:
-            super().__init__(FORMAT=TEXT_FORMAT['TITLE']["L1"])
-        elif level == 2:
-            super().__init__(FORMAT=TEXT_FORMAT['TITLE']["L2"])
-        elif level == 3:
-            super().__init__(FORMAT=TEXT_FORMAT['TITLE']["L3"])
+        if level in (1, 2, 3):
+            super().__init__(FORMAT=get_config().text_formats[f'TITLE.L{level}'])
 
 
 class NormalTextFormat(TextFormat):
     """
     Normal text format
     """
+    __slots__ = ()
 
     def __init__(self):
         """
         Initialize the normal text format
         """
-        super().__init__(FORMAT=TEXT_FORMAT['PARAGRAPH'])
+        super().__init__(FORMAT=get_config().text_formats['PARAGRAPH'])
 
 
 class PositiveStatusTextFormat(TextFormat):
     """
     Status text format for True status
     """
+    __slots__ = ()
 
     def __init__(self):
-        super().__init__(FORMAT=TEXT_FORMAT['POSITIVE_STATUS'])
+        super().__init__(FORMAT=get_config().text_formats['POSITIVE_STATUS'])
 
 
 class NegativeStatusTextFormat(TextFormat):
     """
     Status text format for False status
     """
+    __slots__ = ()
 
     def __init__(self):
-        super().__init__(FORMAT=TEXT_FORMAT['NEGATIVE_STATUS'])
+        super().__init__(FORMAT=get_config().text_formats['NEGATIVE_STATUS'])
 
 
 class CaptionTextFormat(TextFormat):
     """
     Caption text format
     """
+    __slots__ = ()
 
     def __init__(self):
-        super().__init__(FORMAT=TEXT_FORMAT['CAPTION'])
+        super().__init__(FORMAT=get_config().text_formats['CAPTION'])
 
 
 class TableTextFormat(TextFormat):
     """
     Table text format
     """
+    __slots__ = ()
 
     def __init__(self):
-        super().__init__(FORMAT=TEXT_FORMAT['TABLE'])
+        super().__init__(FORMAT=get_config().text_formats['TABLE'])
 
 
 class HeaderTextFormat(TextFormat):
     """
     Header text format
     """
+    __slots__ = ()
 
     def __init__(self):
-        super().__init__(FORMAT=TEXT_FORMAT['HEADER'])
+        super().__init__(FORMAT=get_config().text_formats['HEADER'])
 
 
 class FooterTextFormat(TextFormat):
     """
     Footer text format
     """
+    __slots__ = ()
 
     def __init__(self):
-        super().__init__(FORMAT=TEXT_FORMAT['FOOTER'])
+        super().__init__(FORMAT=get_config().text_formats['FOOTER'])
 
 
 class Title(Element):
@@ -168,14 +263,9 @@ class Title(Element):
         """
         self.text = text
         self.level = level
-        if self.level == 1:
-            self.text_format = TitleTextFormat(level=1)
-        elif self.level == 2:
-            self.text_format = TitleTextFormat(level=2)
-        elif self.level == 3:
-            self.text_format = TitleTextFormat(level=3)
+        self.text_format = TitleTextFormat.shared(level=level) if level in (1, 2, 3) else None
 
-    def render(self, document: Document) -> None:
+    def render(self, document: Document, context: RenderContext | None = None) -> None:
         """
         Render the title element
 
@@ -183,11 +273,13 @@ class Title(Element):
         ----------
 
         document : docx.document.Document
+        context : RenderContext, optional
+            The render context of the document, created if not given
         """
-        document.add_heading(self.text, level=self.level)
+        context = context or RenderContext(document)
+        context.add_heading(self.text, level=self.level)
         if self.text_format:
-            title = document.paragraphs[-1]
-            self.text_format.apply_format(title.runs[0])
+            self.text_format.apply_format(context.run)
 
 
 class Paragraph(Element):
@@ -210,24 +302,26 @@ class Paragraph(Element):
         """
         self.title = title
         self.text = text
-        self.text_format = text_format if text_format else NormalTextFormat()
+        self.text_format = text_format if text_format else NormalTextFormat.shared()
 
-    def render(self, document: Document) -> None:
+    def render(self, document: Document, context: RenderContext | None = None) -> None:
         """
         Render the paragraph element
 
         Parameters
         ----------
         document : docx.document.Document
+        context : RenderContext, optional
+            The render context of the document, created if not given
         """
+        context = context or RenderContext(document)
         if self.title:
-            document.add_heading(self.title, level=2)
+            context.add_heading(self.title, level=2)
         else:
-            document.add_paragraph()
-        p = document.add_paragraph(self.text)
+            context.add_paragraph()
+        p = context.add_paragraph(self.text)
         if self.text_format:
-            run = p.runs[0]
-            self.text_format.apply_format(run)
+            self.text_format.apply_format(context.run)
             p.alignment = self.text_format.alignment
 
 
@@ -242,34 +336,57 @@ class Image(Element):
         self.width = width  # width of the image, in inches
         self.height = height  # height of the image, in inches
 
-    def render(self, document: Document) -> None:
+    def image_files(self) -> dict[str, list[str]]:
+        """
+        Get the image paths of each file of the case from the image index
+
+        Returns
+        -------
+        dict[str, list[str]]
+            The image paths of each file
+        """
+        # the image index is parsed once and shared by all case sections
+        image_index = load_image_index(self.path, cache_dir=get_config().settings.image_index_cache_dir)
+        return image_index.get(self.case_name)
+
+    def display_width(self, context: RenderContext) -> Length:
+        """
+        Get the width the images are displayed with
+
+        Parameters
+        ----------
+        context : RenderContext
+            The render context of the document
+
+        Returns
+        -------
+        Length
+            The given width, or the width between the page margins
+        """
+        return Inches(self.width) if self.width else context.content_width
+
+    def render(self, document: Document, context: RenderContext | None = None) -> None:
         """
         Render the image element
 
         Parameters
         ----------
         document : docx.document.Document
+        context : RenderContext, optional
+            The render context of the document, created if not given
         """
-        section = document.sections[0]
-        page_width = section.page_width - section.left_margin - section.right_margin
-        img_width = Inches(self.width) if self.width else page_width
+        context = context or RenderContext(document)
+        img_width = self.display_width(context)
         img_height = Inches(self.height) if self.height else None
 
-        with open(self.path, 'r') as f:
-            image_data = json.load(f)
-
-        for case_data in image_data:
-            if self.case_name in case_data:
-                files = case_data[self.case_name]
-                for file_name, image_paths in files.items():
-                    title_text = f"{self.case_name} - {file_name}"
-                    title = document.add_heading(title_text, level=2)
-                    title.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        for file_name, image_paths in self.image_files().items():
+            title_text = f"{self.case_name} - {file_name}"
+            title = context.add_heading(title_text, level=2)
+            title.alignment = WD_ALIGN_PARAGRAPH.LEFT
 
-                    for image_path in image_paths:
-                        document.add_picture(image_path, width=img_width, height=img_height)
-                        last_paragraph = document.paragraphs[-1]
-                        last_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            for image_path in image_paths:
+                picture_paragraph = context.add_picture(image_path, width=img_width, height=img_height)
+                picture_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
 
 class Table(Element):
@@ -277,73 +394,28 @@ class Table(Element):
     Table element, including data and title
     """
 
-    def __init__(self, data: list, title=None):
+    def __init__(self, data: Iterable[list], title=None):
         """
         Initialize the table element
 
         Parameters
         ----------
-        data : list
-            The path to the data file
+        data : Iterable[list]
+            The rows of the table, a generator of rows is consumed by the first rendering
         """
         self.title = title
         self.data = data
-        self.line_spacing = TableTextFormat().line_spacing if TableTextFormat().line_spacing else 1.0
-        self.text_format = TableTextFormat()
+        self.text_format = TableTextFormat.shared()
+        self.line_spacing = self.text_format.line_spacing if self.text_format.line_spacing else 1.0
 
-    def render(self, document: Document) -> None:
+    def render(self, document: Document, context: RenderContext | None = None) -> None:
+        context = context or RenderContext(document)
         if self.title:
-            document.add_heading(self.title, level=2)
-
-        rows = len(self.data)
-        cols = len(self.data[0]) if rows > 0 else 0
-        table = document.add_table(rows=rows, cols=cols)
-
-        # increase the weight of the first columns
-        for cell in table.columns[0].cells:
-            cell.width = Inches(8.0)
-
-        for i, row_data in enumerate(self.data):
-            row = table.rows[i]
-            for j, cell_data in enumerate(row_data):
-                cell = row.cells[j]
-                self._set_cell_border(cell)
-                cell.text = ""
-                paragraph = cell.paragraphs[0]
-                paragraph_format = paragraph.paragraph_format
-                paragraph_format.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
-                paragraph_format.line_spacing = self.line_spacing
-                run = paragraph.add_run(str(cell_data))
-                self.text_format.apply_format(run)
-                # the first row aligns right, the other rows align left
-                if j == 0:
-                    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                else:
-                    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
+            context.add_heading(self.title, level=2)
 
-    @staticmethod
-    def _set_cell_border(cell):
-        """
-        Set the border of the cell
-
-        Parameters
-        ----------
-        cell : docx.table._Cell
-        """
-        tc = cell._element
-        tcPr = tc.get_or_add_tcPr()
-
-        for line in ['top', 'start', 'bottom', 'end']:
-            tcBorders = tcPr.find(qn('w:tcBorders'))
-            if tcBorders is None:
-                tcBorders = OxmlElement('w:tcBorders')
-                tcPr.append(tcBorders)
-            line_border = OxmlElement(f'w:{line}')
-            line_border.set(qn('w:val'), 'single')
-            line_border.set(qn('w:sz'), '4')
-            line_border.set(qn('w:space'), '0')
-            line_border.set(qn('w:color'), '000000')
-            tcBorders.append(line_border)
+        # the whole table xml is built in one pass and inserted as a block
+        writer = BulkTableWriter(self.text_format, self.line_spacing, first_column_width=Inches(8.0))
+        context.insert_table(writer.build(self.data, context.content_width))
 
 
 class Tables(Element):
@@ -354,25 +426,43 @@ class Tables(Element):
         Parameters
         ----------
         condition_result : dict
-            The condition results
+            The condition results, a dictionary or the `CaseConditionResults` of a condition result store
         """
         self.condition_result = condition_result
 
-    def render(self, document: Document) -> None:
+    def render(self, document: Document, context: RenderContext | None = None) -> None:
         """
         Render the tables element
 
         Parameters
         ----------
         document : docx.document.Document
+        context : RenderContext, optional
+            The render context of the document, created if not given
         """
-        for file_key, condition_list in self.condition_result.items():
-            title = f"{file_key}: {'Passed' if all(result for _, result in condition_list) else 'Failed'}"
-            condition_result_list = self._format_condition_result(condition_list)
+        context = context or RenderContext(document)
+        for file_key, passed, rows in self._files():
+            title = f"{file_key}: {'Passed' if passed else 'Failed'}"
             # Add elements to the document
-            document.add_heading(title, level=2)
-            table = Table(data=condition_result_list)
-            table.render(document)
+            context.add_heading(title, level=2)
+            table = Table(data=rows)
+            table.render(document, context)
+
+    def _files(self) -> Iterator[tuple[str, bool, Iterable[list[str]]]]:
+        """
+        Get the verdict and the table rows of every file
+
+        Returns
+        -------
+        Iterator[tuple[str, bool, Iterable[list[str]]]]
+            The file key, whether all its conditions hold and the table rows with a header row
+        """
+        # the condition result store keeps the verdicts and produces the rows lazily, checked by attribute so the
+        # dictionaries are rendered without importing numpy
+        if hasattr(self.condition_result, "files"):
+            return self.condition_result.files()
+        return ((file_key, all(result for _, result in condition_list), self._format_condition_result(condition_list))
+                for file_key, condition_list in self.condition_result.items())
 
     @staticmethod
     def _format_condition_result(condition_result: list[Tuple[list[str], bool]]) -> list[list[str]]:
@@ -415,7 +505,7 @@ class GlobalSetupBuilder(SetupBuilder):
     """
 
     def __init__(self, doc: Document, left_header_text: str, footer_text: str, middle_footer_text: str,
-                 image_path: Path):
+                 image_path: Path, image_registry: ImageRegistry | None = None):
         """
         Initialize the global setup builder
 
@@ -432,14 +522,17 @@ class GlobalSetupBuilder(SetupBuilder):
             The text of the middle footer
         image_path : Path
             The path to the image
+        image_registry : ImageRegistry, optional
+            The registry of the image parts of the document, reusing the logo image part for every section
         """
         self.document = doc
         self.image = image_path
+        self.image_registry = image_registry
         self.left_header_text = left_header_text
         self.footer_text = footer_text
         self.middle_footer_text = middle_footer_text
-        self.header_text_format = HeaderTextFormat()
-        self.footer_text_format = FooterTextFormat()
+        self.header_text_format = HeaderTextFormat.shared()
+        self.footer_text_format = FooterTextFormat.shared()
 
     def header_render(self, document: Document) -> 'GlobalSetupBuilder':
         """
@@ -484,7 +577,10 @@ class GlobalSetupBuilder(SetupBuilder):
                 right_cell._element.clear_content()
                 header_paragraph = right_cell.add_paragraph()
                 run = header_paragraph.add_run()
-                run.add_picture(self.image, width=Inches(1.0))
+                if self.image_registry:
+                    self.image_registry.add_picture(run, self.image, width=Inches(1.0))
+                else:
+                    run.add_picture(self.image, width=Inches(1.0))
                 header_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
                 right_cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.BOTTOM
 
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""A module for rendering sections into independent body fragments and merging them into a report"""
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Length
+from lxml import etree
+
+from report_generator.common.render_context import RenderContext
+from report_generator.compontent.global_setting_interface import set_global_formatting
+from report_generator.compontent.settings import configure_worker, worker_configuration
+from report_generator.module.image_registry import ImageRegistry, get_image_bytes_cache
+
+
+_R_NAMESPACE = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_DOC_PR = qn("wp:docPr")
+
+
+@dataclass
+class FragmentRelationship:
+    """A relationship of the body of a fragment"""
+    reltype: str
+    target_ref: str
+    is_external: bool = False
+    blob: bytes | None = None
+
+
+@dataclass
+class RenderedFragment:
+    """The body content of sections rendered into a separate document"""
+    body_xml: bytes
+    relationships: dict[str, FragmentRelationship] = field(default_factory=dict)
+    # the number of body blocks of every section, empty if unknown
+    block_counts: list[int] = field(default_factory=list)
+
+
+def create_render_executor(max_workers: int, mp_context=None) -> ProcessPoolExecutor:
+    """
+    Create the process pool rendering fragments, every worker is configured like the current process
+
+    Parameters
+    ----------
+    max_workers : int
+        The number of worker processes
+    mp_context : multiprocessing.context.BaseContext, optional
+        The context starting the workers, by default the default context of the platform
+
+    Returns
+    -------
+    ProcessPoolExecutor
+        The process pool
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=configure_worker,
+                               initargs=worker_configuration())
+
+
+def render_fragment(sections: Iterable, image_paths: dict[tuple[str, Length], str] | None = None) -> RenderedFragment:
+    """
+    Render the sections into a new document with the global formatting of a report and extract its body
+
+    The function is executed in worker processes, so the sections are pickled with their elements.
+
+    Parameters
+    ----------
+    sections : Iterable
+        The sections to render
+    image_paths : dict[tuple[str, Length], str] | None, optional
+        The preprocessed images to embed, by original path and display width
+
+    Returns
+    -------
+    RenderedFragment
+        The rendered body content and the relationships it refers to
+    """
+    doc = Document()
+    set_global_formatting(doc)
+    context = RenderContext(doc, ImageRegistry(doc.part.package, get_image_bytes_cache()))
+    context.image_paths.update(image_paths or {})
+    body = doc.element.body
+    block_counts = []
+    for section in sections:
+        start = len(body)
+        section.render(doc, context)
+        block_counts.append(len(body) - start)
+
+    body.remove(body.sectPr)
+    fragment = extract_fragment(doc.part, body)
+    fragment.block_counts = block_counts
+    return fragment
+
+
+def extract_fragment(story_part, blocks: Iterable) -> RenderedFragment:
+    """
+    Extract rendered block elements of a document into a fragment, the blocks are not changed
+
+    Parameters
+    ----------
+    story_part : docx.parts.document.DocumentPart
+        The part the relationships of the blocks belong to
+    blocks : Iterable
+        The block elements, or the body element containing them
+
+    Returns
+    -------
+    RenderedFragment
+        The serialized blocks and the relationships they refer to
+    """
+    if isinstance(blocks, etree._Element) and blocks.tag == qn("w:body"):
+        body = blocks
+    else:
+        body = OxmlElement("w:body")
+        body.extend(deepcopy(block) for block in blocks)
+
+    relationships = {}
+    for element in body.iter():
+        for name, value in element.attrib.items():
+            if not name.startswith(_R_NAMESPACE) or value in relationships:
+                continue
+            rel = story_part.rels[value]
+            if rel.is_external:
+                relationships[value] = FragmentRelationship(rel.reltype, rel.target_ref, is_external=True)
+            elif rel.reltype == RT.IMAGE:
+                relationships[value] = FragmentRelationship(rel.reltype, rel.target_part.filename,
+                                                            blob=rel.target_part.blob)
+            else:
+                raise ValueError(f"Relationship type '{rel.reltype}' is not supported in a rendered fragment.")
+    return RenderedFragment(body_xml=etree.tostring(body, encoding="UTF-8"), relationships=relationships)
+
+
+def merge_fragment(fragment: RenderedFragment, context: RenderContext) -> None:
+    """
+    Merge a rendered fragment to the end of the document of the render context
+
+    The relationships are remapped to the relationships of the document, sharing the image parts already in the
+    document, and the drawing shapes get the next ids of the document, so the merged content equals the content
+    rendered directly into the document.
+
+    Parameters
+    ----------
+    fragment : RenderedFragment
+        The rendered fragment
+    context : RenderContext
+        The render context of the document to merge the fragment into
+    """
+    story_part = context.document.part
+    rIds: dict[str, str] = {}
+    for rId, rel in fragment.relationships.items():
+        if rel.is_external:
+            rIds[rId] = story_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        else:
+            rIds[rId] = context.image_registry.get_or_add_image_blob(story_part, rel.blob, rel.target_ref)
+
+    for block in list(parse_xml(fragment.body_xml)):
+        for element in block.iter():
+            if element.tag == _DOC_PR:
+                shape_id = context.next_shape_id()
+                if element.get("name") == f"Picture {element.get('id')}":
+                    element.set("name", f"Picture {shape_id}")
+                element.set("id", str(shape_id))
+                continue
+            for name, value in element.attrib.items():
+                if name.startswith(_R_NAMESPACE):
+                    element.set(name, rIds[value])
+        context.insert_block(block)
@@ -1,24 +1,124 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import hashlib
+import json
+import math
+import os
+import threading
+import weakref
+from concurrent.futures import Executor, Future
+from functools import partial
+from itertools import repeat
+from pathlib import Path
+from typing import Callable
+
 import document
 from docx import Document
-from docx2pdf import convert
 
-from report_generator.common.element_interface import GlobalSetupBuilder
+from report_generator.common.document_template import get_document_template
+from report_generator.common.element_interface import GlobalSetupBuilder, Image
+from report_generator.common.fragment import (RenderedFragment, create_render_executor, extract_fragment, merge_fragment,
+                                              render_fragment)
+from report_generator.common.header_footer_template import get_header_footer_template
+from report_generator.common.render_context import RenderContext
 from report_generator.common.section_interface import Section
 from report_generator.compontent.global_setting_interface import set_global_formatting
-from report_generator.compontent.settings import SETTINGS
+from report_generator.compontent.settings import get_config
 from report_generator.common.logger import logger
+from report_generator.common.profiler import PROFILER
+from report_generator.module.fragment_cache import FragmentCache
+from report_generator.module.image_pipeline import ImagePipeline
+from report_generator.module.image_registry import ImageRegistry, get_image_bytes_cache
+from report_generator.module.incremental_pdf import (IncrementalPdfConverter, PageNumberStamp, PdfFragment,
+                                                     PdfFragmentCache, prepare_fragment_document)
+from report_generator.module.pdf_backend import PdfConversionJob, PdfConversionQueue, create_pdf_backend
+from report_generator.module.streaming_writer import StreamingDocxWriter
+
+_semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+
+
+class GenerationCancelled(RuntimeError):
+    """The generation of a report was cancelled between two sections, the report is not saved"""
+
+
+def report_semaphore() -> asyncio.Semaphore:
+    """
+    Get the semaphore of the running event loop limiting the reports generated concurrently by `agenerate`
+
+    Returns
+    -------
+    asyncio.Semaphore
+        The semaphore with the `max_concurrent_reports` of the settings, created once per event loop, so a later
+        `reload_config` does not change its size
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(max(1, get_config().settings.max_concurrent_reports))
+    return semaphore
 
 
 class ReportGenerator:
     """
     Generate a report with sections
     """
-    def __init__(self):
+    # the multiprocessing context starting the render workers, by default the default context of the platform
+    mp_context = None
+
+    def __init__(self, pdf_queue: PdfConversionQueue | None = None, image_pipeline: ImagePipeline | None = None,
+                 streaming: bool = False, render_workers: int | None = None,
+                 fragment_cache: FragmentCache | None = None, incremental_pdf: bool | None = None):
         """
         Initialize the report, clear the sections
+
+        Parameters
+        ----------
+        pdf_queue : PdfConversionQueue, optional
+            The queue converting the saved report to PDF, can be shared by many generators. By default, a queue with
+            the PDF backend configured in the settings is created on the first generation.
+        image_pipeline : ImagePipeline, optional
+            The pipeline preprocessing the images before rendering. By default, a pipeline is created from the
+            settings if `image_pipeline` is enabled there, otherwise the original images are embedded.
+        streaming : bool, optional
+            Stream the body of the report into the docx file section by section, so the memory does not grow with
+            the number of sections. A streamed report is rendered completely by every `generate` call and cannot be
+            appended to. By default False.
+        render_workers : int | None, optional
+            The number of processes rendering the sections in parallel, the rendered fragments are merged in order
+            into the report. By default the `render_workers` of the settings, 1 renders all sections sequentially.
+        fragment_cache : FragmentCache, optional
+            The cache of the rendered sections across runs, an unchanged section is merged from the cache instead of
+            rendered. By default, a cache is created from the settings if `fragment_cache_dir` is set there.
+        incremental_pdf : bool | None, optional
+            Convert every `pdf_sections_per_fragment` sections to a separate PDF fragment, cached in the
+            `pdf_fragment_cache_dir` of the settings, and merge the fragments with stamped page numbers instead of
+            converting the whole report. Requires pypdf. By default the `pdf_incremental` of the settings.
         """
         self.sections = []
+        self.pdf_queue = pdf_queue
+        self.streaming = streaming
+        settings = get_config().settings
+        self.render_workers = render_workers or settings.render_workers
+        if image_pipeline is None and settings.image_pipeline:
+            image_pipeline = ImagePipeline(cache_dir=settings.image_cache_dir, target_dpi=settings.image_target_dpi,
+                                           image_format=settings.image_format, quality=settings.image_quality)
+        self.image_pipeline = image_pipeline
+        if fragment_cache is None and settings.fragment_cache_dir:
+            fragment_cache = FragmentCache(settings.fragment_cache_dir, settings.fragment_cache_max_bytes)
+        self.fragment_cache = fragment_cache
+        self.incremental_pdf = settings.pdf_incremental if incremental_pdf is None else incremental_pdf
+        self._pdf_converter = None
+        # the rendered document prefix and the number of sections already rendered into it
+        self._document = None
+        self._image_registry = None
+        self._rendered_sections = 0
+        # the body index where the rendered sections start, followed by the body index after every rendered section
+        self._section_ends: list[int] = []
+        # the preprocessed images of all sections and whether the rendered prefix was loaded from an existing file
+        self._image_paths = {}
+        self._prefix_from_file = False
+        # set by `agenerate` to stop the rendering at the next section
+        self._cancel_event = threading.Event()
 
     def add_section(self, section: 'Section'):
         """
@@ -32,7 +132,7 @@ class ReportGenerator:
         self.sections.append(section)
 
     @staticmethod
-    def global_setup(doc: document) -> None:
+    def global_setup(doc: document, image_registry: ImageRegistry | None = None) -> None:
         """
         Global setup for the report
 
@@ -40,40 +140,611 @@ class ReportGenerator:
         ----------
         doc : Document
             Document object to set up
+        image_registry : ImageRegistry, optional
+            The registry of the image parts of the document
         """
         # Add headers and footers, and all the text content can be transferred from the parameters
         set_global_formatting(doc)
-        left_header_text = SETTINGS.get('header_text')
-        footer_text = SETTINGS.get('footer_text')
-        middle_footer_text = SETTINGS.get('middle_footer_text')
-        logo_path = SETTINGS.get('logo_path')
-        builder = GlobalSetupBuilder(doc=doc,
-                                     left_header_text=str(left_header_text),
-                                     footer_text=str(footer_text),
-                                     middle_footer_text=str(middle_footer_text),
-                                     image_path=logo_path if logo_path else None)
-        builder.header_render(doc).footer_render(doc)
+        settings = get_config().settings
+        left_header_text = settings.header_text
+        footer_text = settings.footer_text
+        middle_footer_text = settings.middle_footer_text
+        logo_path = settings.logo_path
+
+        def build_header_footer() -> document:
+            scratch = Document()
+            set_global_formatting(scratch)
+            builder = GlobalSetupBuilder(doc=scratch,
+                                         left_header_text=str(left_header_text),
+                                         footer_text=str(footer_text),
+                                         middle_footer_text=str(middle_footer_text),
+                                         image_path=logo_path if logo_path else None,
+                                         image_registry=ImageRegistry(scratch.part.package, get_image_bytes_cache()))
+            builder.header_render(scratch).footer_render(scratch)
+            logger.info("Build the header and footer template for the report.")
+            return scratch
+
+        # the header and footer are built once per settings and attached to every new document
+        template = get_header_footer_template(ReportGenerator._header_footer_fingerprint(), build_header_footer)
+        template.attach(doc, image_registry)
         logger.info("Initialize the global setup for the report.")
 
-    def generate(self, path: str):
+    @staticmethod
+    def _header_footer_fingerprint() -> str:
+        """
+        Get the fingerprint of all settings the header and footer depend on
+
+        Returns
+        -------
+        str
+            The hash of the texts, the logo file, the page margins and the header and footer text formats
         """
-        Generate the report to the path
+        keys = ['header_text', 'footer_text', 'middle_footer_text', 'logo_path', 'top_margin', 'bottom_margin',
+                'left_margin', 'right_margin', 'line_spacing']
+        config = get_config()
+        logo_path = config.settings.logo_path
+        logo_stat = os.stat(logo_path) if logo_path and os.path.isfile(logo_path) else None
+        content = {
+            "settings": {key: getattr(config.settings, key) for key in keys},
+            "text_format": {key: repr(config.text_formats[key]) for key in ('HEADER', 'FOOTER')},
+            "logo": [logo_stat.st_mtime_ns, logo_stat.st_size] if logo_stat else None,
+        }
+        return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _prepare_document(self, path: str, append: bool) -> document:
+        """
+        Get the document prefix to render the new sections into
+
+        The document rendered by a previous `generate` call is reused, so the earlier sections are never rendered
+        twice. In append mode an already rendered report at the path is loaded as prefix instead of a new document.
 
         Parameters
         ----------
         path : str
-            Path to save the report
+            Path of the report
+        append : bool
+            Whether to reuse the report at the path as prefix
+
+        Returns
+        -------
+        Document
+            The document to render the new sections into
+        """
+        if self._document is not None:
+            return self._document
+
+        if append and Path(path).is_file():
+            doc = Document(path)
+            self._prefix_from_file = True
+            self._image_registry = ImageRegistry(doc.part.package,
+                                                 get_image_bytes_cache(get_config().settings.image_cache_max_bytes))
+            logger.info("Reuse the rendered document %s as prefix for the new sections.", path)
+        else:
+            doc = self._new_document()
+        self._document = doc
+        self._section_ends = [len(doc.element.body) - 1]
+        return doc
+
+    def _new_document(self) -> document:
+        """
+        Create a new document with the global setup and its image registry
+
+        Returns
+        -------
+        Document
+            The new document
         """
-        doc = Document()
         logger.info("Initialize the document.")
-        self.global_setup(doc)
+        with PROFILER.stage("global_setup"):
+            doc, self._image_registry = self._base_document()
         logger.info("Global setup for the document is done.")
-        for section in self.sections:
-            section.render(doc)
-        logger.info("Render all sections to the document.")
-        # Save the document as a docx file
-        doc.save(path)
-        logger.info("Save the document as a docx file.")
+        return doc
+
+    def _base_document(self) -> tuple[document, ImageRegistry]:
+        """
+        Clone the base document with the global setup, which is built once per configuration
+
+        Returns
+        -------
+        tuple[Document, ImageRegistry]
+            The new document and the registry of its image parts
+        """
+        def build() -> document:
+            doc = Document()
+            self.global_setup(doc, ImageRegistry(doc.part.package, get_image_bytes_cache()))
+            return doc
+
+        fingerprint = "|".join([type(self).__qualname__, self._config_fingerprint(), self._header_footer_fingerprint()])
+        doc = get_document_template(fingerprint, build).clone()
+        return doc, ImageRegistry(doc.part.package, get_image_bytes_cache(get_config().settings.image_cache_max_bytes))
+
+    def _get_pdf_queue(self) -> PdfConversionQueue:
+        """
+        Get the PDF conversion queue, created with the backend of the settings if not given
+
+        Returns
+        -------
+        PdfConversionQueue
+            The PDF conversion queue
+        """
+        if self.pdf_queue is None:
+            settings = get_config().settings
+            backend = create_pdf_backend(settings.pdf_backend, workers=settings.pdf_workers)
+            self.pdf_queue = PdfConversionQueue(backend)
+        return self.pdf_queue
+
+    def _preprocess_images(self, sections: list, context: RenderContext) -> None:
+        """
+        Preprocess the images of the sections with the image pipeline and register the processed images in the context
+
+        Parameters
+        ----------
+        sections : list
+            The sections to render
+        context : RenderContext
+            The render context of the document
+        """
+        image_paths_by_width: dict = {}
+        for section in sections:
+            for element in section.elements:
+                if isinstance(element, Image):
+                    image_paths = image_paths_by_width.setdefault(element.display_width(context), [])
+                    for file_image_paths in element.image_files().values():
+                        image_paths.extend(file_image_paths)
+        for width, image_paths in image_paths_by_width.items():
+            for image_path, processed_path in self.image_pipeline.process(image_paths, width).items():
+                context.image_paths[(image_path, width)] = processed_path
+
+    def _render_sections(self, doc: document, context: RenderContext, sections: list,
+                         writer: StreamingDocxWriter | None = None) -> None:
+        """
+        Render the sections to the document, in parallel worker processes if more than one render worker is set
+
+        The sections are partitioned into contiguous chunks, each chunk is rendered by a worker into a fragment and the
+        fragments are merged in order, so the content equals the sequentially rendered content.
+
+        Parameters
+        ----------
+        doc : Document
+            The document to render into
+        context : RenderContext
+            The render context of the document
+        sections : list
+            The sections to render
+        writer : StreamingDocxWriter, optional
+            The writer to flush the rendered content to after every section or fragment
+        """
+        if self.fragment_cache is not None:
+            self._render_cached_sections(doc, context, sections, writer)
+            return
+        if self.render_workers <= 1 or len(sections) <= 1:
+            for section in sections:
+                self._check_cancelled()
+                section.render(doc, context)
+                self._mark_section_ends(doc)
+                if writer is not None:
+                    writer.flush()
+            return
+
+        # a few chunks per worker balance the load without merging a fragment per section
+        chunk_size = math.ceil(len(sections) / (self.render_workers * 4))
+        chunks = [sections[i:i + chunk_size] for i in range(0, len(sections), chunk_size)]
+        with create_render_executor(min(self.render_workers, len(chunks)), self.mp_context) as executor:
+            for fragment in executor.map(render_fragment, chunks, repeat(dict(context.image_paths))):
+                self._check_cancelled(executor)
+                with PROFILER.stage("merge_fragment"):
+                    merge_fragment(fragment, context)
+                self._mark_section_ends(doc, fragment.block_counts)
+                if writer is not None:
+                    writer.flush()
+        logger.info("Render %d sections in %d fragments with %d workers.", len(sections), len(chunks), self.render_workers)
+
+    def _mark_section_ends(self, doc: document, block_counts: list[int] | None = None) -> None:
+        """
+        Record the body index after the rendered sections, so their blocks can be extracted later
+
+        Parameters
+        ----------
+        doc : Document
+            The document the sections were rendered into
+        block_counts : list[int] | None, optional
+            The number of blocks of every section of a merged fragment, by default a single section ending before the
+            section properties of the body
+        """
+        if block_counts is None:
+            self._section_ends.append(len(doc.element.body) - 1)
+        else:
+            for block_count in block_counts:
+                self._section_ends.append(self._section_ends[-1] + block_count)
+
+    def _check_cancelled(self, executor: Executor | None = None) -> None:
+        """
+        Raise `GenerationCancelled` if the generation was cancelled, the pending work of the executor is dropped
+
+        Parameters
+        ----------
+        executor : Executor, optional
+            The executor rendering the remaining sections
+        """
+        if not self._cancel_event.is_set():
+            return
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise GenerationCancelled("The generation of the report was cancelled.")
+
+    @staticmethod
+    def _config_fingerprint() -> str:
+        """
+        Get the fingerprint of the configuration the rendered sections depend on
+
+        Returns
+        -------
+        str
+            The hash of the settings and the text formats
+        """
+        config = get_config()
+        return hashlib.sha1(repr((config.settings, sorted(config.text_formats.items()))).encode("utf-8")).hexdigest()
+
+    def _section_cache_key(self, section: Section, context: RenderContext, config_fingerprint: str) -> str | None:
+        """
+        Get the cache key of a section from its fingerprint and the content of the images it embeds
+
+        Parameters
+        ----------
+        section : Section
+            The section to render
+        context : RenderContext
+            The render context with the preprocessed images
+        config_fingerprint : str
+            The fingerprint of the configuration
+
+        Returns
+        -------
+        str | None
+            The cache key, None if the section cannot be cached
+        """
+        fingerprint = section.fingerprint()
+        if fingerprint is None:
+            return None
+        image_paths = []
+        for element in section.elements:
+            if isinstance(element, Image):
+                width = element.display_width(context)
+                image_paths.extend(context.image_paths.get((image_path, width), image_path)
+                                   for file_image_paths in element.image_files().values()
+                                   for image_path in file_image_paths)
+        try:
+            return FragmentCache.key(fingerprint, image_paths, config_fingerprint)
+        except OSError as e:
+            logger.warning("Render the section without the fragment cache: %r", e)
+            return None
+
+    def _render_missing_fragments(self, sections: list, keys: list, fragments: list, context: RenderContext) -> None:
+        """
+        Render the sections missing in the fragment cache in the worker processes and store their fragments
+        """
+        missing = [i for i, (key, fragment) in enumerate(zip(keys, fragments)) if key is not None and fragment is None]
+        if self.render_workers <= 1 or len(missing) <= 1:
+            return
+        with create_render_executor(min(self.render_workers, len(missing)), self.mp_context) as executor:
+            rendered = executor.map(render_fragment, ([sections[i]] for i in missing), repeat(dict(context.image_paths)))
+            for i, fragment in zip(missing, rendered):
+                self._check_cancelled(executor)
+                fragments[i] = fragment
+                self.fragment_cache.put(keys[i], fragment)
+
+    def _render_cached_sections(self, doc: document, context: RenderContext, sections: list,
+                                writer: StreamingDocxWriter | None = None) -> None:
+        """
+        Render the sections to the document, the fragment of an unchanged section is merged from the fragment cache
+
+        A section missing in the cache is rendered into the document and its rendered body is stored in the cache, in
+        the worker processes if more than one render worker is set.
+
+        Parameters
+        ----------
+        doc : Document
+            The document to render into
+        context : RenderContext
+            The render context of the document
+        sections : list
+            The sections to render
+        writer : StreamingDocxWriter, optional
+            The writer to flush the rendered content to after every section
+        """
+        cache = self.fragment_cache
+        config_fingerprint = self._config_fingerprint()
+        keys = [self._section_cache_key(section, context, config_fingerprint) for section in sections]
+        fragments = [cache.get(key) if key is not None else None for key in keys]
+        self._render_missing_fragments(sections, keys, fragments, context)
+        body = doc.element.body
+        for section, key, fragment in zip(sections, keys, fragments):
+            self._check_cancelled()
+            if fragment is not None:
+                with PROFILER.stage("merge_fragment"):
+                    merge_fragment(fragment, context)
+            else:
+                # the rendered blocks are inserted before the final section properties of the body
+                start = len(body) - 1
+                section.render(doc, context)
+                if key is not None:
+                    cache.put(key, extract_fragment(doc.part, body[start:-1]))
+            self._mark_section_ends(doc)
+            if writer is not None:
+                writer.flush()
+        cache.log_statistics()
+
+    def generate(self, path: str, append: bool = False, wait_for_pdf: bool = True) -> 'Future[PdfConversionJob]':
+        """
+        Generate the report to the path
+
+        Only the sections added since the last call are rendered, the sections rendered before are kept in the
+        document prefix. In streaming mode all sections are rendered and written to the file one after another
+        instead. The report replaces the file at the path once it is completely written, and the saved report is
+        converted to PDF in the background by the PDF conversion queue.
+
+        Parameters
+        ----------
+        path : str
+            Path to save the report
+        append : bool, optional
+            Append the sections to the report already rendered at the path, by default False
+        wait_for_pdf : bool, optional
+            Wait until the PDF conversion is finished, by default True
+
+        Returns
+        -------
+        Future[PdfConversionJob]
+            The future of the PDF conversion job
+        """
+        if self.streaming:
+            if append:
+                raise ValueError("A streamed report cannot be appended to, generate it without streaming.")
+            context = self._generate_streaming(path)
+        else:
+            doc = self._prepare_document(path, append)
+            context = RenderContext(doc, self._image_registry)
+            context.image_paths = self._image_paths
+            sections = self.sections[self._rendered_sections:]
+            if self.image_pipeline is not None:
+                with PROFILER.stage("preprocess_images"):
+                    self._preprocess_images(sections, context)
+            try:
+                self._render_sections(doc, context, sections)
+                self._check_cancelled()
+                self._rendered_sections = len(self.sections)
+                logger.info("Render all sections to the document.")
+                with PROFILER.stage("save", path=str(path)):
+                    self._save(doc, path)
+                logger.info("Save the document as a docx file.")
+            except GenerationCancelled:
+                # the partly rendered prefix is dropped, the next generation renders all sections again
+                self._document = None
+                self._rendered_sections = 0
+                self._section_ends = []
+                self._prefix_from_file = False
+                raise
         # Convert the docx file to PDF
-        convert(path)
-        logger.info("Convert the docx file to PDF.")
+        pdf_job = self._submit_pdf(path, context)
+        logger.info("Submit the docx file for the PDF conversion.")
+        if wait_for_pdf:
+            pdf_job.result()
+        return pdf_job
+
+    def _save(self, doc: document, path: str) -> None:
+        """
+        Save the document next to the path and replace the file at the path by it, unless the generation was cancelled
+        in the meantime, so a cancelled or failed generation keeps a previous report at the path
+
+        Parameters
+        ----------
+        doc : Document
+            The rendered document
+        path : str
+            Path of the report
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            doc.save(str(tmp_path))
+            self._check_cancelled()
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    async def agenerate(self, path: str, append: bool = False, semaphore: asyncio.Semaphore | None = None,
+                        executor: Executor | None = None) -> PdfConversionJob:
+        """
+        Generate the report to the path without blocking the event loop
+
+        The rendering and saving run in a thread of the executor, the PDF conversion is awaited without blocking. At
+        most `max_concurrent_reports` reports of the settings are generated at once, unless another semaphore is
+        given. A cancelled generation stops at the next section and keeps the file at the path as it was, the
+        cancellation is raised after the rendering has stopped. If the cancellation comes after the report replaced the
+        file at the path, the report is kept and only its PDF conversion is cancelled. The size of the default
+        semaphore is read from the settings when the semaphore of the event loop is created on the first call, a later
+        `reload_config` does not change it.
+
+        Parameters
+        ----------
+        path : str
+            Path to save the report
+        append : bool, optional
+            Append the sections to the report already rendered at the path, by default False
+        semaphore : asyncio.Semaphore, optional
+            The semaphore limiting the concurrent generations, by default the semaphore of the running event loop
+        executor : Executor, optional
+            The thread pool running the generation, by default the default executor of the event loop
+
+        Returns
+        -------
+        PdfConversionJob
+            The finished PDF conversion job
+        """
+        loop = asyncio.get_running_loop()
+        async with semaphore or report_semaphore():
+            self._cancel_event.clear()
+            generation = loop.run_in_executor(executor, partial(self.generate, path, append, wait_for_pdf=False))
+            try:
+                pdf_job = await asyncio.shield(generation)
+            except asyncio.CancelledError:
+                self._cancel_event.set()
+                try:
+                    # a report finished before the cancellation was noticed is not converted
+                    (await generation).cancel()
+                except GenerationCancelled:
+                    logger.info("Cancel the generation of %s.", path)
+                finally:
+                    self._cancel_event.clear()
+                raise
+            return await asyncio.wrap_future(pdf_job)
+
+    def _generate_streaming(self, path: str) -> RenderContext:
+        """
+        Render all sections into a new document and stream each rendered section to the docx file
+
+        Parameters
+        ----------
+        path : str
+            Path to save the report
+
+        Returns
+        -------
+        RenderContext
+            The render context of the streamed document
+        """
+        doc = self._new_document()
+        # the streamed blocks leave the body, so the section ends are not used for the PDF fragments
+        self._section_ends = [len(doc.element.body) - 1]
+        context = RenderContext(doc, self._image_registry)
+        context.image_paths = self._image_paths
+        if self.image_pipeline is not None:
+            with PROFILER.stage("preprocess_images"):
+                self._preprocess_images(self.sections, context)
+        # the sections are rendered and saved within the same stage while streaming
+        with PROFILER.stage("stream", path=str(path)), StreamingDocxWriter(doc, path) as writer:
+            self._render_sections(doc, context, self.sections, writer)
+        logger.info("Render and stream all sections to the docx file.")
+        return context
+
+    def _submit_pdf(self, path: str, context: RenderContext) -> 'Future[PdfConversionJob]':
+        """
+        Submit the saved report for the PDF conversion, as a whole or as PDF fragments if the incremental PDF
+        conversion is enabled and all sections of the report are known
+
+        Parameters
+        ----------
+        path : str
+            Path to the saved report
+        context : RenderContext
+            The render context of the report
+
+        Returns
+        -------
+        Future[PdfConversionJob]
+            The future of the PDF conversion job
+        """
+        pdf_queue = self._get_pdf_queue()
+        if not self.incremental_pdf or self._prefix_from_file:
+            return pdf_queue.submit(path)
+        if self._pdf_converter is None:
+            cache_dir = get_config().settings.pdf_fragment_cache_dir
+            self._pdf_converter = IncrementalPdfConverter(pdf_queue, PdfFragmentCache(cache_dir) if cache_dir else None)
+        with PROFILER.stage("pdf_fragments"):
+            fragments = self._pdf_fragments(context)
+            return self._pdf_converter.submit(path, fragments, PageNumberStamp.from_document(context.document))
+
+    def _pdf_fragments(self, context: RenderContext) -> list[PdfFragment]:
+        """
+        Partition all sections of the report into the PDF fragments, keyed by the content of their sections
+
+        Parameters
+        ----------
+        context : RenderContext
+            The render context of the report
+
+        Returns
+        -------
+        list[PdfFragment]
+            The PDF fragments in report order
+        """
+        settings = get_config().settings
+        size = max(1, settings.pdf_sections_per_fragment)
+        fingerprint = hashlib.sha1("|".join([self._config_fingerprint(), self._header_footer_fingerprint(),
+                                             self.pdf_queue.backend.name]).encode("utf-8")).hexdigest()
+        # the blocks of the sections are taken from the rendered report, a streamed report has to render them again
+        rendered = not self.streaming and len(self._section_ends) == len(self.sections) + 1
+        fragments = []
+        for i in range(0, len(self.sections), size):
+            sections = self.sections[i:i + size]
+            keys = [self._section_cache_key(section, context, fingerprint) for section in sections]
+            key = None if None in keys else hashlib.sha1("|".join(keys).encode("utf-8")).hexdigest()
+            if rendered:
+                snapshot = partial(self._snapshot_pdf_fragment, self._section_ends[i], self._section_ends[i + len(sections)])
+            else:
+                snapshot = partial(self._render_pdf_fragment, sections, dict(context.image_paths))
+            fragments.append(PdfFragment(key, snapshot))
+        return fragments
+
+    def _snapshot_pdf_fragment(self, start: int, end: int) -> Callable[[Path], None]:
+        """
+        Extract the blocks of the sections of a PDF fragment from the rendered report
+
+        Parameters
+        ----------
+        start : int
+            The body index of the first block of the sections
+        end : int
+            The body index after the last block of the sections
+
+        Returns
+        -------
+        Callable[[Path], None]
+            The function saving the extracted blocks as fragment document
+        """
+        doc = self._document
+        return partial(self._save_pdf_fragment, extract_fragment(doc.part, doc.element.body[start:end]))
+
+    def _render_pdf_fragment(self, sections: list, image_paths: dict) -> Callable[[Path], None]:
+        """
+        Get the function rendering the sections of a PDF fragment again, for a report whose blocks are streamed
+
+        Parameters
+        ----------
+        sections : list
+            The sections of the fragment
+        image_paths : dict
+            The preprocessed images of the sections
+
+        Returns
+        -------
+        Callable[[Path], None]
+            The function saving the rendered sections as fragment document
+        """
+        def render(context: RenderContext) -> None:
+            context.image_paths.update(image_paths)
+            for section in sections:
+                section.render(context.document, context)
+
+        return partial(self._save_pdf_fragment, render)
+
+    def _save_pdf_fragment(self, content: RenderedFragment | Callable[[RenderContext], None], docx_path: Path) -> None:
+        """
+        Add the content of a PDF fragment to a new document with the global setup and save it
+
+        Parameters
+        ----------
+        content : RenderedFragment | Callable[[RenderContext], None]
+            The extracted blocks of the sections, or the function rendering the sections
+        docx_path : Path
+            The path to save the document
+        """
+        doc, image_registry = self._base_document()
+        context = RenderContext(doc, image_registry)
+        if isinstance(content, RenderedFragment):
+            merge_fragment(content, context)
+        else:
+            content(context)
+        prepare_fragment_document(doc)
+        doc.save(docx_path)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""A module for building the header and footer of the reports once and attaching them to every new document"""
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+from docx.document import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import parse_xml
+from lxml import etree
+
+from report_generator.compontent.settings import on_config_reload
+from report_generator.module.image_registry import ImageRegistry, get_image_bytes_cache
+
+
+_R_NAMESPACE = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+
+@dataclass
+class StoryTemplate:
+    """The serialized xml of a header or footer part and the images it refers to"""
+    xml: bytes
+    images: dict[str, tuple[bytes, str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_part(cls, part) -> 'StoryTemplate':
+        """
+        Serialize a header or footer part
+
+        Parameters
+        ----------
+        part : docx.parts.hdrftr.HeaderPart | docx.parts.hdrftr.FooterPart
+            The header or footer part
+
+        Returns
+        -------
+        StoryTemplate
+            The template of the part
+        """
+        images = {}
+        for rId, rel in part.rels.items():
+            if rel.reltype != RT.IMAGE:
+                raise ValueError(f"Relationship type '{rel.reltype}' is not supported in a header or footer template.")
+            images[rId] = (rel.target_part.blob, rel.target_part.filename)
+        return cls(xml=etree.tostring(part.element, encoding="UTF-8"), images=images)
+
+    def attach(self, part, image_registry: ImageRegistry) -> None:
+        """
+        Replace the content of a new header or footer part by the template
+
+        Parameters
+        ----------
+        part : docx.parts.hdrftr.HeaderPart | docx.parts.hdrftr.FooterPart
+            The header or footer part
+        image_registry : ImageRegistry
+            The registry of the image parts of the document
+        """
+        rIds = {rId: image_registry.get_or_add_image_blob(part, blob, filename)
+                for rId, (blob, filename) in self.images.items()}
+        element = parse_xml(self.xml)
+        if rIds:
+            for child in element.iter():
+                for name, value in child.attrib.items():
+                    if name.startswith(_R_NAMESPACE):
+                        child.set(name, rIds[value])
+        part._element = element
+
+
+@dataclass
+class HeaderFooterTemplate:
+    """The header and the footer of the reports"""
+    header: StoryTemplate
+    footer: StoryTemplate
+
+    @classmethod
+    def from_document(cls, document: Document) -> 'HeaderFooterTemplate':
+        """
+        Serialize the header and the footer of the first section of a document
+
+        Parameters
+        ----------
+        document : docx.document.Document
+            The document with the rendered header and footer
+
+        Returns
+        -------
+        HeaderFooterTemplate
+            The template of the header and the footer
+        """
+        section = document.sections[0]
+        return cls(header=StoryTemplate.from_part(section.header.part),
+                   footer=StoryTemplate.from_part(section.footer.part))
+
+    def attach(self, document: Document, image_registry: ImageRegistry | None = None) -> None:
+        """
+        Attach the header and the footer to every section of a document
+
+        Parameters
+        ----------
+        document : docx.document.Document
+            The document to attach the header and footer to
+        image_registry : ImageRegistry, optional
+            The registry of the image parts of the document, created if not given
+        """
+        image_registry = image_registry or ImageRegistry(document.part.package, get_image_bytes_cache())
+        for section in document.sections:
+            section.header.is_linked_to_previous = False
+            self.header.attach(section.header.part, image_registry)
+        for section in document.sections:
+            section.footer.is_linked_to_previous = False
+            self.footer.attach(section.footer.part, image_registry)
+
+
+_templates: dict[str, HeaderFooterTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def get_header_footer_template(fingerprint: str, build: Callable[[], Document]) -> HeaderFooterTemplate:
+    """
+    Get the header and footer template of the settings fingerprint, built once per fingerprint
+
+    Parameters
+    ----------
+    fingerprint : str
+        The fingerprint of all settings the header and footer depend on
+    build : Callable[[], Document]
+        The function rendering the header and footer into a scratch document
+
+    Returns
+    -------
+    HeaderFooterTemplate
+        The shared template
+    """
+    template = _templates.get(fingerprint)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(fingerprint)
+            if template is None:
+                template = _templates[fingerprint] = HeaderFooterTemplate.from_document(build())
+    return template
+
+
+def clear_header_footer_templates() -> None:
+    """
+    Remove the cached templates, e.g. after the configuration changed
+    """
+    with _templates_lock:
+        _templates.clear()
+
+
+on_config_reload(clear_header_footer_templates)
@@ -1,37 +1,122 @@
 # -*- coding: utf-8 -*-
 """A logger module for showing and collecting log
 """
+import atexit
+import json
 import logging
+import os
 from pathlib import Path
 import sys
+import threading
 import time
-
-import colorlog
+import weakref
 
 from report_generator.common.settings_parser import SettingsParser
 
 
+_APPLICATION_SETTINGS = Path(__file__).resolve().parents[2].joinpath("config", "application_settings.ini")
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """A formatter writing every record as one json object per line for machine ingestion
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        content = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "function": record.funcName,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            content["exception"] = self.formatException(record.exc_info)
+        return json.dumps(content, ensure_ascii=False)
+
+
 class Logger:
     """A log class for showing console log or saving log to logfile
+
+    In asynchronous mode the logger only puts the records into a queue, a background thread formats and writes them
+    with the console and file handlers. Worker processes always write synchronously, because they exit without
+    draining the queue.
     """
-    def __init__(self, name: str, level: str, log_path: Path, save_logfile: bool = False) -> None:
+    def __init__(self, name: str, level: str, log_path: Path, save_logfile: bool = False, async_logging: bool = False,
+                 json_logfile: bool = False) -> None:
         # create a logger instance
         self._logger = logging.Logger(name)
         # map the log level
         self._log_level = logging._nameToLevel[level.upper()]
+        self._logger.setLevel(self._log_level)
 
         # create handler with if-statement to avoid multiple initialize
         if not self._logger.handlers:
-            self._logger.addHandler(self._create_console_handler(self._log_level))
-            if save_logfile:
+            handlers = [self._create_console_handler(self._log_level)]
+            filename = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}"
+            if save_logfile or json_logfile:
                 log_path.mkdir(parents=True, exist_ok=True)
-                filename = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.log"
-                self._logger.addHandler(self._create_file_handler(self._log_level, log_path.joinpath(filename)))
+            if save_logfile:
+                handlers.append(self._create_file_handler(self._log_level, log_path.joinpath(f"{filename}.log")))
+            if json_logfile:
+                handlers.append(self._create_file_handler(self._log_level, log_path.joinpath(f"{filename}.jsonl"),
+                                                          JsonLinesFormatter()))
+            if async_logging and self._is_main_process():
+                self._start_listener(handlers)
+            else:
+                for handler in handlers:
+                    self._logger.addHandler(handler)
 
     @property
     def singleton_logger(self) -> logging.Logger:
         return self._logger
 
+    @staticmethod
+    def _is_main_process() -> bool:
+        """To check whether the logger is created in the main process instead of a worker process
+
+        Returns
+        -------
+        bool
+            True in the main process
+        """
+        import multiprocessing
+
+        return multiprocessing.parent_process() is None
+
+    def _start_listener(self, handlers: list[logging.Handler]) -> None:
+        """To write the records of the logger with the handlers in a background thread
+
+        Parameters
+        ----------
+        handlers : list[logging.Handler]
+            The handlers formatting and writing the records
+        """
+        import logging.handlers
+        import queue
+
+        class RecordQueueHandler(logging.handlers.QueueHandler):
+            """A queue handler putting the records into the queue unchanged, so they are formatted by the handlers in
+            the background thread instead of the logging thread
+            """
+            def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+                return record
+
+        queue_handler = RecordQueueHandler(queue.SimpleQueue())
+        queue_handler.listener = logging.handlers.QueueListener(queue_handler.queue, *handlers,
+                                                                respect_handler_level=True)
+        self._logger.addHandler(queue_handler)
+        queue_handler.listener.start()
+        _async_loggers.add(self._logger)
+
+    def stop(self) -> None:
+        """To write the queued records and stop the background thread of the asynchronous mode, the later records are
+        written synchronously
+        """
+        _stop_listener(self._logger)
+
     def _create_console_handler(self, log_level: int) -> logging.StreamHandler:
         """To create a console handler with input log_level
 
@@ -45,6 +130,8 @@ class Logger:
         logging.StreamHandler
             A logging handler for console output
         """
+        import colorlog
+
         log_format = "%(asctime)s |%(log_color)s %(levelname)-8s | %(filename)s -> %(funcName)s:%(lineno)d - %(message)s"
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(colorlog.ColoredFormatter(fmt=log_format))
@@ -52,7 +139,8 @@ class Logger:
 
         return console_handler
 
-    def _create_file_handler(self, log_level: int, logfile_path: Path) -> logging.FileHandler:
+    def _create_file_handler(self, log_level: int, logfile_path: Path,
+                             formatter: logging.Formatter | None = None) -> logging.FileHandler:
         """To create a logfile handler with input log_level
 
         Parameters
@@ -61,6 +149,8 @@ class Logger:
             The output log level for logging
         logfile_path : Path
             The output logfile with output path
+        formatter : logging.Formatter, optional
+            The formatter of the records, by default the text format of the console without colors
 
         Returns
         -------
@@ -69,13 +159,87 @@ class Logger:
         """
         log_format = "%(asctime)s | %(levelname)-8s | %(filename)s -> %(funcName)s:%(lineno)d - %(message)s"
         file_handler = logging.FileHandler(filename=logfile_path, mode='w+', encoding='utf-8')
-        file_handler.setFormatter(logging.Formatter(fmt=log_format))
+        file_handler.setFormatter(formatter or logging.Formatter(fmt=log_format))
         file_handler.setLevel(log_level)
         file_handler.close()
 
         return file_handler
 
 
+def _write_synchronously(logger: logging.Logger) -> list:
+    """To replace the queue handler of an asynchronous logger by the handlers of its listener
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        The logger instance
+
+    Returns
+    -------
+    list
+        The listeners of the removed queue handlers, which still have to be stopped in the process running them
+    """
+    listeners = []
+    for handler in list(logger.handlers):
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            handler.listener = None
+            logger.removeHandler(handler)
+            for listener_handler in listener.handlers:
+                logger.addHandler(listener_handler)
+            listeners.append(listener)
+    return listeners
+
+
+def _stop_listener(logger: logging.Logger) -> None:
+    """To write the queued records of an asynchronous logger and stop its background thread
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        The logger instance
+    """
+    for listener in _write_synchronously(logger):
+        listener.stop()
+
+
+def _close_handlers(logger: logging.Logger) -> None:
+    """To stop the background thread of a logger, remove its handlers and close their files
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        The logger instance
+    """
+    _stop_listener(logger)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+# the loggers writing in a background thread, registered once for the exit and the fork hooks
+_async_loggers: weakref.WeakSet[logging.Logger] = weakref.WeakSet()
+
+
+def _stop_async_loggers() -> None:
+    """To write the queued records of all asynchronous loggers at exit
+    """
+    for logger in list(_async_loggers):
+        _stop_listener(logger)
+
+
+def _write_synchronously_after_fork() -> None:
+    """To write with the handlers directly in a forked child, where the listener threads do not exist
+    """
+    for logger in list(_async_loggers):
+        _write_synchronously(logger)
+
+
+atexit.register(_stop_async_loggers)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_write_synchronously_after_fork)
+
+
 def create_logger_instance(logger_config: dict) -> logging.Logger:
     """Create a new logger instance with new log level and save_log flag
 
@@ -96,7 +260,9 @@ def create_logger_instance(logger_config: dict) -> logging.Logger:
         level: "debug",
         log_path: "Path to folder",
         save_logfile: True,
-        disable_logger: False
+        disable_logger: False,
+        async_logging: True,
+        json_logfile: False
     }
     """
     name = logger_config.get("name", "logger")
@@ -104,12 +270,76 @@ def create_logger_instance(logger_config: dict) -> logging.Logger:
     log_path = Path(logger_config.get("log_path", "logs"))
     save_logfile = logger_config.get("save_logfile", False)
     disable_logger = logger_config.get("disable_logger", False)
+    async_logging = logger_config.get("async_logging", False)
+    json_logfile = logger_config.get("json_logfile", False)
 
-    logger = Logger(name=name, level=level, log_path=log_path, save_logfile=save_logfile)
+    logger = Logger(name=name, level=level, log_path=log_path, save_logfile=save_logfile, async_logging=async_logging,
+                    json_logfile=json_logfile)
     logger.singleton_logger.disabled = disable_logger
 
     return logger.singleton_logger
 
 
-# create singleton logger instance
-logger = create_logger_instance(SettingsParser(Path("config/application_settings.ini")).get("logger"))
+_singleton_logger: logging.Logger | None = None
+_logger_lock = threading.Lock()
+
+
+def _load_logger_config() -> dict:
+    """Load the logger config of the application settings file, the defaults are used if it does not exist
+
+    Returns
+    -------
+    dict
+        The config dict for creating a logger instance
+    """
+    if not _APPLICATION_SETTINGS.is_file():
+        return {"name": "report_generator", "level": "info"}
+    return SettingsParser(_APPLICATION_SETTINGS).get("logger")
+
+
+def get_logger() -> logging.Logger:
+    """Get the singleton logger instance, created from the application settings on the first call
+
+    Returns
+    -------
+    logging.Logger
+        The singleton logger instance
+    """
+    global _singleton_logger
+    if _singleton_logger is None:
+        with _logger_lock:
+            if _singleton_logger is None:
+                _singleton_logger = create_logger_instance(_load_logger_config())
+    return _singleton_logger
+
+
+def configure_logger(logger_config: dict) -> logging.Logger:
+    """Replace the singleton logger instance by a logger created with the config
+
+    Parameters
+    ----------
+    logger_config : dict
+        The config dict for creating a logger instance, see `create_logger_instance`
+
+    Returns
+    -------
+    logging.Logger
+        The new singleton logger instance
+    """
+    global _singleton_logger
+    with _logger_lock:
+        if _singleton_logger is not None:
+            _close_handlers(_singleton_logger)
+        _singleton_logger = create_logger_instance(logger_config)
+    return _singleton_logger
+
+
+class _LazyLogger:
+    """A proxy of the singleton logger instance, which is created on the first use instead of at import time
+    """
+    def __getattr__(self, name: str):
+        return getattr(get_logger(), name)
+
+
+# singleton logger instance
+logger = _LazyLogger()
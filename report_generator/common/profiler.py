@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""A module for measuring the time and memory of the stages of the render pipeline
+
+The stages of the pipeline are wrapped in `PROFILER.stage(...)`. While the profiler is disabled a stage costs a single
+attribute lookup, once enabled every stage records its wall time, cpu time of the thread, net allocated memory
+(with tracemalloc) and the counts the stage adds to its record, e.g. paragraphs, table cells and pictures.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class StageRecord:
+    """The measurements of a stage, times in microseconds since the start of the profiler"""
+    name: str
+    category: str
+    start: float
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    allocated: int | None = None
+    thread: int = 0
+    args: dict = field(default_factory=dict)
+
+
+class _NullStage:
+    """The stage of a disabled profiler, which measures nothing"""
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """A measured stage of an enabled profiler"""
+    __slots__ = ("_profiler", "_record", "_wall", "_cpu", "_memory")
+
+    def __init__(self, profiler: 'Profiler', name: str, category: str, args: dict):
+        self._profiler = profiler
+        self._record = StageRecord(name=name, category=category, start=0.0, thread=threading.get_ident(), args=args)
+
+    def __enter__(self) -> StageRecord:
+        self._memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._cpu = time.thread_time_ns()
+        self._wall = time.perf_counter_ns()
+        return self._record
+
+    def __exit__(self, *exc_info) -> None:
+        wall = time.perf_counter_ns()
+        record = self._record
+        record.cpu_time = (time.thread_time_ns() - self._cpu) / 1000
+        record.wall_time = (wall - self._wall) / 1000
+        record.start = (self._wall - self._profiler.started_at) / 1000
+        if self._memory is not None and tracemalloc.is_tracing():
+            record.allocated = tracemalloc.get_traced_memory()[0] - self._memory
+        self._profiler._add(record)
+
+
+class Profiler:
+    """
+    Profiler collecting the stage records of the render pipeline.
+
+    The records are exported as json profile with a summary per stage, or as Chrome trace event file, which can be
+    opened in `chrome://tracing` or Perfetto.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = time.perf_counter_ns()
+        self.records: list[StageRecord] = []
+        self._lock = threading.Lock()
+        self._trace_memory = False
+
+    def start(self, trace_memory: bool = True) -> None:
+        """
+        Start recording the stages, the records of a previous run are discarded
+
+        Parameters
+        ----------
+        trace_memory : bool, optional
+            Trace the allocated memory of the stages with tracemalloc, which slows the pipeline down, by default True
+        """
+        with self._lock:
+            self.records = []
+        self.started_at = time.perf_counter_ns()
+        self._trace_memory = trace_memory and not tracemalloc.is_tracing()
+        if self._trace_memory:
+            tracemalloc.start()
+        self.enabled = True
+
+    def stop(self) -> None:
+        """
+        Stop recording the stages
+        """
+        self.enabled = False
+        if self._trace_memory:
+            tracemalloc.stop()
+            self._trace_memory = False
+
+    def stage(self, name: str, category: str = "stage", **args):
+        """
+        Measure a stage
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage, the summary aggregates the records by name
+        category : str, optional
+            The category of the stage, by default "stage"
+        **args
+            Attributes of the stage, e.g. the case title
+
+        Returns
+        -------
+        ContextManager[StageRecord | None]
+            The context measuring the stage, it provides the record to add counts to, or None if disabled
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, category, args)
+
+    def _add(self, record: StageRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Aggregate the records by stage name
+
+        Returns
+        -------
+        dict[str, dict]
+            The number of calls, the total wall and cpu time in microseconds, the total allocated memory in bytes and
+            the summed counts of each stage
+        """
+        summary: dict[str, dict] = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            entry = summary.setdefault(record.name, {"category": record.category, "calls": 0, "wall_time": 0.0,
+                                                     "cpu_time": 0.0, "allocated": 0, "counts": {}})
+            entry["calls"] += 1
+            entry["wall_time"] += record.wall_time
+            entry["cpu_time"] += record.cpu_time
+            entry["allocated"] += record.allocated or 0
+            for key, value in record.args.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    entry["counts"][key] = entry["counts"].get(key, 0) + value
+        return summary
+
+    def export_json(self, path: Path | str) -> None:
+        """
+        Write the summary and all records as json profile
+
+        Parameters
+        ----------
+        path : Path | str
+            The path of the profile
+        """
+        with self._lock:
+            records = [asdict(record) for record in self.records]
+        content = {"summary": self.summary(), "records": records}
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(content, indent=2, default=str), encoding="utf-8")
+
+    def export_chrome_trace(self, path: Path | str) -> None:
+        """
+        Write the records as Chrome trace event file of complete events
+
+        Parameters
+        ----------
+        path : Path | str
+            The path of the trace file
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = [{"name": record.name, "cat": record.category, "ph": "X", "ts": record.start,
+                       "dur": record.wall_time, "pid": pid, "tid": record.thread,
+                       "args": {**record.args, "cpu_time": record.cpu_time, "allocated": record.allocated}}
+                      for record in self.records]
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str),
+                              encoding="utf-8")
+
+
+PROFILER = Profiler()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""A module for the render context which is passed through all sections and elements of a report"""
+from pathlib import Path
+
+from docx.document import Document
+from docx.oxml import OxmlElement
+from docx.oxml.table import CT_Tbl
+from docx.section import Section
+from docx.shared import Length
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+
+from report_generator.module.image_registry import ImageRegistry, get_image_bytes_cache
+
+
+class RenderContext:
+    """
+    Render context of a document, holding the cursor of the last created paragraph, table and run.
+
+    All block items are inserted directly in front of the body `w:sectPr`, so adding content and fetching the content
+    just created never rescans the document body and stays O(1) for any report length.
+    """
+
+    def __init__(self, document: Document, image_registry: ImageRegistry | None = None):
+        """
+        Initialize the render context of a document
+
+        Parameters
+        ----------
+        document : docx.document.Document
+            The document to render into
+        image_registry : ImageRegistry, optional
+            The registry of the image parts of the document, created if not given
+        """
+        self.document = document
+        self.image_registry = image_registry or ImageRegistry(document.part.package, get_image_bytes_cache())
+        self.paragraph: Paragraph | None = None
+        self.table: Table | None = None
+        self.run: Run | None = None
+        self._body = document._body
+        self._body_element = document.element.body
+        self._sect_pr = self._body_element.sectPr
+        self._content_width: Length | None = None
+        self._next_shape_id: int | None = None
+        # the preprocessed image to embed instead of the original image, by original path and display width
+        self.image_paths: dict[tuple[str, Length], str] = {}
+
+    @property
+    def content_width(self) -> Length:
+        """
+        The width between the left and the right margin of the body section, calculated once
+
+        Returns
+        -------
+        Length
+            The usable width of the page
+        """
+        if self._content_width is None:
+            section = Section(self._sect_pr, self.document.part) if self._sect_pr is not None else self.document.sections[-1]
+            self._content_width = section.page_width - section.left_margin - section.right_margin
+        return self._content_width
+
+    def _insert(self, element) -> None:
+        """
+        Insert a block element at the end of the body, in front of the `w:sectPr`
+        """
+        if self._sect_pr is not None:
+            self._sect_pr.addprevious(element)
+        else:
+            self._body_element.append(element)
+
+    def insert_block(self, element) -> None:
+        """
+        Insert a prebuilt block element, e.g. of a merged fragment, to the end of the document
+
+        Parameters
+        ----------
+        element : BaseOxmlElement
+            The `w:p` or `w:tbl` element to insert, the cursor is not moved
+        """
+        self._insert(element)
+
+    def next_shape_id(self) -> int:
+        """
+        Get the id for the next drawing shape of the document
+
+        The used ids are scanned once, afterwards the id is counted up instead of scanning the whole document for
+        every picture.
+
+        Returns
+        -------
+        int
+            A shape id not used in the document
+        """
+        if self._next_shape_id is None:
+            self._next_shape_id = self.document.part.next_id
+        shape_id = self._next_shape_id
+        self._next_shape_id += 1
+        return shape_id
+
+    def add_paragraph(self, text: str = "", style: str | None = None) -> Paragraph:
+        """
+        Add a paragraph to the end of the document and move the cursor to it
+
+        Parameters
+        ----------
+        text : str, optional
+            The text of the paragraph, added as a single run if present
+        style : str | None, optional
+            The name of the paragraph style
+
+        Returns
+        -------
+        Paragraph
+            The new paragraph
+        """
+        p = OxmlElement('w:p')
+        self._insert(p)
+        paragraph = Paragraph(p, self._body)
+        self.run = paragraph.add_run(text) if text else None
+        if style is not None:
+            paragraph.style = style
+        self.paragraph = paragraph
+        return paragraph
+
+    def add_heading(self, text: str = "", level: int = 1) -> Paragraph:
+        """
+        Add a heading paragraph to the end of the document and move the cursor to it
+
+        Parameters
+        ----------
+        text : str, optional
+            The text of the heading
+        level : int, optional
+            The level of the heading, 0 is the title style
+
+        Returns
+        -------
+        Paragraph
+            The new heading paragraph
+        """
+        if not 0 <= level <= 9:
+            raise ValueError(f"level must be in range 0-9, got {level}")
+        style = "Title" if level == 0 else f"Heading {level}"
+        return self.add_paragraph(text, style)
+
+    def add_picture(self, image_path: Path | str, width: Length | None = None, height: Length | None = None) -> Paragraph:
+        """
+        Add a picture in a new paragraph to the end of the document and move the cursor to it
+
+        Parameters
+        ----------
+        image_path : Path | str
+            The path to the image
+        width : Length | None, optional
+            The width of the picture
+        height : Length | None, optional
+            The height of the picture
+
+        Returns
+        -------
+        Paragraph
+            The paragraph containing the picture
+        """
+        paragraph = self.add_paragraph()
+        self.run = paragraph.add_run()
+        image_path = self.image_paths.get((str(image_path), width), str(image_path))
+        self.image_registry.add_picture(self.run, image_path, width=width, height=height, shape_id=self.next_shape_id())
+        return paragraph
+
+    def add_table(self, rows: int, cols: int) -> Table:
+        """
+        Add a table with the default table style to the end of the document and move the cursor to it
+
+        Parameters
+        ----------
+        rows : int
+            The number of rows
+        cols : int
+            The number of columns
+
+        Returns
+        -------
+        Table
+            The new table
+        """
+        table = self.insert_table(CT_Tbl.new_tbl(rows, cols, self.content_width))
+        table.style = None
+        return table
+
+    def insert_table(self, tbl: CT_Tbl) -> Table:
+        """
+        Insert a prebuilt table element to the end of the document and move the cursor to it
+
+        Parameters
+        ----------
+        tbl : CT_Tbl
+            The `w:tbl` element of the table
+
+        Returns
+        -------
+        Table
+            The inserted table
+        """
+        self._insert(tbl)
+        self.table = Table(tbl, self._body)
+        return self.table
@@ -1,13 +1,44 @@
 # -*- coding: utf-8 -*-
+import json
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Dict
 
+from docx.oxml.ns import qn
 from document import Document
 
-from report_generator.common.element_interface import (Title, Paragraph, Image, NormalTextFormat,
+from report_generator.common.render_context import RenderContext
+from report_generator.common.element_interface import (Element, Title, Paragraph, Image, NormalTextFormat,
                                                        PositiveStatusTextFormat, NegativeStatusTextFormat, Tables)
 from report_generator.compontent.global_setting_interface import insert_page_break
 from report_generator.common.logger import logger
+from report_generator.common.profiler import PROFILER
+
+
+def _count_content(blocks: list) -> dict[str, int]:
+    """
+    Count the paragraphs, table cells and pictures of rendered block elements for the profiler
+    """
+    counts = {"paragraphs": 0, "tables": 0, "cells": 0, "pictures": 0}
+    tags = {qn("w:p"): "paragraphs", qn("w:tbl"): "tables", qn("w:tc"): "cells", qn("pic:pic"): "pictures"}
+    for block in blocks:
+        for element in block.iter(*tags):
+            counts[tags[element.tag]] += 1
+    return counts
+
+
+def _json_default(value: object) -> object:
+    """
+    Serialize the values of a section json does not know, e.g. the elements with their text formats or the condition
+    results of a condition result store
+    """
+    if isinstance(value, Element):
+        state = value.__getstate__()
+        if isinstance(state, tuple):
+            # the state of an object with slots is a pair of its instance dictionary and its slot values
+            state = {**(state[0] or {}), **(state[1] or {})}
+        return {"element": type(value).__qualname__, **(state or {})}
+    return dict(value) if isinstance(value, Mapping) else str(value)
 
 
 class Section:
@@ -29,7 +60,18 @@ class Section:
         """
         self.elements.append(element)
 
-    def render(self, document: Document) -> None:
+    def fingerprint(self) -> str | None:
+        """
+        Get the fingerprint of the content the rendered section depends on, besides its images and the configuration
+
+        Returns
+        -------
+        str | None
+            The fingerprint, None if the rendered section must not be cached
+        """
+        return None
+
+    def render(self, document: Document, context: RenderContext | None = None) -> None:
         """
         Render the section
 
@@ -37,10 +79,20 @@ class Section:
         ----------
         document : Document
             Document object to render the section
+        context : RenderContext, optional
+            The render context holding the cursor of the document, created if not given
         """
-        for element in self.elements:
-            element.render(document)
-        insert_page_break(document)
+        context = context or RenderContext(document)
+        with PROFILER.stage(type(self).__name__, "section", title=getattr(self, "title", "")) as record:
+            body = context.document.element.body
+            # the content is inserted in front of the body sectPr, which stays the last child
+            start = len(body) - 1
+            for element in self.elements:
+                with PROFILER.stage(type(element).__name__, "element"):
+                    element.render(document, context)
+            insert_page_break(context)
+            if record is not None:
+                record.args.update(_count_content(body[start:-1]))
 
 
 class CaseSection(Section):
@@ -58,12 +110,13 @@ class CaseSection(Section):
             Dictionary containing the case section information
         """
         super().__init__()
+        self.section_dict = section_dict
         self.title = section_dict.get("title", "")
         self.result = section_dict.get("result", "")
         self.info = self._format_info(section_dict.get("settings", {}))
         self.condition_result = section_dict.get("condition_result", {})
         self.image_path = section_dict.get("image_path", Path())
-        logger.info(f"Initialize a CaseSection for case {self.title}")
+        logger.debug("Initialize a CaseSection for case %s", self.title)
 
     def create_section(self) -> None:
         """
@@ -71,13 +124,28 @@ class CaseSection(Section):
         """
         self.add_element(Title(text=self.title, level=1))
         if self.result == "PASSED":
-            self.add_element(Paragraph(title='', text=self.result, text_format=PositiveStatusTextFormat()))
+            self.add_element(Paragraph(title='', text=self.result, text_format=PositiveStatusTextFormat.shared()))
         elif self.result == "FAILED":
-            self.add_element(Paragraph(title='', text=self.result, text_format=NegativeStatusTextFormat()))
-        self.add_element(Paragraph(title='Test-Settings', text=self.info, text_format=NormalTextFormat()))
+            self.add_element(Paragraph(title='', text=self.result, text_format=NegativeStatusTextFormat.shared()))
+        self.add_element(Paragraph(title='Test-Settings', text=self.info, text_format=NormalTextFormat.shared()))
         self.add_element(Tables(condition_result=self.condition_result))
         self.add_element(Image(case_name=self.title, image_path=self.image_path))
-        logger.info(f"Create a CaseSection for case {self.title}")
+        logger.debug("Create a CaseSection for case %s", self.title)
+
+    def fingerprint(self) -> str | None:
+        """
+        Get the fingerprint of the elements of the section with all their content, so an element added or changed after
+        `create_section` changes it as well
+
+        Returns
+        -------
+        str | None
+            The fingerprint, None if the section is not created yet
+        """
+        if not self.elements:
+            return None
+        return json.dumps({"section": type(self).__name__, "elements": self.elements}, sort_keys=True,
+                          default=_json_default)
 
     @staticmethod
     def _format_info(info: Dict[str, str]) -> str:
@@ -94,5 +162,5 @@ class CaseSection(Section):
         str
             Formatted information
         """
-        logger.info("Format the settings information to a string.")
+        logger.debug("Format the settings information to a string.")
         return ", ".join([f"{key}: {value}" for key, value in info.items()])
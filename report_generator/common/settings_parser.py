@@ -3,6 +3,7 @@
 """
 import ast
 import configparser
+import os
 from pathlib import Path
 import threading
 from typing import Any, overload
@@ -26,10 +27,14 @@ class MultiSingletonMeta(type):
 class SettingsParser(metaclass=MultiSingletonMeta):
     """A customized parser for settings file, inline comment is supported.
 
-    Default comment prefixes are '#' and ';'
+    Default comment prefixes are '#' and ';'. The converted values of every section are kept until the modification
+    time of the settings file changes, then the file is read again.
     """
     def __init__(self, settings_file: Path):
         self._parser = configparser.RawConfigParser(inline_comment_prefixes=("#", ";"))
+        self._sections: dict[str, dict] = {}
+        self._mtime_ns: int | None = None
+        self._lock = threading.Lock()
         self.settings_file = settings_file
 
     @property
@@ -56,7 +61,30 @@ class SettingsParser(metaclass=MultiSingletonMeta):
             raise FileNotFoundError(f"The input settings file '{settings_file}' does not exist.")
 
         self._settings_file = settings_file
-        self._parser.read(self._settings_file)
+        with self._lock:
+            self._read()
+
+    def _read(self) -> None:
+        """To read the settings file into a new parser and drop the converted sections
+        """
+        parser = configparser.RawConfigParser(inline_comment_prefixes=("#", ";"))
+        self._mtime_ns = os.stat(self._settings_file).st_mtime_ns
+        parser.read(self._settings_file)
+        self._parser = parser
+        self._sections = {}
+
+    def _refresh(self) -> None:
+        """To read the settings file again if it was modified since it was read
+        """
+        try:
+            mtime_ns = os.stat(self._settings_file).st_mtime_ns
+        except OSError:
+            # keep the settings read before if the file is removed while running
+            return
+        if mtime_ns != self._mtime_ns:
+            with self._lock:
+                if mtime_ns != self._mtime_ns:
+                    self._read()
 
     @property
     def sections(self) -> list[str]:
@@ -67,6 +95,7 @@ class SettingsParser(metaclass=MultiSingletonMeta):
         list[str]
             A list of sections of settings file
         """
+        self._refresh()
         return self._parser.sections()
 
     @overload
@@ -122,13 +151,20 @@ class SettingsParser(metaclass=MultiSingletonMeta):
         dict | str | Any
             The kv-pairs dict of section and option value
         """
-        if self._parser.has_section(section):
-            kv_pairs = self._convert_dict_string_value({k: v for k, v in self._parser.items(section)})
-        else:
-            kv_pairs = {}
+        self._refresh()
+        # the parser and the converted sections are swapped together by `_read`, so both are used under the lock
+        with self._lock:
+            kv_pairs = self._sections.get(section)
+            if kv_pairs is None:
+                if self._parser.has_section(section):
+                    kv_pairs = self._convert_dict_string_value({k: v for k, v in self._parser.items(section)})
+                else:
+                    kv_pairs = {}
+                self._sections[section] = kv_pairs
 
         if not option:
-            return kv_pairs
+            # a copy, so the caller cannot change the kept section
+            return dict(kv_pairs)
 
         option_value = kv_pairs.get(option, default)
 
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""A module for writing large tables directly as `w:tbl` xml in a single pass"""
+from collections.abc import Iterable
+from copy import deepcopy
+from itertools import chain
+
+from docx.enum.text import WD_LINE_SPACING, WD_PARAGRAPH_ALIGNMENT
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.oxml.table import CT_Tbl
+from docx.shared import Emu, Length
+from docx.text.paragraph import Paragraph
+
+
+_SPECIAL_CHARACTERS = ('\t', '\n', '\r')
+
+
+class BulkTableWriter:
+    """
+    Writer for tables with a bordered cell and one formatted run per cell.
+
+    The cell properties, the paragraph properties and the run properties are built once through python-docx as
+    templates and deep-copied into every cell, so the generated xml is identical to the one of the python-docx
+    cell API without recomputing the table grid or the formatting per cell.
+    """
+
+    def __init__(self, text_format, line_spacing: float, first_column_width: Length):
+        """
+        Initialize the table writer and build the xml templates
+
+        Parameters
+        ----------
+        text_format : TextFormat
+            The text format of all cell texts
+        line_spacing : float
+            The line spacing of the cell paragraphs
+        first_column_width : Length
+            The width of the first column
+        """
+        self.first_column_width = first_column_width
+        self._rPr = self._build_run_properties(text_format)
+        self._left_pPr = self._build_paragraph_properties(line_spacing, WD_PARAGRAPH_ALIGNMENT.LEFT)
+        self._right_pPr = self._build_paragraph_properties(line_spacing, WD_PARAGRAPH_ALIGNMENT.RIGHT)
+        self._borders = self._build_borders()
+
+    @staticmethod
+    def _build_run_properties(text_format):
+        """
+        Build the `w:rPr` template by applying the text format to a scratch run
+        """
+        paragraph = Paragraph(OxmlElement('w:p'), None)
+        run = paragraph.add_run()
+        text_format.apply_format(run)
+        return run._r.rPr
+
+    @staticmethod
+    def _build_paragraph_properties(line_spacing: float, alignment):
+        """
+        Build the `w:pPr` template with the line spacing and the alignment of a cell paragraph
+        """
+        paragraph = Paragraph(OxmlElement('w:p'), None)
+        paragraph_format = paragraph.paragraph_format
+        paragraph_format.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
+        paragraph_format.line_spacing = line_spacing
+        paragraph.alignment = alignment
+        return paragraph._p.pPr
+
+    @staticmethod
+    def _build_borders():
+        """
+        Build the `w:tcBorders` template with a single black line on each side of the cell
+        """
+        tcBorders = OxmlElement('w:tcBorders')
+        for line in ['top', 'start', 'bottom', 'end']:
+            line_border = OxmlElement(f'w:{line}')
+            line_border.set(qn('w:val'), 'single')
+            line_border.set(qn('w:sz'), '4')
+            line_border.set(qn('w:space'), '0')
+            line_border.set(qn('w:color'), '000000')
+            tcBorders.append(line_border)
+        return tcBorders
+
+    @staticmethod
+    def _build_cell_properties(width: Length, borders=None):
+        """
+        Build a `w:tcPr` template with the cell width and optional borders
+        """
+        tcPr = OxmlElement('w:tcPr')
+        tcW = OxmlElement('w:tcW')
+        tcW.type = 'dxa'
+        tcW.w = Emu(width).twips
+        tcPr.append(tcW)
+        if borders is not None:
+            tcPr.append(deepcopy(borders))
+        return tcPr
+
+    def _build_cell_template(self, width: Length, pPr):
+        """
+        Build a bordered `w:tc` template with one paragraph, ending with the formatted run without text
+        """
+        tc = OxmlElement('w:tc')
+        tc.append(self._build_cell_properties(width, self._borders))
+        p = OxmlElement('w:p')
+        p.append(deepcopy(pPr))
+        # the python-docx cell api leaves an empty run when the cell text is cleared
+        p.append(OxmlElement('w:r'))
+        r = OxmlElement('w:r')
+        r.append(deepcopy(self._rPr))
+        p.append(r)
+        tc.append(p)
+        return tc
+
+    @staticmethod
+    def _set_run_text(r, text: str) -> None:
+        """
+        Add the text to the run like python-docx does
+        """
+        if not text:
+            return
+        if any(character in text for character in _SPECIAL_CHARACTERS):
+            # tabs and line breaks are converted to their own elements by python-docx
+            r.text = text
+            return
+        t = OxmlElement('w:t')
+        t.text = text
+        if len(text.strip()) < len(text):
+            t.set(qn('xml:space'), 'preserve')
+        r.append(t)
+
+    def build(self, data: Iterable[list], width: Length):
+        """
+        Build the table xml of the data
+
+        Parameters
+        ----------
+        data : Iterable[list]
+            The rows of the table, each row is a list of cell values, consumed once while the table is built
+        width : Length
+            The width of the table, distributed evenly over the columns of the grid
+
+        Returns
+        -------
+        CT_Tbl
+            The `w:tbl` element of the table
+        """
+        rows = iter(data)
+        first_row = next(rows, None)
+        cols = len(first_row) if first_row is not None else 0
+        tbl = CT_Tbl.new_tbl(0, cols, width)
+        if cols == 0:
+            return tbl
+
+        column_widths = [self.first_column_width] + [Length(width // cols)] * (cols - 1)
+        # the first column aligns left, the other columns align right
+        cell_templates = [self._build_cell_template(column_width, self._left_pPr if j == 0 else self._right_pPr)
+                          for j, column_width in enumerate(column_widths)]
+        # cells without data keep the plain python-docx cell content
+        empty_cell_templates = []
+        for column_width in column_widths:
+            tc = OxmlElement('w:tc')
+            tc.append(self._build_cell_properties(column_width))
+            tc.append(OxmlElement('w:p'))
+            empty_cell_templates.append(tc)
+
+        for row_data in chain([first_row], rows):
+            tr = OxmlElement('w:tr')
+            for j, cell_data in enumerate(row_data):
+                tc = deepcopy(cell_templates[j])
+                self._set_run_text(tc[-1][-1], str(cell_data))
+                tr.append(tc)
+            for j in range(len(row_data), cols):
+                tr.append(deepcopy(empty_cell_templates[j]))
+            tbl.append(tr)
+        return tbl
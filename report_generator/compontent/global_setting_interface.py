@@ -6,12 +6,17 @@ from docx.shared import Pt, Inches, RGBColor
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 
-from report_generator.compontent.settings import SETTINGS
+from report_generator.compontent.settings import get_config
 
 
 def insert_page_break(doc: Document) -> None:
     """
     Insert a page break to the document
+
+    Parameters
+    ----------
+    doc : Document
+        The document, or a render context of it, to add the page break paragraph to
     """
     # Create a new paragraph for the page break
     page_break_paragraph = doc.add_paragraph()
@@ -56,22 +61,18 @@ def set_global_formatting(doc: Document) -> None:
         The document to set the formatting
     """
     # Get the settings for the formatting
-    line_spacing = SETTINGS.get('line_spacing')
-    top_margin = SETTINGS.get('top_margin')
-    bottom_margin = SETTINGS.get('bottom_margin')
-    left_margin = SETTINGS.get('left_margin')
-    right_margin = SETTINGS.get('right_margin')
+    settings = get_config().settings
     # Set the margins
     section = doc.sections[0]
-    section.top_margin = Inches(top_margin if top_margin is not None else 1.0)
-    section.bottom_margin = Inches(bottom_margin if bottom_margin is not None else 1.0)
-    section.left_margin = Inches(left_margin if left_margin is not None else 1.0)
-    section.right_margin = Inches(right_margin if right_margin is not None else 1.0)
+    section.top_margin = Inches(settings.top_margin)
+    section.bottom_margin = Inches(settings.bottom_margin)
+    section.left_margin = Inches(settings.left_margin)
+    section.right_margin = Inches(settings.right_margin)
     # Set the line spacing
     for paragraph in doc.paragraphs:
         paragraph_format = paragraph.paragraph_format
         paragraph_format.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
-        paragraph_format.line_spacing = Pt((line_spacing if line_spacing is not None else 1.0) * 12)
+        paragraph_format.line_spacing = Pt(settings.line_spacing * 12)
 
 
 def add_page_number(paragraph: Paragraph) -> None:
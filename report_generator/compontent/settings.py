@@ -1,23 +1,380 @@
 # -*- coding: utf-8 -*-
+"""A module for the configuration of the report, parsed from the configuration file on first access
+
+The configuration file is parsed and validated once into the frozen `ReportConfig`. `SETTINGS` and `TEXT_FORMAT`
+provide its raw sections as read-only mappings. In long-running processes `reload_config` parses the file again only
+if it was modified, and notifies the caches built from the configuration.
+"""
 import json
+import os
+import threading
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from types import MappingProxyType, UnionType
+from typing import Any, Callable, get_args
+
+# the packaged configuration, independent of the working directory
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[1].joinpath("configuration", "config.json")
+
+_config_path: Path | str = DEFAULT_CONFIG_PATH
+_overrides: dict = {}
+_lock = threading.RLock()
+# the settings a null value falls back to the default for, like the global formatting did before the validation
+_DEFAULT_IF_NULL = ("line_spacing", "top_margin", "bottom_margin", "left_margin", "right_margin")
+
+
+@dataclass(frozen=True, slots=True)
+class ReportSettings:
+    """The validated `SETTINGS` of the configuration file"""
+    line_spacing: float = 1.0
+    top_margin: float = 1.0
+    bottom_margin: float = 1.0
+    left_margin: float = 1.0
+    right_margin: float = 1.0
+    header_text: str = ""
+    footer_text: str = ""
+    middle_footer_text: str = ""
+    logo_path: str | None = None
+    pdf_backend: str = "docx2pdf"
+    pdf_workers: int = 2
+    render_workers: int = 1
+    image_index_cache_dir: str | None = None
+    image_pipeline: bool = False
+    image_target_dpi: int = 150
+    image_format: str = "png"
+    image_quality: int = 85
+    image_cache_dir: str | None = "cache/images"
+    image_cache_max_bytes: int | None = None
+    evaluation_workers: int | None = None
+    measurement_cache_dir: str | None = None
+    time_signal: str = "Time"
+    signal_aliases: Mapping = field(default_factory=lambda: MappingProxyType({}))
+    fragment_cache_dir: str | None = None
+    fragment_cache_max_bytes: int = 1024 ** 3
+    pdf_incremental: bool = False
+    pdf_sections_per_fragment: int = 1
+    pdf_fragment_cache_dir: str | None = None
+    max_concurrent_reports: int = 2
+
+    @classmethod
+    def from_dict(cls, values: Mapping[str, Any]) -> 'ReportSettings':
+        """
+        Validate the settings, settings without a field are kept in `SETTINGS` only, a null line spacing or margin is
+        replaced by its default of 1.0
+
+        Parameters
+        ----------
+        values : Mapping[str, Any]
+            The settings of the configuration file
+
+        Returns
+        -------
+        ReportSettings
+            The validated settings
+        """
+        kwargs = {}
+        for settings_field in fields(cls):
+            if settings_field.name in _DEFAULT_IF_NULL and values.get(settings_field.name, 0) is None:
+                continue
+            if settings_field.name in values:
+                kwargs[settings_field.name] = _validate(f"SETTINGS.{settings_field.name}", values[settings_field.name],
+                                                        settings_field.type)
+        if isinstance(kwargs.get("signal_aliases"), Mapping):
+            kwargs["signal_aliases"] = MappingProxyType(dict(kwargs["signal_aliases"]))
+        return cls(**kwargs)
+
+
+@dataclass(frozen=True, slots=True)
+class TextFormatConfig:
+    """A validated text format of `TEXT_FORMAT`"""
+    font_name: str
+    font_size: int | float
+    color: tuple[int, int, int] = (0, 0, 0)
+    bold: bool = False
+    italic: bool = False
+    line_spacing: int | float | None = None
+    alignment: str | None = None
+
+    @classmethod
+    def from_dict(cls, name: str, values: Mapping[str, Any]) -> 'TextFormatConfig':
+        """
+        Validate a text format, the colors are given as `"(0x00, 0xFF, 0x00)"` and the flags as `"True"`/`"False"`
+
+        Parameters
+        ----------
+        name : str
+            The name of the text format for the error messages
+        values : Mapping[str, Any]
+            The text format of the configuration file
+
+        Returns
+        -------
+        TextFormatConfig
+            The validated text format
+        """
+        try:
+            color = values.get("color", "(0x00, 0x00, 0x00)")
+            if isinstance(color, str):
+                color = tuple(int(value, 16) for value in color.strip("()").split(","))
+            return cls(font_name=_validate(f"{name}.font_name", values["font_name"], str),
+                       font_size=_validate(f"{name}.font_size", values["font_size"], int | float),
+                       color=_validate_color(name, color),
+                       bold=_parse_flag(f"{name}.bold", values.get("bold", False)),
+                       italic=_parse_flag(f"{name}.italic", values.get("italic", False)),
+                       line_spacing=_validate(f"{name}.line_spacing", values.get("line_spacing"), int | float | None),
+                       alignment=_validate(f"{name}.alignment", values.get("alignment"), str | None))
+        except KeyError as e:
+            raise ValueError(f"The text format '{name}' has no {e.args[0]}.") from e
+
+
+@dataclass(frozen=True, slots=True)
+class ReportConfig:
+    """The validated configuration file"""
+    path: str
+    settings: ReportSettings
+    text_formats: Mapping[str, TextFormatConfig]
+    mtime_ns: int | None = None
+
+
+def _validate(name: str, value: Any, expected: Any) -> Any:
+    """
+    Check the type of a configuration value, an integer is accepted for a float
+    """
+    types = tuple(getattr(allowed, "__origin__", allowed) for allowed in
+                  (get_args(expected) if isinstance(expected, UnionType) else (expected,)))
+    types = tuple(type(None) if allowed is None else allowed for allowed in types)
+    if isinstance(value, bool) and bool not in types:
+        raise ValueError(f"The configuration value {name} must be {expected}, got {value!r}.")
+    if float in types and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if not isinstance(value, types):
+        raise ValueError(f"The configuration value {name} must be {expected}, got {value!r}.")
+    return value
+
+
+def _validate_color(name: str, color: Any) -> tuple[int, int, int]:
+    """
+    Check a color of three channel values from 0 to 255
+    """
+    if not isinstance(color, (tuple, list)) or len(color) != 3 \
+            or not all(isinstance(value, int) and 0 <= value <= 255 for value in color):
+        raise ValueError(f"The configuration value {name}.color must be three values from 0x00 to 0xFF, got {color!r}.")
+    return tuple(color)
+
+
+def _parse_flag(name: str, value: Any) -> bool:
+    """
+    Parse a flag given as boolean or as `"True"`/`"False"`
+    """
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return _validate(name, value, bool)
+
+
+def _compile_text_formats(text_formats: Mapping[str, Any]) -> dict[str, TextFormatConfig]:
+    """
+    Validate the text formats, the nested levels of a format are named `<FORMAT>.<LEVEL>`, e.g. `TITLE.L1`
+    """
+    compiled = {}
+    for name, values in text_formats.items():
+        if "font_name" in values:
+            compiled[name] = TextFormatConfig.from_dict(name, values)
+        else:
+            for level, level_values in values.items():
+                compiled[f"{name}.{level}"] = TextFormatConfig.from_dict(f"{name}.{level}", level_values)
+    return compiled
+
+
+class LazyConfig(Mapping):
+    """
+    A read-only section of the configuration file, which is parsed on the first access of any section
+    """
+
+    def __init__(self, section: str):
+        """
+        Initialize the lazy configuration section
+
+        Parameters
+        ----------
+        section : str
+            The name of the section in the configuration file
+        """
+        self.section = section
+        self._data: dict | None = None
+
+    def _load(self) -> dict:
+        """
+        Get the values of the section, the configuration file is parsed if not done yet
+        """
+        if self._data is None:
+            with _lock:
+                if self._data is None:
+                    parse_config_file(_config_path)
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
 
-from report_generator.module.args_parse import args_parse
+    def __len__(self) -> int:
+        return len(self._load())
 
-SETTINGS: dict = {}
-TEXT_FORMAT: dict = {}
-args = args_parse()
+    def __repr__(self) -> str:
+        return f"LazyConfig({self.section!r}, loaded={self._data is not None})"
 
 
-def parse_config_file(config_path: str):
+SETTINGS = LazyConfig("SETTINGS")
+TEXT_FORMAT = LazyConfig("TEXT_FORMAT")
+_config: ReportConfig | None = None
+_reload_listeners: list[Callable[[], None]] = []
+
+
+def _mtime_ns(config_path: Path | str) -> int | None:
+    """
+    Get the modification time of the configuration file, None if it does not exist
+    """
+    try:
+        return os.stat(config_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def parse_config_file(config_path: Path | str):
     """
-    Parse the configuration file to fill the settings
+    Parse and validate the configuration file to fill the settings, an invalid file keeps the previous settings
     """
+    global _config
+    mtime_ns = _mtime_ns(config_path)
     with open(config_path, "r", encoding="utf-8") as f:
         config = json.load(f)
-    for key, value in config["SETTINGS"].items():
-        SETTINGS[key] = value
-    for key, value in config["TEXT_FORMAT"].items():
-        TEXT_FORMAT[key] = value
+    settings = {**config["SETTINGS"], **_overrides}
+    report_config = ReportConfig(path=str(config_path), settings=ReportSettings.from_dict(settings),
+                                 text_formats=MappingProxyType(_compile_text_formats(config["TEXT_FORMAT"])),
+                                 mtime_ns=mtime_ns)
+    with _lock:
+        _config = report_config
+        SETTINGS._data = settings
+        TEXT_FORMAT._data = dict(config["TEXT_FORMAT"])
+
+
+def get_config() -> ReportConfig:
+    """
+    Get the validated configuration, the configuration file is parsed on the first call
+
+    Returns
+    -------
+    ReportConfig
+        The frozen configuration
+    """
+    if _config is None:
+        with _lock:
+            if _config is None:
+                parse_config_file(_config_path)
+    return _config
+
+
+def on_config_reload(listener: Callable[[], None]) -> None:
+    """
+    Register a function called whenever the configuration changes, e.g. to clear a cache built from it
+
+    Parameters
+    ----------
+    listener : Callable[[], None]
+        The function to call
+    """
+    with _lock:
+        _reload_listeners.append(listener)
+
+
+def _notify_reload() -> None:
+    """
+    Call the registered reload listeners
+    """
+    for listener in list(_reload_listeners):
+        listener()
 
 
-parse_config_file(args.config)
+def reload_config(force: bool = False) -> bool:
+    """
+    Parse the configuration file again if it was modified since it was parsed, e.g. before every job of a
+    long-running process. The check costs a single `stat` of the file.
+
+    Parameters
+    ----------
+    force : bool, optional
+        Parse the file even if it was not modified, by default False
+
+    Returns
+    -------
+    bool
+        Whether the configuration was parsed again
+    """
+    with _lock:
+        if _config is not None and not force and _mtime_ns(_config_path) == _config.mtime_ns:
+            return False
+        parse_config_file(_config_path)
+    _notify_reload()
+    return True
+
+
+def configure(config_path: Path | str | None = None, reset: bool = False, **settings: Any) -> None:
+    """
+    Configure the report generation explicitly, e.g. when used as library instead of the command line
+
+    The configuration file is parsed on the next access of the settings, so the function is cheap and should be
+    called before any report is rendered.
+
+    Parameters
+    ----------
+    config_path : Path | str | None, optional
+        The path to the configuration file, stored as absolute path. By default the configured path is kept
+    reset : bool, optional
+        Drop the overrides of previous calls before applying the given ones, by default False
+    **settings : Any
+        Values overriding the `SETTINGS` of the configuration file, e.g. `pdf_backend="none"`
+    """
+    global _config_path, _config
+    with _lock:
+        loaded = _config is not None
+        if config_path is not None:
+            # a relative path must not depend on the working directory of later worker processes
+            _config_path = os.path.abspath(config_path)
+        if reset:
+            _overrides.clear()
+        _overrides.update(settings)
+        _config = None
+        SETTINGS._data = None
+        TEXT_FORMAT._data = None
+    if loaded:
+        _notify_reload()
+
+
+def worker_configuration() -> tuple[str, dict]:
+    """
+    Get the arguments of `configure_worker` to configure a worker process like the current process
+
+    Returns
+    -------
+    tuple[str, dict]
+        The absolute path to the configuration file and the overrides of its settings
+    """
+    with _lock:
+        return os.path.abspath(_config_path), dict(_overrides)
+
+
+def configure_worker(config_path: str, overrides: dict) -> None:
+    """
+    Configure a worker process, used as initializer of the process pools, since a spawned worker would otherwise parse
+    the default configuration file without the overrides
+
+    Parameters
+    ----------
+    config_path : str
+        The path to the configuration file
+    overrides : dict
+        The values overriding the `SETTINGS` of the configuration file
+    """
+    configure(config_path, reset=True, **overrides)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import argparse
 
+from report_generator.compontent.settings import DEFAULT_CONFIG_PATH
+
 
 def args_parse():
     """
@@ -10,7 +12,7 @@ def args_parse():
     parser.add_argument(
         "--config",
         type=str,
-        default="report_generator/configuration/config.json",
+        default=str(DEFAULT_CONFIG_PATH),
         help="The path to the configuration file"
     )
     parser.add_argument(
@@ -19,4 +21,75 @@ def args_parse():
         default="test_results/test_report.docx",
         help="The path to the output file"
     )
+    parser.add_argument(
+        "--cases",
+        type=str,
+        default=None,
+        help="The path to a json (or json-lines) file with the full case list, '-' reads the list from stdin"
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Append the cases to an already rendered output document instead of creating a new one"
+    )
+    parser.add_argument(
+        "--pdf-backend",
+        type=str,
+        default=None,
+        choices=["docx2pdf", "libreoffice", "none"],
+        help="The backend converting the report to PDF, 'none' skips the conversion (default: the configured backend)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the rendered sections into the output document to keep the memory bounded for large case lists"
+    )
+    parser.add_argument(
+        "--incremental-pdf",
+        action="store_true",
+        help="Convert every section to a cached PDF fragment and merge the fragments instead of converting the whole "
+             "report, only changed sections are converted again (requires pypdf)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="The number of processes rendering the sections in parallel, or the jobs of the render daemon "
+             "(default: the configured render workers, one per cpu for the daemon)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the render daemon accepting report jobs over HTTP instead of rendering a single report"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="The local port of the render daemon (default: 8765)"
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="The Unix socket of the render daemon, used instead of the port"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=100,
+        help="The maximum number of queued and running jobs of the render daemon, more are rejected (default: 100)"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Write the wall time, cpu time, allocated memory and counts of the render stages to this json file"
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        help="Write the render stages as Chrome trace event file, viewable in chrome://tracing or Perfetto"
+    )
     return parser.parse_args()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""A module for loading the case list of a report from a file or stdin"""
+import json
+import sys
+from pathlib import Path
+
+
+def load_case_list(source: str) -> list[dict]:
+    """
+    Load the full case list of a report
+
+    The source is either a json file containing a list of case dictionaries, a json-lines file (suffix `.jsonl`)
+    with one case dictionary per line, or '-' to read the json list from stdin.
+
+    Parameters
+    ----------
+    source : str
+        The path to the case list file, or '-' for stdin
+
+    Returns
+    -------
+    list[dict]
+        The case dictionaries in report order
+    """
+    if source == "-":
+        content = sys.stdin.read()
+        suffix = ""
+    else:
+        path = Path(source)
+        if not path.is_file():
+            raise FileNotFoundError(f"The input case list '{path}' does not exist.")
+        content = path.read_text(encoding="utf-8")
+        suffix = path.suffix.lower()
+
+    if suffix == ".jsonl":
+        cases = [json.loads(line) for line in content.splitlines() if line.strip()]
+    else:
+        cases = json.loads(content)
+
+    if not isinstance(cases, list):
+        raise ValueError(f"The case list '{source}' must contain a list of case dictionaries.")
+
+    return cases
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""A module for evaluating the test conditions of the cases over the measurement signals
+
+A condition is a pair of an expression and a quantifier, e.g. `['SG_TTC > 1.5', 'all']`. The expression is a python
+comparison of signals and numbers, combined with `and`, `or`, `not`, arithmetic and `abs`. The quantifier decides
+whether the expression has to hold for all samples (`all`) or for at least one sample (`any`), optionally limited to
+a time window in seconds, e.g. `all[2.0:5.5]` or `any[3:]`. Samples where a signal of the expression is not a number
+are ignored.
+
+Every expression is compiled once into a predicate of numpy operations over the whole signal arrays.
+"""
+import ast
+import operator
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable, Mapping
+
+import numpy as np
+
+from report_generator.module.measurement_loader import load_measurement
+
+
+_BINARY_OPERATORS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide, ast.Mod: np.mod,
+    ast.Pow: np.power,
+}
+_COMPARE_OPERATORS = {
+    ast.Gt: np.greater, ast.GtE: np.greater_equal, ast.Lt: np.less, ast.LtE: np.less_equal, ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+_FUNCTIONS = {"abs": np.abs}
+_QUANTIFIER_PATTERN = re.compile(r"^\s*(all|any)\s*(?:\[\s*([-+.\deE]*)\s*:\s*([-+.\deE]*)\s*\])?\s*$")
+
+Predicate = Callable[[Mapping[str, np.ndarray]], np.ndarray]
+
+
+def _compile_node(node: ast.AST, aliases: Mapping[str, str], signals: set) -> Predicate:
+    """
+    Compile an expression node into a function of the signal arrays
+
+    Parameters
+    ----------
+    node : ast.AST
+        The node of the parsed expression
+    aliases : Mapping[str, str]
+        The measurement signal of each alias name
+    signals : set
+        The set the measurement signals of the expression are added to
+
+    Returns
+    -------
+    Predicate
+        The function evaluating the node over the signal arrays
+    """
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, aliases, signals)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = float(node.value)
+        return lambda columns: value
+    if isinstance(node, ast.Name):
+        signal = aliases.get(node.id, node.id)
+        signals.add(signal)
+        return operator.itemgetter(signal)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd, ast.Not)):
+        operand = _compile_node(node.operand, aliases, signals)
+        function = {ast.USub: np.negative, ast.UAdd: np.positive, ast.Not: np.logical_not}[type(node.op)]
+        return lambda columns: function(operand(columns))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left, right = _compile_node(node.left, aliases, signals), _compile_node(node.right, aliases, signals)
+        function = _BINARY_OPERATORS[type(node.op)]
+        return lambda columns: function(left(columns), right(columns))
+    if isinstance(node, ast.BoolOp):
+        return _compile_bool_op(node, aliases, signals)
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPERATORS for op in node.ops):
+        return _compile_compare(node, aliases, signals)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS \
+            and len(node.args) == 1 and not node.keywords:
+        argument = _compile_node(node.args[0], aliases, signals)
+        function = _FUNCTIONS[node.func.id]
+        return lambda columns: function(argument(columns))
+    raise ValueError(f"Unsupported syntax '{ast.unparse(node)}' in condition expression.")
+
+
+def _compile_bool_op(node: ast.BoolOp, aliases: Mapping[str, str], signals: set) -> Predicate:
+    """
+    Compile an `and` or `or` of expressions into the element-wise logical operation
+    """
+    operands = [_compile_node(value, aliases, signals) for value in node.values]
+    function = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+    def bool_op(columns):
+        result = operands[0](columns)
+        for operand in operands[1:]:
+            result = function(result, operand(columns))
+        return result
+    return bool_op
+
+
+def _compile_compare(node: ast.Compare, aliases: Mapping[str, str], signals: set) -> Predicate:
+    """
+    Compile a comparison into the element-wise comparison, a chained comparison `a < b < c` holds if every single
+    comparison holds
+    """
+    operands = [_compile_node(value, aliases, signals) for value in [node.left] + node.comparators]
+    functions = [_COMPARE_OPERATORS[type(op)] for op in node.ops]
+
+    def compare(columns):
+        values = [operand(columns) for operand in operands]
+        result = functions[0](values[0], values[1])
+        for i, function in enumerate(functions[1:], start=1):
+            result = np.logical_and(result, function(values[i], values[i + 1]))
+        return result
+    return compare
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """A condition compiled into a vectorized predicate"""
+    expression: str
+    quantifier: str
+    predicate: Predicate
+    signals: frozenset
+    window: tuple[float, float] | None = None
+
+    def evaluate(self, columns: Mapping[str, np.ndarray], time: np.ndarray | None = None) -> bool:
+        """
+        Evaluate the condition over the signal arrays
+
+        Parameters
+        ----------
+        columns : Mapping[str, np.ndarray]
+            The arrays of the signals of the condition
+        time : np.ndarray | None, optional
+            The time of the samples in seconds, required for a time window
+
+        Returns
+        -------
+        bool
+            Whether the condition holds
+        """
+        # an expression without signals is a constant, which applies to every sample
+        length = len(next(iter(columns.values()))) if columns else (len(time) if time is not None else 1)
+        holds = np.broadcast_to(np.asarray(self.predicate(columns), dtype=bool), (length,))
+        valid = np.ones(holds.shape, dtype=bool)
+        for signal in self.signals:
+            valid &= ~np.isnan(columns[signal])
+        if self.window is not None:
+            if time is None:
+                raise ValueError(f"The condition '{self.expression}' with quantifier '{self.quantifier}' requires a "
+                                 f"time signal.")
+            valid &= (time >= self.window[0]) & (time <= self.window[1])
+        if self.quantifier.startswith("all"):
+            return bool(valid.any() and holds[valid].all())
+        return bool((holds & valid).any())
+
+
+def _parse_quantifier(quantifier: str) -> tuple[str, tuple[float, float] | None]:
+    """
+    Parse a quantifier into its kind and time window
+    """
+    match = _QUANTIFIER_PATTERN.match(quantifier)
+    if match is None:
+        raise ValueError(f"Unsupported quantifier '{quantifier}', use 'all' or 'any' with an optional time window "
+                         f"like 'all[2.0:5.5]'.")
+    kind, start, end = match.groups()
+    if start is None and end is None:
+        return kind, None
+    return kind, (float(start) if start else -np.inf, float(end) if end else np.inf)
+
+
+@lru_cache(maxsize=4096)
+def _compile_condition(expression: str, quantifier: str, aliases: tuple[tuple[str, str], ...]) -> CompiledCondition:
+    """
+    Compile a condition once per expression, quantifier and aliases
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition expression '{expression}': {e.msg}") from e
+    signals: set = set()
+    predicate = _compile_node(tree, dict(aliases), signals)
+    kind, window = _parse_quantifier(quantifier)
+    return CompiledCondition(expression=expression, quantifier=kind, predicate=predicate, signals=frozenset(signals),
+                             window=window)
+
+
+def compile_condition(condition: list[str], aliases: Mapping[str, str] | None = None) -> CompiledCondition:
+    """
+    Compile a condition into a vectorized predicate, compiled conditions are reused
+
+    Parameters
+    ----------
+    condition : list[str]
+        The expression and the quantifier, e.g. `['SG_TTC > 1.5', 'all']`
+    aliases : Mapping[str, str] | None, optional
+        The measurement signal of each alias name used in expressions
+
+    Returns
+    -------
+    CompiledCondition
+        The compiled condition
+    """
+    if len(condition) != 2:
+        raise ValueError(f"A condition is a pair of expression and quantifier, got {condition}.")
+    expression, quantifier = condition
+    return _compile_condition(expression, quantifier, tuple(sorted((aliases or {}).items())))
+
+
+class ConditionEngine:
+    """
+    Engine evaluating the conditions of a case over its measurement files.
+
+    Each measurement file is loaded once with exactly the signals all conditions refer to.
+    """
+
+    def __init__(self, aliases: Mapping[str, str] | None = None, time_signal: str = "Time",
+                 cache_dir: Path | str | None = None):
+        """
+        Initialize the condition engine
+
+        Parameters
+        ----------
+        aliases : Mapping[str, str] | None, optional
+            The measurement signal of each alias name used in expressions
+        time_signal : str, optional
+            The signal with the time in seconds for time windows, by default "Time"
+        cache_dir : Path | str | None, optional
+            The directory of the measurement signal cache, by default the files are parsed without cache
+        """
+        self.aliases = dict(aliases or {})
+        self.time_signal = time_signal
+        self.cache_dir = cache_dir
+
+    def compile(self, conditions: Iterable[list[str]]) -> list[CompiledCondition]:
+        """
+        Compile the conditions with the aliases of the engine
+
+        Parameters
+        ----------
+        conditions : Iterable[list[str]]
+            The expression and quantifier pairs
+
+        Returns
+        -------
+        list[CompiledCondition]
+            The compiled conditions
+        """
+        return [compile_condition(condition, self.aliases) for condition in conditions]
+
+    def evaluate_columns(self, conditions: Iterable[list[str]], columns: Mapping[str, np.ndarray]) \
+            -> list[tuple[list[str], bool]]:
+        """
+        Evaluate the conditions over signal arrays
+
+        Parameters
+        ----------
+        conditions : Iterable[list[str]]
+            The expression and quantifier pairs
+        columns : Mapping[str, np.ndarray]
+            The signal arrays
+
+        Returns
+        -------
+        list[tuple[list[str], bool]]
+            The condition and whether it holds, in the order of the conditions
+        """
+        conditions = [list(condition) for condition in conditions]
+        compiled = self.compile(conditions)
+        time = columns.get(self.time_signal)
+        return [(condition, compiled_condition.evaluate({signal: columns[signal] for signal in compiled_condition.signals},
+                                                        time))
+                for condition, compiled_condition in zip(conditions, compiled)]
+
+    def load_signals(self, path: Path | str, conditions: Iterable[list[str]]) -> Mapping[str, np.ndarray]:
+        """
+        Load the signals of a measurement file the conditions refer to
+
+        The time signal is loaded as well if a condition has a time window.
+
+        Parameters
+        ----------
+        path : Path | str
+            The path to the measurement file
+        conditions : Iterable[list[str]]
+            The expression and quantifier pairs
+
+        Returns
+        -------
+        Mapping[str, np.ndarray]
+            The signal arrays
+        """
+        compiled = self.compile(conditions)
+        signals = set().union(*(condition.signals for condition in compiled))
+        if any(condition.window is not None for condition in compiled):
+            signals.add(self.time_signal)
+        return load_measurement(path, signals=signals, cache_dir=self.cache_dir).signals
+
+    def evaluate_file(self, path: Path | str, conditions: Iterable[list[str]]) -> list[tuple[list[str], bool]]:
+        """
+        Evaluate the conditions over a measurement file
+
+        Parameters
+        ----------
+        path : Path | str
+            The path to the measurement file
+        conditions : Iterable[list[str]]
+            The expression and quantifier pairs
+
+        Returns
+        -------
+        list[tuple[list[str], bool]]
+            The condition and whether it holds, in the order of the conditions
+        """
+        conditions = [list(condition) for condition in conditions]
+        return self.evaluate_columns(conditions, self.load_signals(path, conditions))
+
+    def evaluate(self, files: Mapping[str, Path | str], conditions: Iterable[list[str]]) \
+            -> dict[str, list[tuple[list[str], bool]]]:
+        """
+        Evaluate the conditions over every measurement file of a case
+
+        Parameters
+        ----------
+        files : Mapping[str, Path | str]
+            The measurement file path of each file key
+        conditions : Iterable[list[str]]
+            The expression and quantifier pairs
+
+        Returns
+        -------
+        dict[str, list[tuple[list[str], bool]]]
+            The condition results of each file key, the `condition_result` of a case
+        """
+        conditions = [list(condition) for condition in conditions]
+        return {file_key: self.evaluate_file(path, conditions) for file_key, path in files.items()}
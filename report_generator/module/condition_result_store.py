@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""A module for storing the condition results of many cases in columns
+
+The `condition_result` of a case is a dictionary of lists of condition and result pairs per file key. For campaigns
+with millions of evaluated conditions these small lists dominate the memory, so the store keeps every distinct
+condition once and the results of all cases in flat columns:
+
+    condition_index  the interned condition of every result
+    results          whether the condition holds
+    file offsets     the first result of every file, the files of a case are contiguous
+
+The verdicts, condition counts and pass rates of all files and cases are computed with vectorized reductions, the
+table rows of a file are produced lazily when its table is rendered.
+"""
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ConditionSummary:
+    """The condition counts and failures of every file and case of a store"""
+    file_conditions: np.ndarray
+    file_failed: np.ndarray
+    case_conditions: np.ndarray
+    case_failed: np.ndarray
+
+    @property
+    def file_passed(self) -> np.ndarray:
+        """Whether all conditions of a file hold"""
+        return self.file_failed == 0
+
+    @property
+    def case_passed(self) -> np.ndarray:
+        """Whether all conditions of all files of a case hold"""
+        return self.case_failed == 0
+
+    @property
+    def file_pass_rate(self) -> np.ndarray:
+        """The share of the conditions of a file which hold, 1.0 for a file without conditions"""
+        return _pass_rate(self.file_conditions, self.file_failed)
+
+    @property
+    def case_pass_rate(self) -> np.ndarray:
+        """The share of the conditions of all files of a case which hold, 1.0 for a case without conditions"""
+        return _pass_rate(self.case_conditions, self.case_failed)
+
+
+def _pass_rate(conditions: np.ndarray, failed: np.ndarray) -> np.ndarray:
+    """
+    Get the share of the passed conditions, an empty condition list passes like `all([])`
+    """
+    rate = np.ones(len(conditions), dtype=np.float64)
+    np.divide(conditions - failed, conditions, out=rate, where=conditions > 0)
+    return rate
+
+
+class ConditionResultStore:
+    """
+    Columnar store of the condition results of many cases.
+
+    The cases are added one after another, the files of a case right after the case. The columns are compact arrays,
+    one byte per result and four bytes per condition index, and every distinct condition is kept once.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty store
+        """
+        self._conditions: list[tuple[str, ...]] = []
+        self._condition_texts: list[str] = []
+        self._condition_ids: dict[tuple[str, ...], int] = {}
+        self._case_names: list[str] = []
+        self._case_file_start = array("q")
+        self._file_keys: list[str] = []
+        self._file_case = array("q")
+        self._file_start = array("q", [0])
+        self._file_failed = array("q")
+        self._condition_index = array("i")
+        self._results = array("b")
+
+    @classmethod
+    def from_condition_result(cls, condition_result: Mapping[str, Iterable[tuple[Sequence[str], bool]]],
+                              name: str = "") -> 'ConditionResultStore':
+        """
+        Create a store of a single case from its `condition_result` dictionary
+
+        Parameters
+        ----------
+        condition_result : Mapping[str, Iterable[tuple[Sequence[str], bool]]]
+            The condition and result pairs of every file key
+        name : str, optional
+            The name of the case, by default ""
+
+        Returns
+        -------
+        ConditionResultStore
+            The store with the case at index 0
+        """
+        store = cls()
+        store.add_case(name, condition_result)
+        return store
+
+    def __len__(self) -> int:
+        return len(self._case_names)
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the result columns in bytes, without the interned conditions"""
+        return sum(column.itemsize * len(column) for column in (
+            self._case_file_start, self._file_case, self._file_start, self._file_failed, self._condition_index,
+            self._results))
+
+    def _condition_id(self, condition: Sequence[str]) -> int:
+        """
+        Intern a condition
+        """
+        condition = tuple(condition)
+        condition_id = self._condition_ids.get(condition)
+        if condition_id is None:
+            condition_id = self._condition_ids[condition] = len(self._conditions)
+            self._conditions.append(tuple(sys.intern(part) for part in condition))
+            self._condition_texts.append(', '.join(condition))
+        return condition_id
+
+    def add_case(self, name: str, condition_result: Mapping[str, Iterable[tuple[Sequence[str], bool]]] | None = None) \
+            -> int:
+        """
+        Add a case, optionally with the condition results of its files
+
+        Parameters
+        ----------
+        name : str
+            The name of the case
+        condition_result : Mapping[str, Iterable[tuple[Sequence[str], bool]]] | None, optional
+            The condition and result pairs of every file key, the files can be added later with `add_file`
+
+        Returns
+        -------
+        int
+            The index of the case
+        """
+        case = len(self._case_names)
+        self._case_names.append(name)
+        self._case_file_start.append(len(self._file_keys))
+        for file_key, pairs in (condition_result or {}).items():
+            pairs = list(pairs)
+            self.add_file(case, file_key, [condition for condition, _ in pairs], [result for _, result in pairs])
+        return case
+
+    def add_file(self, case: int, file_key: str, conditions: Sequence[Sequence[str]], results: Iterable[bool]) -> int:
+        """
+        Add the condition results of a file to the last added case
+
+        Parameters
+        ----------
+        case : int
+            The index of the last added case
+        file_key : str
+            The file key of the results
+        conditions : Sequence[Sequence[str]]
+            The conditions, each as expression and quantifier
+        results : Iterable[bool]
+            Whether each condition holds
+
+        Returns
+        -------
+        int
+            The index of the file
+        """
+        if case != len(self._case_names) - 1:
+            raise ValueError(f"The files can only be added to the last added case {len(self._case_names) - 1}, "
+                             f"got {case}.")
+        results = np.fromiter(results, dtype=bool) if not isinstance(results, np.ndarray) else results.astype(bool)
+        if len(results) != len(conditions):
+            raise ValueError(f"The file '{file_key}' has {len(conditions)} conditions but {len(results)} results.")
+        file = len(self._file_keys)
+        self._file_keys.append(sys.intern(file_key))
+        self._file_case.append(case)
+        self._condition_index.extend(self._condition_id(condition) for condition in conditions)
+        self._results.frombytes(results.view(np.int8).tobytes())
+        self._file_start.append(len(self._results))
+        self._file_failed.append(len(results) - int(np.count_nonzero(results)))
+        return file
+
+    def _case_files(self, case: int) -> range:
+        """
+        Get the file indices of a case
+        """
+        end = self._case_file_start[case + 1] if case + 1 < len(self._case_names) else len(self._file_keys)
+        return range(self._case_file_start[case], end)
+
+    def summary(self) -> ConditionSummary:
+        """
+        Count the conditions and failures of all files and cases with vectorized reductions
+
+        Returns
+        -------
+        ConditionSummary
+            The condition counts and failures of every file and case
+        """
+        file_start = np.frombuffer(self._file_start, dtype=np.int64)
+        file_failed = np.frombuffer(self._file_failed, dtype=np.int64).copy()
+        file_conditions = np.diff(file_start)
+        file_case = np.frombuffer(self._file_case, dtype=np.int64)
+        cases = len(self._case_names)
+        return ConditionSummary(
+            file_conditions=file_conditions, file_failed=file_failed,
+            case_conditions=np.bincount(file_case, weights=file_conditions, minlength=cases).astype(np.int64),
+            case_failed=np.bincount(file_case, weights=file_failed, minlength=cases).astype(np.int64))
+
+    def case(self, case: int) -> 'CaseConditionResults':
+        """
+        Get the condition results of a case
+
+        Parameters
+        ----------
+        case : int
+            The index of the case
+
+        Returns
+        -------
+        CaseConditionResults
+            The read-only view of the condition results of the case
+        """
+        if not 0 <= case < len(self._case_names):
+            raise IndexError(f"The store has no case {case}.")
+        return CaseConditionResults(self, case)
+
+
+def _restore_case(name: str, condition_result: dict) -> 'CaseConditionResults':
+    """
+    Restore the pickled condition results of a case into a store of the single case
+    """
+    return ConditionResultStore.from_condition_result(condition_result, name).case(0)
+
+
+class CaseConditionResults(Mapping):
+    """
+    The condition results of a case in a `ConditionResultStore`, a read-only mapping like the `condition_result`
+    dictionary of a case. The `Tables` element renders its verdicts and rows without building the lists.
+    """
+
+    def __init__(self, store: ConditionResultStore, case: int):
+        """
+        Initialize the view of a case
+
+        Parameters
+        ----------
+        store : ConditionResultStore
+            The store of the condition results
+        case : int
+            The index of the case in the store
+        """
+        self.store = store
+        self.case = case
+
+    @property
+    def _files(self) -> range:
+        """The file indices of the case"""
+        return self.store._case_files(self.case)
+
+    @property
+    def passed(self) -> bool:
+        """Whether all conditions of all files of the case hold"""
+        return all(self.store._file_failed[file] == 0 for file in self._files)
+
+    def _file(self, file_key: str) -> int:
+        """
+        Get the index of a file of the case by its file key
+        """
+        for file in self._files:
+            if self.store._file_keys[file] == file_key:
+                return file
+        raise KeyError(file_key)
+
+    def __getitem__(self, file_key: str) -> list[tuple[list[str], bool]]:
+        store = self.store
+        file = self._file(file_key)
+        start, end = store._file_start[file], store._file_start[file + 1]
+        return [(list(store._conditions[condition]), bool(result))
+                for condition, result in zip(store._condition_index[start:end], store._results[start:end])]
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.store._file_keys[file] for file in self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __repr__(self) -> str:
+        return f"CaseConditionResults({self.store._case_names[self.case]!r}, files={len(self)})"
+
+    def __reduce__(self):
+        # a case is pickled with its own results only, not with the whole store
+        return _restore_case, (self.store._case_names[self.case], dict(self))
+
+    def files(self) -> Iterator[tuple[str, bool, Iterator[list[str]]]]:
+        """
+        Get the verdict and the table rows of every file of the case
+
+        Returns
+        -------
+        Iterator[tuple[str, bool, Iterator[list[str]]]]
+            The file key, whether all its conditions hold and the lazily produced table rows with a header row
+        """
+        for file in self._files:
+            yield self.store._file_keys[file], self.store._file_failed[file] == 0, self._rows(file)
+
+    def _rows(self, file: int) -> Iterator[list[str]]:
+        """
+        Produce the table rows of a file, the joined condition texts are shared by all rows
+        """
+        store = self.store
+        start, end = store._file_start[file], store._file_start[file + 1]
+        yield ["Expected Result", "Result"]
+        for condition, result in zip(store._condition_index[start:end], store._results[start:end]):
+            yield [store._condition_texts[condition], "Passed" if result else "Failed"]
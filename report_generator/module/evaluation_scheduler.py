@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""A module for evaluating the conditions of many cases over their measurement files in parallel
+
+A case to evaluate names its measurement files and conditions instead of a precomputed `condition_result`:
+
+    {"title": "CCRs_AEB_test_case_1", "measurements": {"file1": "path/file1.txt", "file2": "path/file2.txt"},
+     "conditions": [["external_relative_longitudinal_distance > 0", "all"]], ...}
+
+The conditions apply to every file, or are given per file key as dictionary.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping
+
+from report_generator.common.logger import logger
+from report_generator.module.condition_engine import ConditionEngine
+from report_generator.module.condition_result_store import CaseConditionResults, ConditionResultStore
+
+
+@dataclass
+class FileEvaluation:
+    """The condition results of a measurement file and the time spent on it"""
+    path: str
+    results: list[bool]
+    load_time: float
+    evaluation_time: float
+    worker: int
+
+    @property
+    def busy_time(self) -> float:
+        """The time the worker spent on the file"""
+        return self.load_time + self.evaluation_time
+
+
+def _evaluate_file(path: str, conditions: tuple[tuple[str, str], ...], aliases: dict, time_signal: str,
+                   cache_dir: str | None) -> FileEvaluation:
+    """
+    Load the signals of a measurement file and evaluate the conditions, run in a worker process
+
+    The signals are loaded memory-mapped from the measurement cache, so the pages of a file evaluated by several
+    workers are shared and the signal arrays never pass between the processes.
+    """
+    engine = ConditionEngine(aliases=aliases, time_signal=time_signal, cache_dir=cache_dir)
+    start = time.perf_counter()
+    columns = engine.load_signals(path, conditions)
+    loaded = time.perf_counter()
+    results = [result for _, result in engine.evaluate_columns(conditions, columns)]
+    return FileEvaluation(path=path, results=results, load_time=loaded - start,
+                          evaluation_time=time.perf_counter() - loaded, worker=os.getpid())
+
+
+class EvaluationScheduler:
+    """
+    Scheduler evaluating the measurement files of a batch of cases in a process pool.
+
+    Every distinct file and condition list is evaluated once. The cases are yielded in their order as soon as all their
+    files are evaluated, so the case sections are built while later files are still evaluated.
+    """
+
+    def __init__(self, workers: int | None = None, aliases: Mapping[str, str] | None = None, time_signal: str = "Time",
+                 cache_dir: Path | str | None = None, progress_interval: float = 5.0):
+        """
+        Initialize the evaluation scheduler
+
+        Parameters
+        ----------
+        workers : int | None, optional
+            The number of worker processes, by default the number of cpus
+        aliases : Mapping[str, str] | None, optional
+            The measurement signal of each alias name used in expressions
+        time_signal : str, optional
+            The signal with the time in seconds for time windows, by default "Time"
+        cache_dir : Path | str | None, optional
+            The directory of the measurement signal cache shared by the workers
+        progress_interval : float, optional
+            The minimum number of seconds between two progress logs, by default 5.0
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.aliases = dict(aliases or {})
+        self.time_signal = time_signal
+        self.cache_dir = str(cache_dir) if cache_dir is not None else None
+        self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self._finished = 0
+        self._total = 0
+        self._busy_time = 0.0
+        self._last_progress = 0.0
+        # the condition results of the evaluated cases of the last `evaluate_cases` call
+        self.store = ConditionResultStore()
+
+    @staticmethod
+    def _file_conditions(case: dict, file_key: str) -> tuple[tuple[str, str], ...]:
+        """
+        Get the conditions of a measurement file of a case
+        """
+        conditions = case.get("conditions", [])
+        if isinstance(conditions, dict):
+            conditions = conditions.get(file_key, [])
+        return tuple(tuple(condition) for condition in conditions)
+
+    def _on_finished(self, future: Future) -> None:
+        """
+        Count a finished file and log the progress
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        evaluation: FileEvaluation = future.result()
+        with self._lock:
+            self._finished += 1
+            self._busy_time += evaluation.busy_time
+            now = time.perf_counter()
+            log_progress = self._finished == self._total or now - self._last_progress >= self.progress_interval
+            if log_progress:
+                self._last_progress = now
+        logger.debug("Evaluate %s in worker %d: load %.3fs, evaluation %.3fs.", evaluation.path, evaluation.worker,
+                     evaluation.load_time, evaluation.evaluation_time)
+        if log_progress:
+            logger.info("Evaluated %d/%d measurement files (%.0f%%).", self._finished, self._total,
+                        self._finished / self._total * 100)
+
+    def _store_results(self, case: dict, file_tasks: dict) -> CaseConditionResults:
+        """
+        Add the evaluated files of a case to the condition result store
+        """
+        case_index = self.store.add_case(case.get("title", ""))
+        for file_key, (conditions, future) in file_tasks.items():
+            self.store.add_file(case_index, file_key, conditions, future.result().results)
+        return self.store.case(case_index)
+
+    def evaluate_cases(self, cases: Iterable[dict]) -> Iterator[dict]:
+        """
+        Evaluate the conditions of the cases over their measurement files
+
+        Cases with a `condition_result` or without `measurements` are passed through unchanged.
+
+        Parameters
+        ----------
+        cases : Iterable[dict]
+            The case dictionaries in report order
+
+        Yields
+        ------
+        dict
+            The case dictionaries with the `condition_result`, and the `result` if not given, in report order. The
+            evaluated condition results are `CaseConditionResults` of the `store` of the scheduler
+        """
+        cases = list(cases)
+        self.store = ConditionResultStore()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            tasks: dict[tuple, Future] = {}
+            case_tasks = []
+            for case in cases:
+                file_tasks = {}
+                if "measurements" in case and "condition_result" not in case:
+                    for file_key, path in case["measurements"].items():
+                        conditions = self._file_conditions(case, file_key)
+                        key = (str(path), conditions)
+                        if key not in tasks:
+                            tasks[key] = executor.submit(_evaluate_file, str(path), conditions, self.aliases,
+                                                         self.time_signal, self.cache_dir)
+                        file_tasks[file_key] = (conditions, tasks[key])
+                case_tasks.append(file_tasks)
+            with self._lock:
+                self._finished, self._total, self._busy_time, self._last_progress = 0, len(tasks), 0.0, 0.0
+            logger.info("Evaluate %d measurement files of %d cases with %d workers.", len(tasks), len(cases), self.workers)
+            for future in tasks.values():
+                future.add_done_callback(self._on_finished)
+
+            for case, file_tasks in zip(cases, case_tasks):
+                if file_tasks:
+                    case = {**case, "condition_result": self._store_results(case, file_tasks)}
+                    if "result" not in case:
+                        case["result"] = "PASSED" if case["condition_result"].passed else "FAILED"
+                yield case
+
+        duration = time.perf_counter() - start
+        if tasks:
+            logger.info("Evaluate %d measurement files in %.2fs, worker utilization %.0f%%.", len(tasks), duration,
+                        100 * self._busy_time / (duration * self.workers))
+            summary = self.store.summary()
+            logger.info("%d of %d evaluated cases and %d of %d files passed, the condition results take %.1f kB.",
+                        summary.case_passed.sum(), len(self.store), summary.file_passed.sum(),
+                        len(summary.file_passed), self.store.nbytes / 1024)
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""A module for caching the rendered fragments of unchanged sections across runs
+
+A cache entry holds the rendered body xml of a section, keyed by the fingerprint of the section content, the content
+hashes of its images and the configuration. The images are stored once per content hash in `media` and shared by all
+entries. The entries are evicted least recently used when the cache grows beyond its size limit.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from report_generator.common.fragment import FragmentRelationship, RenderedFragment
+from report_generator.common.logger import logger
+from report_generator.module.image_registry import get_image_bytes_cache
+
+
+# increase when the rendering changes, so the entries of older versions are never used
+_CACHE_VERSION = 1
+_BLOCK_SIZE = 1024 * 1024
+
+_file_digests: dict[tuple[str, int, int], str] = {}
+_file_digests_lock = threading.Lock()
+
+
+def file_digest(path: Path | str) -> str:
+    """
+    Get the sha256 of a file content, hashed once per path, size and modification time in the process
+
+    Parameters
+    ----------
+    path : Path | str
+        The path to the file
+
+    Returns
+    -------
+    str
+        The hex digest of the file content
+    """
+    stat = os.stat(path)
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    digest = _file_digests.get(key)
+    if digest is None:
+        content_hash = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(_BLOCK_SIZE):
+                content_hash.update(block)
+        digest = content_hash.hexdigest()
+        with _file_digests_lock:
+            _file_digests[key] = digest
+    return digest
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """
+    Write the content to a temporary file which replaces the file afterward
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class FragmentCacheStatistics:
+    """The hits, misses and evictions of a fragment cache"""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of the lookups which were hits"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class FragmentCache:
+    """
+    Persistent cache of the rendered fragments of sections, bounded by the size of its directory.
+
+    Every hit moves the modification time of the entry forward, the entries with the oldest modification time are
+    evicted first, the media no entry refers to anymore are removed with them.
+    """
+
+    def __init__(self, cache_dir: Path | str, max_bytes: int = 1024 ** 3):
+        """
+        Initialize the fragment cache
+
+        Parameters
+        ----------
+        cache_dir : Path | str
+            The directory of the cached fragments and media
+        max_bytes : int, optional
+            The maximum size of the cached fragments and media, by default 1 GiB
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.statistics = FragmentCacheStatistics()
+        self._entries_dir = self.cache_dir.joinpath("entries")
+        self._media_dir = self.cache_dir.joinpath("media")
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(fingerprint: str, image_paths: list[str], config_fingerprint: str) -> str:
+        """
+        Get the key of a section
+
+        Parameters
+        ----------
+        fingerprint : str
+            The fingerprint of the section content
+        image_paths : list[str]
+            The image files the section embeds, in render order
+        config_fingerprint : str
+            The fingerprint of the configuration
+
+        Returns
+        -------
+        str
+            The cache key
+        """
+        content = {"version": _CACHE_VERSION, "section": fingerprint, "config": config_fingerprint,
+                   "images": [file_digest(path) for path in image_paths]}
+        return hashlib.sha256(json.dumps(content).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self._entries_dir.joinpath(key[:2], f"{key}.pkl")
+
+    def _media_blob(self, digest: str) -> bytes:
+        """
+        Read a cached image through the process-wide image bytes cache, so the memory of the read media is bounded
+        """
+        return get_image_bytes_cache().read(str(self._media_dir.joinpath(digest)))
+
+    def get(self, key: str) -> RenderedFragment | None:
+        """
+        Get the cached fragment of a key
+
+        Parameters
+        ----------
+        key : str
+            The cache key of the section
+
+        Returns
+        -------
+        RenderedFragment | None
+            The fragment with its images, None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            body_xml, relationships = pickle.loads(path.read_bytes())
+            fragment = RenderedFragment(body_xml=body_xml, relationships={
+                rId: FragmentRelationship(reltype, target_ref, is_external,
+                                          blob=self._media_blob(digest) if digest else None)
+                for rId, (reltype, target_ref, is_external, digest) in relationships.items()})
+            os.utime(path)
+        except FileNotFoundError:
+            self.statistics.misses += 1
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError) as e:
+            logger.warning("Drop the unreadable fragment cache entry %s: %r", path, e)
+            path.unlink(missing_ok=True)
+            self.statistics.misses += 1
+            return None
+        self.statistics.hits += 1
+        return fragment
+
+    def put(self, key: str, fragment: RenderedFragment) -> None:
+        """
+        Store the fragment of a key, the images are stored once per content hash
+
+        Parameters
+        ----------
+        key : str
+            The cache key of the section
+        fragment : RenderedFragment
+            The rendered fragment of the section
+        """
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_size() if self.cache_dir.is_dir() else 0
+        added = 0
+        relationships = {}
+        self._media_dir.mkdir(parents=True, exist_ok=True)
+        for rId, rel in fragment.relationships.items():
+            digest = None
+            if rel.blob is not None:
+                digest = hashlib.sha256(rel.blob).hexdigest()
+                media_path = self._media_dir.joinpath(digest)
+                if not media_path.is_file():
+                    _write_atomic(media_path, rel.blob)
+                    added += len(rel.blob)
+            relationships[rId] = (rel.reltype, rel.target_ref, rel.is_external, digest)
+        content = pickle.dumps((fragment.body_xml, relationships), protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, content)
+        self.statistics.stores += 1
+        with self._lock:
+            self._size += added + len(content)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _disk_size(self) -> int:
+        """
+        Get the size of all cached fragments and media
+        """
+        return sum(path.stat().st_size for path in self.cache_dir.rglob("*") if path.is_file())
+
+    @staticmethod
+    def _media_digests(path: Path) -> set[str]:
+        """
+        Get the content hashes of the media an entry refers to, an unreadable entry refers to none
+        """
+        try:
+            _, relationships = pickle.loads(path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return set()
+        return {digest for *_, digest in relationships.values() if digest}
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is below 90 % of its maximum size, the media are
+        removed with the last entry referring to them
+        """
+        entries = sorted((path.stat().st_mtime_ns, path) for path in self._entries_dir.glob("*/*.pkl"))
+        digests = {path: self._media_digests(path) for _, path in entries}
+        references = Counter(digest for entry_digests in digests.values() for digest in entry_digests)
+        target = self.max_bytes * 0.9
+        for _, path in entries:
+            if self._size <= target:
+                break
+            self._size -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            self.statistics.evictions += 1
+            for digest in digests[path]:
+                references[digest] -= 1
+                if references[digest] <= 0:
+                    self._remove_media(self._media_dir.joinpath(digest))
+        # the media of unreadable or concurrently removed entries
+        for media_path in self._media_dir.iterdir():
+            if references[media_path.name] <= 0:
+                self._remove_media(media_path)
+
+    def _remove_media(self, media_path: Path) -> None:
+        """
+        Remove a cached image from the disk
+        """
+        try:
+            self._size -= media_path.stat().st_size
+            media_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def log_statistics(self) -> None:
+        """
+        Log the hits, misses and evictions since the cache was created
+        """
+        statistics = self.statistics
+        logger.info("Fragment cache %s: %d hits, %d misses (%.0f%% hit rate), %d stored, %d evicted, %.1f MB.",
+                    self.cache_dir, statistics.hits, statistics.misses, statistics.hit_rate * 100, statistics.stores,
+                    statistics.evictions, (self._size if self._size is not None else self._disk_size()) / 2 ** 20)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""A module for loading the image index of the cases once and sharing it between all case sections"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+
+from report_generator.common.logger import logger
+
+
+class ImageIndex:
+    """
+    Image index of a report, mapping every case name to its files and the image paths of each file
+    """
+
+    def __init__(self, cases: dict[str, dict[str, list[str]]]):
+        """
+        Initialize the image index
+
+        Parameters
+        ----------
+        cases : dict[str, dict[str, list[str]]]
+            The image paths of each file of each case
+        """
+        self.cases = cases
+
+    @classmethod
+    def from_json_data(cls, image_data: list[dict]) -> 'ImageIndex':
+        """
+        Create the image index from the content of an image index json file
+
+        Parameters
+        ----------
+        image_data : list[dict]
+            The list of case dictionaries of the json file
+
+        Returns
+        -------
+        ImageIndex
+            The image index
+        """
+        cases: dict[str, dict[str, list[str]]] = {}
+        for case_data in image_data:
+            for case_name, files in case_data.items():
+                case_files = cases.setdefault(case_name, {})
+                for file_name, image_paths in files.items():
+                    case_files.setdefault(file_name, []).extend(image_paths)
+        return cls(cases)
+
+    def get(self, case_name: str) -> dict[str, list[str]]:
+        """
+        Get the files and their image paths of a case
+
+        Parameters
+        ----------
+        case_name : str
+            The name of the case
+
+        Returns
+        -------
+        dict[str, list[str]]
+            The image paths of each file, empty if the case is not in the index
+        """
+        return self.cases.get(case_name, {})
+
+
+# the loaded image indexes, by resolved path, with the modification time and the size of the loaded file
+_index_cache: dict[Path, tuple[int, int, ImageIndex]] = {}
+_index_cache_lock = threading.Lock()
+
+
+def _compiled_cache_path(cache_dir: Path, index_path: Path) -> Path:
+    """
+    Get the path of the compiled image index in the cache directory
+    """
+    key = hashlib.sha1(str(index_path).encode("utf-8")).hexdigest()
+    return cache_dir.joinpath(f"image_index_{key}.pickle")
+
+
+def _load_compiled(cache_file: Path, mtime_ns: int, size: int) -> ImageIndex | None:
+    """
+    Load a compiled image index, if it was compiled from the same version of the index file
+    """
+    if not cache_file.is_file():
+        return None
+    try:
+        with open(cache_file, "rb") as f:
+            cached_mtime_ns, cached_size, cases = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    if cached_mtime_ns != mtime_ns or cached_size != size:
+        return None
+    return ImageIndex(cases)
+
+
+def _save_compiled(cache_file: Path, mtime_ns: int, size: int, index: ImageIndex) -> None:
+    """
+    Save the compiled image index atomically to the cache directory
+    """
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_file, "wb") as f:
+        pickle.dump((mtime_ns, size, index.cases), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+
+def load_image_index(index_path: Path | str, cache_dir: Path | str | None = None) -> ImageIndex:
+    """
+    Load an image index json file, parsed once per path and modification time
+
+    Parameters
+    ----------
+    index_path : Path | str
+        The path to the image index json file
+    cache_dir : Path | str | None, optional
+        A directory for the compiled image indexes reused by later runs, by default None
+
+    Returns
+    -------
+    ImageIndex
+        The image index of the file
+    """
+    path = Path(index_path).resolve()
+    stat = path.stat()
+    with _index_cache_lock:
+        cached = _index_cache.get(path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        cache_file = _compiled_cache_path(Path(cache_dir), path) if cache_dir else None
+        index = _load_compiled(cache_file, stat.st_mtime_ns, stat.st_size) if cache_file else None
+        if index is None:
+            with open(path, "r", encoding="utf-8") as f:
+                index = ImageIndex.from_json_data(json.load(f))
+            logger.info("Load the image index %s with %d cases.", path, len(index.cases))
+            if cache_file:
+                _save_compiled(cache_file, stat.st_mtime_ns, stat.st_size, index)
+        _index_cache[path] = (stat.st_mtime_ns, stat.st_size, index)
+        return index
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""A module for downscaling and recompressing the report images before they are embedded
+
+The pipeline requires Pillow, which is an optional dependency of the project.
+"""
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from docx.shared import Length
+
+from report_generator.common.logger import logger
+
+
+_FORMAT_SUFFIXES = {"png": ".png", "jpeg": ".jpg"}
+
+
+@dataclass
+class ImagePipelineStats:
+    """The statistics of a pipeline run"""
+    images: int = 0
+    cached: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    duration: float = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        """The number of bytes saved by the processed images"""
+        return self.bytes_before - self.bytes_after
+
+
+def _process_image(source: str, target: str, width_px: int, image_format: str, quality: int, dpi: int) -> None:
+    """
+    Resample the image to the target width and encode it in the target format, run in a worker process
+
+    Parameters
+    ----------
+    source : str
+        The path to the original image
+    target : str
+        The path to save the processed image to
+    width_px : int
+        The maximum width of the image in pixels
+    image_format : str
+        The target format, "png" or "jpeg"
+    quality : int
+        The jpeg quality
+    dpi : int
+        The resolution written to the image
+    """
+    from PIL import Image as PILImage
+
+    with PILImage.open(source) as image:
+        image.load()
+        if image.width > width_px:
+            height_px = max(1, round(image.height * width_px / image.width))
+            image = image.resize((width_px, height_px), PILImage.LANCZOS)
+        tmp_target = f"{target}.{os.getpid()}.tmp"
+        if image_format == "jpeg":
+            if image.mode in ("RGBA", "LA", "P"):
+                rgba = image.convert("RGBA")
+                image = PILImage.new("RGB", rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.getchannel("A"))
+            image.convert("RGB").save(tmp_target, format="JPEG", quality=quality, optimize=True, dpi=(dpi, dpi))
+        else:
+            image.save(tmp_target, format="PNG", optimize=True, dpi=(dpi, dpi))
+    os.replace(tmp_target, target)
+
+
+class ImagePipeline:
+    """
+    Image pipeline resampling every plot to the resolution it is displayed with in the report.
+
+    The processed images are cached content-addressed by the hash of the original image and the processing
+    parameters, so unchanged plots are never processed again.
+    """
+
+    def __init__(self, cache_dir: Path | str, target_dpi: int = 150, image_format: str = "png", quality: int = 85,
+                 workers: int | None = None):
+        """
+        Initialize the image pipeline
+
+        Parameters
+        ----------
+        cache_dir : Path | str
+            The directory of the processed images
+        target_dpi : int, optional
+            The resolution of the images at their displayed width, by default 150
+        image_format : str, optional
+            The format of the processed images, "png" or "jpeg", by default "png"
+        quality : int, optional
+            The quality of jpeg images, by default 85
+        workers : int | None, optional
+            The number of worker processes, by default the number of cpus
+        """
+        try:
+            import PIL  # noqa: F401
+        except ImportError as e:
+            raise ImportError("The image pipeline requires Pillow, install it with 'pip install pillow'.") from e
+        if image_format not in _FORMAT_SUFFIXES:
+            raise ValueError(f"Unsupported image format '{image_format}', use one of {list(_FORMAT_SUFFIXES)}.")
+
+        self.cache_dir = Path(cache_dir)
+        self.target_dpi = target_dpi
+        self.image_format = image_format
+        self.quality = quality
+        self.workers = workers
+        self.stats = ImagePipelineStats()
+
+    def _target_path(self, content_hash: str, width_px: int) -> Path:
+        """
+        Get the content-addressed path of a processed image
+        """
+        key = f"{content_hash}_{width_px}_{self.target_dpi}_{self.image_format}_{self.quality}"
+        return self.cache_dir.joinpath(hashlib.sha1(key.encode("utf-8")).hexdigest() + _FORMAT_SUFFIXES[self.image_format])
+
+    def process(self, image_paths: Iterable[str], width: Length) -> dict[str, str]:
+        """
+        Process the images displayed with the width in the report
+
+        Parameters
+        ----------
+        image_paths : Iterable[str]
+            The paths of the original images
+        width : Length
+            The width the images are displayed with
+
+        Returns
+        -------
+        dict[str, str]
+            The path of the processed image for each original image path
+        """
+        start = time.perf_counter()
+        width_px = max(1, round(Length(width).inches * self.target_dpi))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        processed_paths: dict[str, str] = {}
+        original_sizes: dict[str, int] = {}
+        jobs = []
+        for image_path in dict.fromkeys(str(path) for path in image_paths):
+            content = Path(image_path).read_bytes()
+            target = self._target_path(hashlib.sha256(content).hexdigest(), width_px)
+            processed_paths[image_path] = str(target)
+            original_sizes[image_path] = len(content)
+            if target.is_file():
+                self.stats.cached += 1
+            else:
+                jobs.append((image_path, str(target), width_px, self.image_format, self.quality, self.target_dpi))
+
+        if jobs:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                for future in [executor.submit(_process_image, *job) for job in jobs]:
+                    future.result()
+
+        for image_path, target in processed_paths.items():
+            size = Path(target).stat().st_size
+            # keep the original image if it is already smaller than the processed one
+            if size >= original_sizes[image_path]:
+                processed_paths[image_path] = image_path
+                size = original_sizes[image_path]
+            self.stats.images += 1
+            self.stats.bytes_before += original_sizes[image_path]
+            self.stats.bytes_after += size
+
+        duration = time.perf_counter() - start
+        self.stats.duration += duration
+        logger.info("Preprocess %d images (%d from cache) in %.2fs, %d bytes saved in total.", len(processed_paths),
+                    len(processed_paths) - len(jobs), duration, self.stats.bytes_saved)
+        return processed_paths
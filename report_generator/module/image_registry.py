@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""A module for sharing the image parts of a report between all occurrences of the same picture"""
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from docx.image.image import Image as DocxImage
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.shape import CT_Inline
+from docx.parts.image import ImagePart
+from docx.shared import Length
+from docx.text.run import Run
+
+
+class ImageBytesCache:
+    """
+    Least recently used cache of image file contents, limited by the total number of cached bytes
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the image bytes cache
+
+        Parameters
+        ----------
+        max_bytes : int
+            The maximum number of cached bytes, 0 disables the cache
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, int, int], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, image_path: str) -> bytes:
+        """
+        Read the content of an image file, served from the cache while the file is unchanged
+
+        Parameters
+        ----------
+        image_path : str
+            The path to the image file
+
+        Returns
+        -------
+        bytes
+            The content of the image file
+        """
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return blob
+            self.misses += 1
+
+        with open(image_path, "rb") as f:
+            blob = f.read()
+        if len(blob) > self.max_bytes:
+            return blob
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = blob
+                self.size += len(blob)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return blob
+
+    def clear(self) -> None:
+        """
+        Remove all cached image contents
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class ImageRegistry:
+    """
+    Report-wide registry of the image parts of a document.
+
+    Every distinct image path is read and hashed once, afterwards each occurrence reuses the same image part and, per
+    story part (body, header, footer), the same relationship.
+    """
+
+    def __init__(self, package, bytes_cache: ImageBytesCache):
+        """
+        Initialize the image registry of a document package
+
+        Parameters
+        ----------
+        package : docx.package.Package
+            The package of the document
+        bytes_cache : ImageBytesCache
+            The cache to read the image files through
+        """
+        self.bytes_cache = bytes_cache
+        self._image_parts = package.image_parts
+        self._parts_by_path: dict[str, ImagePart] = {}
+        # the image parts already in the package, e.g. of a document loaded to append to
+        self._parts_by_sha1: dict[str, ImagePart] = {part.sha1: part for part in self._image_parts}
+        self._relationships: dict[tuple[int, str], str] = {}
+
+    def get_or_add_image(self, story_part, image_path: str) -> tuple[str, DocxImage]:
+        """
+        Get the relationship id of the story part to the image part of the image, both added if not present
+
+        Parameters
+        ----------
+        story_part : docx.parts.story.StoryPart
+            The part containing the picture
+        image_path : str
+            The path to the image file
+
+        Returns
+        -------
+        tuple[str, DocxImage]
+            The relationship id and the image
+        """
+        image_part = self._parts_by_path.get(image_path)
+        if image_part is None:
+            blob = self.bytes_cache.read(image_path)
+            image_part = self._get_or_add_image_part(blob, os.path.basename(image_path))
+            self._parts_by_path[image_path] = image_part
+        return self._relate(story_part, image_part), image_part.image
+
+    def get_or_add_image_blob(self, story_part, blob: bytes, filename: str) -> str:
+        """
+        Get the relationship id of the story part to the image part of the image content, both added if not present
+
+        Parameters
+        ----------
+        story_part : docx.parts.story.StoryPart
+            The part containing the picture
+        blob : bytes
+            The content of the image file
+        filename : str
+            The file name of the image
+
+        Returns
+        -------
+        str
+            The relationship id
+        """
+        return self._relate(story_part, self._get_or_add_image_part(blob, filename))
+
+    def _get_or_add_image_part(self, blob: bytes, filename: str) -> ImagePart:
+        """
+        Get the image part with the image content, added to the package if not present
+        """
+        image = DocxImage._from_stream(io.BytesIO(blob), blob, filename)
+        image_part = self._parts_by_sha1.get(image.sha1)
+        if image_part is None:
+            image_part = self._image_parts._add_image_part(image)
+            self._parts_by_sha1[image.sha1] = image_part
+        return image_part
+
+    def _relate(self, story_part, image_part: ImagePart) -> str:
+        """
+        Get the relationship id of the story part to the image part, added if not present
+        """
+        key = (id(story_part), image_part.partname)
+        rId = self._relationships.get(key)
+        if rId is None:
+            rId = story_part.relate_to(image_part, RT.IMAGE)
+            self._relationships[key] = rId
+        return rId
+
+    def add_picture(self, run: Run, image_path: str, width: Length | None = None, height: Length | None = None,
+                    shape_id: int | None = None) -> None:
+        """
+        Add a picture of the image to the run
+
+        Parameters
+        ----------
+        run : Run
+            The run to add the picture to
+        image_path : str
+            The path to the image file
+        width : Length | None, optional
+            The width of the picture
+        height : Length | None, optional
+            The height of the picture
+        shape_id : int | None, optional
+            The id of the drawing shape, by default the next free id of the story part
+        """
+        story_part = run.part
+        rId, image = self.get_or_add_image(story_part, str(image_path))
+        cx, cy = image.scaled_dimensions(width, height)
+        if shape_id is None:
+            shape_id = story_part.next_id
+        run._r.add_drawing(CT_Inline.new_pic_inline(shape_id, rId, image.filename, cx, cy))
+
+
+DEFAULT_IMAGE_CACHE_BYTES = 256 * 1024 * 1024
+_default_bytes_cache: ImageBytesCache | None = None
+
+
+def get_image_bytes_cache(max_bytes: int | None = None) -> ImageBytesCache:
+    """
+    Get the process-wide image bytes cache shared by all reports
+
+    Parameters
+    ----------
+    max_bytes : int | None, optional
+        The byte budget of the cache, by default the current budget or 256 MiB for a new cache
+
+    Returns
+    -------
+    ImageBytesCache
+        The shared image bytes cache
+    """
+    global _default_bytes_cache
+    if _default_bytes_cache is None:
+        _default_bytes_cache = ImageBytesCache(DEFAULT_IMAGE_CACHE_BYTES if max_bytes is None else max_bytes)
+    elif max_bytes is not None:
+        _default_bytes_cache.max_bytes = max_bytes
+    return _default_bytes_cache
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""A module for converting a report to PDF fragment by fragment
+
+Every group of sections is saved as a separate docx file without the page number fields of the footer and converted on
+its own, so the fragments are saved and converted in parallel in the background and cached by the content of their
+sections.
+The fragments are concatenated into the PDF of the report and the page numbers are stamped onto the merged pages, so
+an unchanged fragment is valid at any position of the report.
+
+The merge requires pypdf, which is an optional dependency of the project.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from docx.oxml.ns import qn
+from docx.shared import Emu
+
+from report_generator.common.logger import logger
+from report_generator.common.profiler import PROFILER
+from report_generator.module.pdf_backend import PdfConversionJob, PdfConversionQueue, SkipPdfBackend
+
+# the widths of the page number characters in the standard Helvetica font, in thousandths of the font size
+_HELVETICA_WIDTHS = {**{digit: 556 for digit in "0123456789"}, " ": 278, "/": 278}
+_FONT_NAME = "/ReportPageNumber"
+
+
+def _require_pypdf() -> None:
+    """
+    Raise a helpful error if pypdf is not installed
+    """
+    try:
+        import pypdf  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The incremental PDF conversion requires pypdf, install it with 'pip install pypdf'.") from e
+
+
+@dataclass(frozen=True)
+class PageNumberStamp:
+    """The position of the page numbers stamped onto the merged pages, in points from the bottom left corner"""
+    right: float
+    baseline: float
+    font_size: float = 9.0
+
+    @classmethod
+    def from_document(cls, document) -> 'PageNumberStamp':
+        """
+        Place the page numbers right-aligned at the right page margin on the line of the footer
+
+        Parameters
+        ----------
+        document : docx.document.Document
+            The document with the page setup of the report
+
+        Returns
+        -------
+        PageNumberStamp
+            The position of the page numbers
+        """
+        section = document.sections[0]
+        return cls(right=Emu(section.page_width - section.right_margin).pt, baseline=section.footer_distance.pt)
+
+    def content(self, page_number: int, page_count: int, left: float = 0.0, bottom: float = 0.0) -> bytes:
+        """
+        Get the content stream drawing a page number
+
+        Parameters
+        ----------
+        page_number : int
+            The number of the page
+        page_count : int
+            The number of pages of the report
+        left : float, optional
+            The left edge of the page, by default 0.0
+        bottom : float, optional
+            The bottom edge of the page, by default 0.0
+
+        Returns
+        -------
+        bytes
+            The content stream in the `_FONT_NAME` font
+        """
+        text = f"{page_number} / {page_count}"
+        width = sum(_HELVETICA_WIDTHS[char] for char in text) * self.font_size / 1000
+        x = left + self.right - width
+        y = bottom + self.baseline
+        return f"q 0 g BT {_FONT_NAME} {self.font_size:g} Tf {x:.2f} {y:.2f} Td ({text}) Tj ET Q".encode("ascii")
+
+
+def prepare_fragment_document(document) -> None:
+    """
+    Remove the page number fields of the footers and the page break after the last section of a fragment document
+
+    Parameters
+    ----------
+    document : docx.document.Document
+        The document of the rendered fragment
+    """
+    for section in document.sections:
+        footer = section.footer._element
+        for run in [run for run in footer.iter(qn("w:r")) if run.find(qn("w:instrText")) is not None]:
+            run.getparent().remove(run)
+
+    body = document.element.body
+    last = body[-2] if len(body) > 1 and body[-1].tag == qn("w:sectPr") else None
+    if last is not None and last.tag == qn("w:p") and not "".join(last.itertext()).strip() \
+            and last.find(f".//{qn('w:br')}[@{qn('w:type')}='page']") is not None:
+        body.remove(last)
+
+
+def stamp_page_numbers(writer, stamp: PageNumberStamp) -> None:
+    """
+    Stamp the page numbers onto all pages of a PDF writer
+
+    Parameters
+    ----------
+    writer : pypdf.PdfWriter
+        The writer with the merged pages
+    stamp : PageNumberStamp
+        The position of the page numbers
+    """
+    from pypdf import PageObject
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    font = DictionaryObject({NameObject("/Type"): NameObject("/Font"), NameObject("/Subtype"): NameObject("/Type1"),
+                             NameObject("/BaseFont"): NameObject("/Helvetica"),
+                             NameObject("/Encoding"): NameObject("/WinAnsiEncoding")})
+    page_count = len(writer.pages)
+    for page_number, page in enumerate(writer.pages, start=1):
+        box = page.mediabox
+        overlay = PageObject.create_blank_page(width=box.width, height=box.height)
+        overlay[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject(_FONT_NAME): font})})
+        content = DecodedStreamObject()
+        content.set_data(stamp.content(page_number, page_count, float(box.left), float(box.bottom)))
+        overlay[NameObject("/Contents")] = content
+        page.merge_page(overlay)
+
+
+def merge_pdf_fragments(fragment_paths: list[Path], pdf_path: Path, stamp: PageNumberStamp) -> int:
+    """
+    Concatenate the PDF fragments and stamp the page numbers of the merged report
+
+    Parameters
+    ----------
+    fragment_paths : list[Path]
+        The PDF fragments in report order
+    pdf_path : Path
+        The path of the merged PDF
+    stamp : PageNumberStamp
+        The position of the page numbers
+
+    Returns
+    -------
+    int
+        The number of pages of the merged PDF
+    """
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for fragment_path in fragment_paths:
+        writer.append(str(fragment_path))
+    stamp_page_numbers(writer, stamp)
+    tmp_path = pdf_path.with_name(f"{pdf_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        writer.write(f)
+    os.replace(tmp_path, pdf_path)
+    return len(writer.pages)
+
+
+class PdfFragmentCache:
+    """
+    Persistent cache of the converted PDF fragments by content key, bounded by the size of its directory.
+
+    Every hit moves the modification time of the fragment forward, the least recently used fragments are evicted first.
+    """
+
+    def __init__(self, cache_dir: Path | str, max_bytes: int = 1024 ** 3):
+        """
+        Initialize the PDF fragment cache
+
+        Parameters
+        ----------
+        cache_dir : Path | str
+            The directory of the cached PDF fragments
+        max_bytes : int, optional
+            The maximum size of the cached PDF fragments, by default 1 GiB
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Path | None:
+        """
+        Get the cached PDF fragment of a key
+
+        Parameters
+        ----------
+        key : str
+            The content key of the fragment
+
+        Returns
+        -------
+        Path | None
+            The path of the cached PDF fragment, None on a miss
+        """
+        path = self.cache_dir.joinpath(f"{key}.pdf")
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def pin(self, key: str, pinned_path: Path) -> Path | None:
+        """
+        Get the cached PDF fragment of a key as a link or copy outside the cache, so it cannot be evicted while used
+
+        Parameters
+        ----------
+        key : str
+            The content key of the fragment
+        pinned_path : Path
+            The path of the pinned fragment
+
+        Returns
+        -------
+        Path | None
+            The pinned path, None on a miss
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            try:
+                os.link(path, pinned_path)
+            except OSError:
+                shutil.copyfile(path, pinned_path)
+        except FileNotFoundError:
+            # evicted since the lookup
+            return None
+        return pinned_path
+
+    def put(self, key: str, pdf_path: Path) -> None:
+        """
+        Store a converted PDF fragment
+
+        Parameters
+        ----------
+        key : str
+            The content key of the fragment
+        pdf_path : Path
+            The converted PDF fragment
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir.joinpath(f"{key}.pdf")
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(pdf_path, tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used fragments while the cache exceeds its maximum size
+        """
+        fragments = sorted((path.stat().st_mtime_ns, path.stat().st_size, path) for path in self.cache_dir.glob("*.pdf"))
+        size = sum(fragment_size for _, fragment_size, _ in fragments)
+        for _, fragment_size, path in fragments:
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= fragment_size
+
+
+@dataclass
+class PdfFragment:
+    """A group of sections converted to a single PDF fragment"""
+    # the content key of the sections, None if the fragment is never cached
+    key: str | None
+    # takes a snapshot of the rendered sections when the fragment is submitted and returns the function saving it as
+    # docx file prepared with `prepare_fragment_document`, which runs in a background thread
+    snapshot: Callable[[], Callable[[Path], None]]
+
+
+class IncrementalPdfConverter:
+    """
+    Convert a report to PDF by saving its changed fragments in background threads, converting them with the PDF
+    conversion queue and merging them with the cached fragments in a background thread.
+    """
+
+    def __init__(self, pdf_queue: PdfConversionQueue, cache: PdfFragmentCache | None = None):
+        """
+        Initialize the incremental PDF converter
+
+        Parameters
+        ----------
+        pdf_queue : PdfConversionQueue
+            The queue converting the fragments, in parallel if its backend supports it
+        cache : PdfFragmentCache, optional
+            The cache of the converted fragments, by default every fragment is converted
+        """
+        _require_pypdf()
+        self.pdf_queue = pdf_queue
+        self.cache = cache
+        self._save_executor = ThreadPoolExecutor(max_workers=max(1, pdf_queue.backend.max_parallel),
+                                                 thread_name_prefix="pdf_fragment")
+        self._merge_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf_merge")
+
+    def submit(self, docx_path: Path | str, fragments: list[PdfFragment],
+               stamp: PageNumberStamp) -> 'Future[PdfConversionJob]':
+        """
+        Submit the fragments of a saved report for conversion. The snapshots of the fragments missing in the cache
+        and the cached fragments are taken before the function returns, so the report and the cache can change after
+
+        Parameters
+        ----------
+        docx_path : Path | str
+            Path to the docx file of the report, the merged PDF is saved next to it
+        fragments : list[PdfFragment]
+            The fragments of the report in order
+        stamp : PageNumberStamp
+            The position of the page numbers
+
+        Returns
+        -------
+        Future[PdfConversionJob]
+            The future of the merged conversion job
+        """
+        if isinstance(self.pdf_queue.backend, SkipPdfBackend):
+            return self.pdf_queue.submit(docx_path)
+
+        work_dir = Path(tempfile.mkdtemp(prefix="report_generator_pdf_"))
+        parts: list[Path | Future] = []
+        for i, fragment in enumerate(fragments):
+            cached = None
+            if self.cache is not None and fragment.key:
+                cached = self.cache.pin(fragment.key, work_dir.joinpath(f"fragment_{i:05d}.pdf"))
+            if cached is None:
+                cached = self._save_executor.submit(self._save_and_convert, fragment.snapshot(),
+                                                    work_dir.joinpath(f"fragment_{i:05d}.docx"))
+            parts.append(cached)
+        job = PdfConversionJob(docx_path=Path(docx_path), queue_depth=self.pdf_queue.queue_depth)
+        return self._merge_executor.submit(self._merge, job, fragments, parts, work_dir, stamp)
+
+    def _save_and_convert(self, save_docx: Callable[[Path], None], docx_path: Path) -> PdfConversionJob:
+        """
+        Save the snapshot of a fragment as docx file and convert it with the PDF conversion queue
+        """
+        save_docx(docx_path)
+        return self.pdf_queue.submit(docx_path).result()
+
+    def _merge(self, job: PdfConversionJob, fragments: list[PdfFragment], parts: list[Path | Future],
+               work_dir: Path, stamp: PageNumberStamp) -> PdfConversionJob:
+        """
+        Wait for the converted fragments, store them in the cache and merge all fragments of the report
+        """
+        converted = sum(isinstance(part, Future) for part in parts)
+        try:
+            fragment_paths = []
+            for fragment, part in zip(fragments, parts):
+                if isinstance(part, Future):
+                    pdf_path = part.result().pdf_path
+                    if pdf_path is None:
+                        raise RuntimeError(f"The PDF backend '{self.pdf_queue.backend.name}' created no PDF fragment.")
+                    if self.cache is not None and fragment.key:
+                        self.cache.put(fragment.key, pdf_path)
+                    part = pdf_path
+                fragment_paths.append(part)
+            job.started_at = time.perf_counter()
+            with PROFILER.stage("pdf_merge", fragments=len(fragment_paths)):
+                page_count = merge_pdf_fragments(fragment_paths, job.docx_path.with_suffix(".pdf"), stamp)
+            job.pdf_path = job.docx_path.with_suffix(".pdf")
+            job.finished_at = time.perf_counter()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        logger.info("Merge %d PDF fragments (%d converted, %d cached) into %s with %d pages in %.2fs.",
+                    len(fragment_paths), converted, len(fragment_paths) - converted, job.pdf_path,
+                    page_count, job.conversion_time)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the converter after the submitted merges
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Wait for the submitted merges to finish, by default True
+        """
+        self._save_executor.shutdown(wait=wait)
+        self._merge_executor.shutdown(wait=wait)
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""A module for loading the tab-separated measurement files into columnar arrays
+
+A measurement file has a quoted header row with the signal names, a units row, where signals without unit have an
+empty cell, and one row of float values per sample. The parsed signals can be cached as one `.npy` file per signal,
+keyed by the hash of the file content, so a measurement is parsed once and later loaded memory-mapped.
+"""
+import csv
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+@dataclass
+class Measurement:
+    """The signals of a measurement file as columnar arrays with their units"""
+    path: Path
+    signals: dict[str, np.ndarray]
+    units: dict[str, str] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.signals[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.signals
+
+    def __len__(self) -> int:
+        """The number of samples"""
+        return len(next(iter(self.signals.values()))) if self.signals else 0
+
+    @property
+    def names(self) -> list[str]:
+        """The names of the loaded signals in file order"""
+        return list(self.signals)
+
+
+def read_measurement_header(path: Path | str) -> tuple[list[str], list[str]]:
+    """
+    Read the signal names and units of a measurement file
+
+    Parameters
+    ----------
+    path : Path | str
+        The path to the measurement file
+
+    Returns
+    -------
+    tuple[list[str], list[str]]
+        The signal names and the units, an empty string for signals without unit
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter="\t")
+        names = next(reader, [])
+        units = next(reader, [])
+    if not names:
+        raise ValueError(f"The measurement file '{path}' has no header row.")
+    return names, units + [""] * (len(names) - len(units))
+
+
+def _count_lines(path: Path) -> int:
+    """
+    Count the lines of a file without decoding it
+    """
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while block := f.read(_BLOCK_SIZE):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return lines + (last != b"\n")
+
+
+def _parse_signals(path: Path, names: list[str], signals: list[str], chunk_rows: int,
+                   allocate) -> tuple[dict[str, np.ndarray], int]:
+    """
+    Parse the signals chunk by chunk into the arrays of the allocate function
+
+    Parameters
+    ----------
+    path : Path
+        The path to the measurement file
+    names : list[str]
+        All signal names of the file
+    signals : list[str]
+        The signals to parse
+    chunk_rows : int
+        The number of rows parsed at once
+    allocate : Callable[[str, int], np.ndarray]
+        Creates the float array of a signal with a number of samples
+
+    Returns
+    -------
+    tuple[dict[str, np.ndarray], int]
+        The arrays and the number of parsed samples
+    """
+    # the header rows are excluded, blank trailing lines are not parsed, so the arrays may be longer than needed
+    max_rows = max(_count_lines(path) - 2, 0)
+    arrays = {signal: allocate(signal, max_rows) for signal in signals}
+    rows = 0
+    reader = pd.read_csv(path, sep="\t", skiprows=2, header=None, names=names, usecols=signals, dtype=np.float64,
+                         engine="c", chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            for signal in signals:
+                arrays[signal][rows:rows + len(chunk)] = chunk[signal].to_numpy()
+            rows += len(chunk)
+    return arrays, rows
+
+
+class MeasurementCache:
+    """
+    Cache of parsed measurement signals, one `.npy` file per signal in a directory per file content hash.
+
+    The content hash of a file is remembered by its path, size and modification time, so an unchanged file is not
+    hashed again.
+    """
+
+    def __init__(self, cache_dir: Path | str):
+        """
+        Initialize the measurement cache
+
+        Parameters
+        ----------
+        cache_dir : Path | str
+            The directory of the cached signals
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def _content_hash(self, path: Path) -> str:
+        """
+        Get the sha256 of the file content, hashed once per path, size and modification time
+        """
+        stat = path.stat()
+        stat_key = hashlib.sha1(f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8")).hexdigest()
+        key_path = self.cache_dir.joinpath("keys", stat_key)
+        if key_path.is_file():
+            return key_path.read_text(encoding="utf-8")
+
+        content_hash = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(_BLOCK_SIZE):
+                content_hash.update(block)
+        key_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(key_path, content_hash.hexdigest().encode("utf-8"))
+        return content_hash.hexdigest()
+
+    def directory(self, path: Path) -> Path:
+        """
+        Get the cache directory of a measurement file
+
+        Parameters
+        ----------
+        path : Path
+            The path to the measurement file
+
+        Returns
+        -------
+        Path
+            The directory of the cached signals of the file content
+        """
+        return self.cache_dir.joinpath(self._content_hash(path))
+
+    @staticmethod
+    def signal_path(directory: Path, signal: str) -> Path:
+        """
+        Get the file of a cached signal, named by the hash of the signal name
+        """
+        return directory.joinpath(hashlib.sha1(signal.encode("utf-8")).hexdigest()[:16] + ".npy")
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """
+    Write the content to a temporary file which replaces the file afterward
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def load_measurement(path: Path | str, signals: Iterable[str] | None = None, cache_dir: Path | str | None = None,
+                     mmap: bool = True, chunk_rows: int = 500_000) -> Measurement:
+    """
+    Load the signals of a measurement file
+
+    Only the requested signals are parsed. With a cache directory, every parsed signal is stored as `.npy` file and
+    loaded from there, memory-mapped by default, while the file content is unchanged.
+
+    Parameters
+    ----------
+    path : Path | str
+        The path to the measurement file
+    signals : Iterable[str] | None, optional
+        The signals to load, by default all signals of the file
+    cache_dir : Path | str | None, optional
+        The directory of the signal cache, by default the signals are parsed without cache
+    mmap : bool, optional
+        Memory-map the cached signals instead of reading them, by default True
+    chunk_rows : int, optional
+        The number of rows parsed at once, by default 500000
+
+    Returns
+    -------
+    Measurement
+        The signals in file order with their units
+    """
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"The measurement file '{path}' does not exist.")
+    names, units = read_measurement_header(path)
+    if signals is None:
+        signals = names
+    else:
+        signals = list(dict.fromkeys(signals))
+        unknown = [signal for signal in signals if signal not in names]
+        if unknown:
+            raise ValueError(f"The measurement file '{path}' has no signals {unknown}.")
+        # keep the file order, independent of the requested order
+        signals = [name for name in names if name in signals]
+
+    if cache_dir is None:
+        arrays, rows = _parse_signals(path, names, signals, chunk_rows, lambda _, size: np.empty(size, np.float64))
+        return Measurement(path=path, signals={signal: arrays[signal][:rows] for signal in signals},
+                           units={signal: units[names.index(signal)] for signal in signals})
+
+    cache = MeasurementCache(cache_dir)
+    directory = cache.directory(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    meta_path = directory.joinpath("meta.json")
+    missing = [signal for signal in signals if not cache.signal_path(directory, signal).is_file()]
+    if missing:
+        tmp_suffix = f".{os.getpid()}.tmp.npy"
+        arrays, rows = _parse_signals(
+            path, names, missing, chunk_rows,
+            lambda signal, size: np.lib.format.open_memmap(str(cache.signal_path(directory, signal)) + tmp_suffix,
+                                                           mode="w+", dtype=np.float64, shape=(size,)))
+        for array in arrays.values():
+            array.flush()
+        del arrays
+        for signal in missing:
+            signal_path = cache.signal_path(directory, signal)
+            os.replace(str(signal_path) + tmp_suffix, signal_path)
+        _write_atomic(meta_path, json.dumps({"rows": rows, "names": names, "units": units}).encode("utf-8"))
+
+    rows = json.loads(meta_path.read_text(encoding="utf-8"))["rows"]
+    return Measurement(path=path,
+                       signals={signal: np.load(cache.signal_path(directory, signal), mmap_mode="r" if mmap else None)[:rows]
+                                for signal in signals},
+                       units={signal: units[names.index(signal)] for signal in signals})
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""A module for converting the saved docx reports to PDF with exchangeable backends"""
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from report_generator.common.logger import logger
+from report_generator.common.profiler import PROFILER
+
+
+class PdfBackend(ABC):
+    """
+    Base class for all PDF backends
+    """
+    name = ""
+    # the number of conversions the backend can run at the same time
+    max_parallel = 1
+
+    @abstractmethod
+    def convert(self, docx_path: Path) -> Path | None:
+        """
+        Convert the docx file to a PDF file next to it
+
+        Parameters
+        ----------
+        docx_path : Path
+            Path to the docx file
+
+        Returns
+        -------
+        Path | None
+            Path to the PDF file, None if no PDF is created
+        """
+
+    def prepare(self) -> None:
+        """
+        Prepare the backend for the first conversion
+        """
+
+    def close(self) -> None:
+        """
+        Release the resources of the backend
+        """
+
+
+class Docx2PdfBackend(PdfBackend):
+    """
+    Convert with docx2pdf, which requires MS Word and converts one file at a time
+    """
+    name = "docx2pdf"
+
+    def convert(self, docx_path: Path) -> Path | None:
+        from docx2pdf import convert
+
+        convert(str(docx_path))
+        return docx_path.with_suffix(".pdf")
+
+
+class SkipPdfBackend(PdfBackend):
+    """
+    Skip the PDF conversion and only keep the docx file
+    """
+    name = "none"
+
+    def convert(self, docx_path: Path) -> Path | None:
+        return None
+
+
+class LibreOfficeBackend(PdfBackend):
+    """
+    Convert with up to `workers` headless LibreOffice processes at the same time.
+
+    Every conversion starts a new `soffice` process, which exits after the conversion. Only the user profiles are kept:
+    every pool slot owns a persistent user profile, which is initialized once by `prepare`, so parallel conversions do
+    not block each other on the profile lock and do not pay the profile initialization again. The process start itself
+    is paid by every conversion, also by every fragment of the incremental PDF conversion.
+    """
+    name = "libreoffice"
+
+    def __init__(self, workers: int = 2, soffice: str = "soffice", timeout: float | None = None):
+        """
+        Initialize the LibreOffice backend and the user profiles of its pool slots
+
+        Parameters
+        ----------
+        workers : int, optional
+            The number of parallel LibreOffice processes, by default 2
+        soffice : str, optional
+            The name or path of the LibreOffice executable, by default "soffice"
+        timeout : float | None, optional
+            The timeout of a single conversion in seconds, by default None
+        """
+        executable = shutil.which(soffice)
+        if executable is None:
+            raise FileNotFoundError(f"The LibreOffice executable '{soffice}' was not found.")
+        self.executable = executable
+        self.max_parallel = max(1, workers)
+        self.timeout = timeout
+        self._profile_root = Path(tempfile.mkdtemp(prefix="report_generator_soffice_"))
+        self._profiles: queue.Queue = queue.Queue()
+        for i in range(self.max_parallel):
+            self._profiles.put(self._profile_root.joinpath(f"profile_{i}"))
+
+    def _command(self, profile: Path, *args: str) -> list[str]:
+        """
+        Create the command line of a headless LibreOffice process using the profile
+        """
+        return [self.executable, f"-env:UserInstallation={profile.as_uri()}", "--headless", "--norestore",
+                "--nologo", "--nodefault", *args]
+
+    def prepare(self) -> None:
+        """
+        Initialize the user profiles of all pool slots in parallel before the first conversion
+        """
+        profiles = [self._profiles.get() for _ in range(self.max_parallel)]
+        try:
+            processes = [subprocess.Popen(self._command(profile, "--terminate_after_init"),
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                         for profile in profiles if not profile.is_dir()]
+            for process in processes:
+                process.wait(timeout=self.timeout)
+        finally:
+            for profile in profiles:
+                self._profiles.put(profile)
+
+    def convert(self, docx_path: Path) -> Path | None:
+        profile = self._profiles.get()
+        try:
+            command = self._command(profile, "--convert-to", "pdf", "--outdir", str(docx_path.parent), str(docx_path))
+            result = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout)
+        finally:
+            self._profiles.put(profile)
+
+        pdf_path = docx_path.with_suffix(".pdf")
+        if result.returncode != 0 or not pdf_path.is_file():
+            raise RuntimeError(f"LibreOffice failed to convert '{docx_path}': {result.stderr.strip()}")
+        return pdf_path
+
+    def close(self) -> None:
+        shutil.rmtree(self._profile_root, ignore_errors=True)
+
+
+def create_pdf_backend(name: str, workers: int = 2) -> PdfBackend:
+    """
+    Create a PDF backend by its name
+
+    Parameters
+    ----------
+    name : str
+        The name of the backend, "docx2pdf", "libreoffice" or "none"
+    workers : int, optional
+        The number of parallel conversions of backends supporting it, by default 2
+
+    Returns
+    -------
+    PdfBackend
+        The PDF backend
+    """
+    if name == Docx2PdfBackend.name:
+        return Docx2PdfBackend()
+    if name == LibreOfficeBackend.name:
+        return LibreOfficeBackend(workers=workers)
+    if name == SkipPdfBackend.name:
+        return SkipPdfBackend()
+    raise ValueError(f"Unknown PDF backend '{name}'.")
+
+
+@dataclass
+class PdfConversionJob:
+    """The state and the timing of a single PDF conversion"""
+    docx_path: Path
+    queue_depth: int
+    queued_at: float = field(default_factory=time.perf_counter)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    pdf_path: Path | None = None
+
+    @property
+    def wait_time(self) -> float:
+        """The time in seconds the job waited in the queue"""
+        return self.started_at - self.queued_at
+
+    @property
+    def conversion_time(self) -> float:
+        """The time in seconds the conversion took"""
+        return self.finished_at - self.started_at
+
+
+class PdfConversionQueue:
+    """
+    Run the PDF conversions of saved reports in the background.
+
+    The queue can be shared by many report generators, so the docx generation of the next report overlaps with the
+    conversion of the previous ones on the other cores.
+    """
+
+    def __init__(self, backend: PdfBackend):
+        """
+        Initialize the conversion queue
+
+        Parameters
+        ----------
+        backend : PdfBackend
+            The backend converting the reports
+        """
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=backend.max_parallel, thread_name_prefix="pdf_conversion")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor.submit(backend.prepare).add_done_callback(self._log_prepare_error)
+
+    def _log_prepare_error(self, future: Future) -> None:
+        """
+        Log the error of a failed preparation, the conversions report their own errors
+        """
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("The preparation of the PDF backend '%s' failed.", self.backend.name, exc_info=future.exception())
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of submitted conversions which are not finished"""
+        return self._pending
+
+    def submit(self, docx_path: Path | str) -> 'Future[PdfConversionJob]':
+        """
+        Submit a saved report for conversion
+
+        Parameters
+        ----------
+        docx_path : Path | str
+            Path to the docx file
+
+        Returns
+        -------
+        Future[PdfConversionJob]
+            The future of the finished conversion job
+        """
+        with self._lock:
+            self._pending += 1
+            job = PdfConversionJob(docx_path=Path(docx_path), queue_depth=self._pending)
+        future = self._executor.submit(self._run, job)
+        future.add_done_callback(self._release_cancelled)
+        return future
+
+    def _release_cancelled(self, future: Future) -> None:
+        """
+        Remove a cancelled conversion from the queue depth, a started conversion removes itself when it finishes
+        """
+        if future.cancelled():
+            with self._lock:
+                self._pending -= 1
+
+    def _run(self, job: PdfConversionJob) -> PdfConversionJob:
+        """
+        Convert the report of the job and report its timing
+        """
+        job.started_at = time.perf_counter()
+        try:
+            with PROFILER.stage("pdf_conversion", backend=self.backend.name, path=str(job.docx_path)):
+                job.pdf_path = self.backend.convert(job.docx_path)
+        finally:
+            job.finished_at = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+        logger.info("Convert %s with backend '%s' in %.2fs (waited %.2fs, queue depth %d).", job.docx_path,
+                    self.backend.name, job.conversion_time, job.wait_time, job.queue_depth)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the queue after the submitted conversions and release the backend
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Wait for the submitted conversions to finish, by default True
+        """
+        self._executor.shutdown(wait=wait)
+        self.backend.close()
@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+"""A module for the render daemon, which keeps warm worker processes and renders the reports submitted over HTTP
+
+The daemon listens on a local TCP port or a Unix socket and offers a small json job API:
+
+* `POST /jobs` submits a job `{"cases": [...], "output": "path/report.docx", "image_index": "path/index.json"}`,
+  answered with `202` and the job status, or `429` while the maximum number of pending jobs is reached
+* `GET /jobs/<id>` returns the status of a job
+* `DELETE /jobs/<id>` cancels a job which has not been started yet, `409` if it is running or finished
+* `GET /health` returns the number of queued and running jobs
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from report_generator.common.logger import logger
+
+
+class ServerBusyError(RuntimeError):
+    """The render server does not accept jobs, because the maximum number of pending jobs is reached"""
+
+
+_worker_pdf_queue = None
+
+
+def _init_worker(config_path: str, overrides: dict, pdf_backend: str | None) -> None:
+    """
+    Warm up a worker process, the configuration, python-docx and the PDF backend are loaded once per worker
+    """
+    global _worker_pdf_queue
+    from docx import Document
+
+    from report_generator.common.generate_interface import ReportGenerator
+    from report_generator.compontent.settings import configure_worker, get_config
+    from report_generator.module.pdf_backend import PdfConversionQueue, create_pdf_backend
+
+    configure_worker(config_path, overrides)
+    _worker_pdf_queue = PdfConversionQueue(create_pdf_backend(pdf_backend or get_config().settings.pdf_backend,
+                                                              workers=1))
+    # a first global setup loads the text formats and the header logo
+    ReportGenerator.global_setup(Document())
+
+
+def render_report(cases: list[dict], output: str, append: bool = False) -> dict:
+    """
+    Render a report of the cases in a worker process
+
+    Parameters
+    ----------
+    cases : list[dict]
+        The case dictionaries in report order
+    output : str
+        The path of the report
+    append : bool, optional
+        Append the cases to the report already rendered at the path, by default False
+
+    Returns
+    -------
+    dict
+        The output path, the number of sections and the duration in seconds
+    """
+    from report_generator.common.generate_interface import ReportGenerator
+    from report_generator.common.section_interface import CaseSection
+    from report_generator.compontent.settings import reload_config
+
+    start = time.perf_counter()
+    # a modified configuration file is applied to the next job without restarting the daemon
+    reload_config()
+    generator = ReportGenerator(pdf_queue=_worker_pdf_queue)
+    for case in cases:
+        section = CaseSection(case)
+        section.create_section()
+        generator.add_section(section)
+    generator.generate(output, append=append)
+    return {"output": output, "sections": len(cases), "duration": time.perf_counter() - start}
+
+
+@dataclass
+class RenderJob:
+    """A report job of the render server"""
+    id: str
+    output: str
+    sections: int
+    future: Future
+    submitted_at: float = field(default_factory=time.time)
+
+    @property
+    def status(self) -> str:
+        """The status of the job: queued, running, done, failed or cancelled"""
+        if self.future.cancelled():
+            return "cancelled"
+        if self.future.done():
+            return "failed" if self.future.exception() is not None else "done"
+        return "running" if self.future.running() else "queued"
+
+    def to_dict(self) -> dict:
+        """
+        Get the json representation of the job
+
+        Returns
+        -------
+        dict
+            The id, status and output of the job, with the result or the error when finished
+        """
+        job = {"id": self.id, "status": self.status, "output": self.output, "sections": self.sections,
+               "submitted_at": self.submitted_at}
+        if self.status == "done":
+            job["duration"] = self.future.result()["duration"]
+        elif self.status == "failed":
+            job["error"] = repr(self.future.exception())
+        return job
+
+
+class RenderServer:
+    """
+    Render server keeping a pool of warm worker processes, which render the submitted report jobs.
+
+    The queued jobs are kept by the server and handed to the pool only when a worker is free, so every queued job can
+    be cancelled until it starts. The number of pending jobs is limited, further jobs are rejected until jobs
+    finished, so the clients back off instead of growing an unbounded queue.
+    """
+
+    def __init__(self, workers: int | None = None, max_pending: int = 100, config_path: str | None = None,
+                 pdf_backend: str | None = None, max_finished_jobs: int = 1000, mp_context=None):
+        """
+        Initialize the render server and start its worker processes
+
+        Parameters
+        ----------
+        workers : int | None, optional
+            The number of worker processes, by default the number of cpus
+        max_pending : int, optional
+            The maximum number of queued and running jobs, by default 100
+        config_path : str | None, optional
+            The configuration file of the workers, by default the configured file. The workers apply the overrides of
+            `configure` like the server process
+        pdf_backend : str | None, optional
+            The PDF backend of the workers, by default the backend of the settings
+        max_finished_jobs : int, optional
+            The number of finished jobs whose status is kept, by default 1000
+        mp_context : multiprocessing.context.BaseContext, optional
+            The context starting the worker processes, by default the default context of the platform
+        """
+        from report_generator.compontent.settings import worker_configuration
+
+        self.max_pending = max_pending
+        self.max_finished_jobs = max_finished_jobs
+        self.workers = workers or os.cpu_count() or 1
+        configured_path, overrides = worker_configuration()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context, initializer=_init_worker,
+                                             initargs=(os.path.abspath(config_path or configured_path), overrides,
+                                                       pdf_backend))
+        self._jobs: OrderedDict[str, RenderJob] = OrderedDict()
+        # the jobs waiting for a free worker with the arguments of `render_report`
+        self._queue: deque[tuple[RenderJob, tuple]] = deque()
+        self._pending = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, cases: list[dict], output: str, image_index: str | None = None, append: bool = False) -> RenderJob:
+        """
+        Submit a report job
+
+        Parameters
+        ----------
+        cases : list[dict]
+            The case dictionaries in report order
+        output : str
+            The path of the report
+        image_index : str | None, optional
+            The image index of the cases without an own `image_path`
+        append : bool, optional
+            Append the cases to the report already rendered at the path, by default False
+
+        Returns
+        -------
+        RenderJob
+            The submitted job
+        """
+        if not isinstance(cases, list) or not output:
+            raise ValueError("A job requires a list of cases and an output path.")
+        if image_index is not None:
+            cases = [{"image_path": image_index, **case} for case in cases]
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ServerBusyError(f"The render server has {self._pending} pending jobs, retry later.")
+            self._pending += 1
+            job = RenderJob(id=uuid.uuid4().hex, output=output, sections=len(cases), future=Future())
+            self._jobs[job.id] = job
+            self._queue.append((job, (cases, output, append)))
+            self._evict_finished_jobs()
+        job.future.add_done_callback(lambda _: self._finish(job))
+        logger.info("Submit job %s with %d cases to %s.", job.id, job.sections, output)
+        self._dispatch()
+        return job
+
+    def _dispatch(self) -> None:
+        """
+        Hand the queued jobs to the worker processes while workers are free, cancelled jobs are skipped
+        """
+        # the futures of the jobs notify their callbacks, which take the lock, so they are changed outside of it
+        while True:
+            with self._lock:
+                if self._running >= self.workers or not self._queue:
+                    return
+                job, args = self._queue.popleft()
+                self._running += 1
+            if not job.future.set_running_or_notify_cancel():
+                with self._lock:
+                    self._running -= 1
+                continue
+            try:
+                worker_future = self._executor.submit(render_report, *args)
+            except RuntimeError as e:
+                # the pool is shut down
+                with self._lock:
+                    self._running -= 1
+                job.future.set_exception(e)
+                continue
+            worker_future.add_done_callback(lambda future, job=job: self._complete(job, future))
+
+    def _complete(self, job: RenderJob, worker_future: Future) -> None:
+        """
+        Pass the result of a worker to its job and start the next queued job
+        """
+        with self._lock:
+            self._running -= 1
+        if worker_future.cancelled():
+            job.future.set_exception(CancelledError())
+        elif worker_future.exception() is not None:
+            job.future.set_exception(worker_future.exception())
+        else:
+            job.future.set_result(worker_future.result())
+        self._dispatch()
+
+    def _finish(self, job: RenderJob) -> None:
+        """
+        Release the pending slot of a finished or cancelled job
+        """
+        with self._lock:
+            self._pending -= 1
+        try:
+            job.future.result()
+            logger.info("Finish job %s in %.2fs.", job.id, job.to_dict()["duration"])
+        except CancelledError:
+            logger.info("Cancel job %s.", job.id)
+        except Exception as e:
+            logger.error("Job %s failed: %r", job.id, e)
+
+    def _evict_finished_jobs(self) -> None:
+        """
+        Forget the oldest finished jobs beyond the number of kept finished jobs
+        """
+        finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> RenderJob | None:
+        """
+        Get a job by its id
+
+        Parameters
+        ----------
+        job_id : str
+            The id of the job
+
+        Returns
+        -------
+        RenderJob | None
+            The job, None if it is unknown
+        """
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job which has not been handed to a worker
+
+        Parameters
+        ----------
+        job_id : str
+            The id of the job
+
+        Returns
+        -------
+        bool
+            Whether the job is cancelled
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job.future.cancel() or job.future.cancelled()
+
+    def health(self) -> dict:
+        """
+        Get the load of the server
+
+        Returns
+        -------
+        dict
+            The number of queued and running jobs and the maximum number of pending jobs
+        """
+        statuses = [job.status for job in list(self._jobs.values())]
+        return {"queued": statuses.count("queued"), "running": statuses.count("running"), "pending": self._pending,
+                "max_pending": self.max_pending}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker processes, the queued jobs are cancelled
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Wait for the running jobs to finish, by default True
+        """
+        with self._lock:
+            queued = [job for job, _ in self._queue]
+            self._queue.clear()
+        for job in queued:
+            job.future.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the job api
+    """
+    server_version = "report_generator"
+
+    def _send_json(self, status: HTTPStatus, content: dict) -> None:
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_id(self) -> str | None:
+        parts = self.path.strip("/").split("/")
+        return parts[1] if len(parts) == 2 and parts[0] == "jobs" else None
+
+    def do_GET(self) -> None:
+        render_server: RenderServer = self.server.render_server
+        if self.path.rstrip("/") == "/health":
+            self._send_json(HTTPStatus.OK, render_server.health())
+            return
+        job = render_server.get(self._job_id() or "")
+        if job is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown job '{self.path}'."})
+        else:
+            self._send_json(HTTPStatus.OK, job.to_dict())
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint '{self.path}'."})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            job = self.server.render_server.submit(request.get("cases"), request.get("output"),
+                                                   image_index=request.get("image_index"),
+                                                   append=bool(request.get("append", False)))
+        except ServerBusyError as e:
+            self._send_json(HTTPStatus.TOO_MANY_REQUESTS, {"error": str(e)})
+        except (ValueError, AttributeError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Invalid job: {e}"})
+        else:
+            self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    def do_DELETE(self) -> None:
+        render_server: RenderServer = self.server.render_server
+        job_id = self._job_id()
+        try:
+            cancelled = render_server.cancel(job_id or "")
+        except KeyError:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown job '{self.path}'."})
+            return
+        job = render_server.get(job_id).to_dict()
+        self._send_json(HTTPStatus.OK if cancelled else HTTPStatus.CONFLICT, job)
+
+    def address_string(self) -> str:
+        # the client address of a Unix socket is empty
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _UnixHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP server listening on a Unix socket
+    """
+    address_family = socket.AF_UNIX
+
+    def server_bind(self) -> None:
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        self.socket.bind(self.server_address)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def create_http_server(render_server: RenderServer, port: int = 8765,
+                       socket_path: Path | str | None = None) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server of the job api, listening on localhost or on a Unix socket
+
+    Parameters
+    ----------
+    render_server : RenderServer
+        The render server running the jobs
+    port : int, optional
+        The local TCP port, 0 selects a free port, by default 8765
+    socket_path : Path | str | None, optional
+        The path of the Unix socket to listen on instead of the TCP port
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        The HTTP server, which is started with `serve_forever`
+    """
+    if socket_path is not None:
+        http_server = _UnixHTTPServer(str(socket_path), _JobRequestHandler)
+    else:
+        http_server = ThreadingHTTPServer(("127.0.0.1", port), _JobRequestHandler)
+    http_server.render_server = render_server
+    return http_server
+
+
+def serve(workers: int | None = None, max_pending: int = 100, port: int = 8765, socket_path: Path | str | None = None,
+          config_path: str | None = None, pdf_backend: str | None = None) -> None:
+    """
+    Run the render daemon until it is interrupted
+
+    Parameters
+    ----------
+    workers : int | None, optional
+        The number of worker processes, by default the number of cpus
+    max_pending : int, optional
+        The maximum number of queued and running jobs, by default 100
+    port : int, optional
+        The local TCP port, by default 8765
+    socket_path : Path | str | None, optional
+        The path of the Unix socket to listen on instead of the TCP port
+    config_path : str | None, optional
+        The configuration file of the workers
+    pdf_backend : str | None, optional
+        The PDF backend of the workers, by default the backend of the settings
+    """
+    render_server = RenderServer(workers=workers, max_pending=max_pending, config_path=config_path,
+                                 pdf_backend=pdf_backend)
+    http_server = create_http_server(render_server, port=port, socket_path=socket_path)
+    logger.info("Serve report jobs on %s.", socket_path or f"http://127.0.0.1:{http_server.server_port}")
+    try:
+        http_server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stop the render server.")
+    finally:
+        http_server.server_close()
+        render_server.shutdown()
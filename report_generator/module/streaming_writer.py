@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""A module for writing the body of a docx report to the zip file while it is rendered"""
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+
+from docx.document import Document
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+from lxml import etree
+
+
+_XML_DECLARATION = b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+
+
+class StreamingDocxWriter:
+    """
+    Writer streaming the rendered body content of a document into the `document.xml` of the docx zip file.
+
+    Every `flush` serializes the block items rendered since the last flush and removes them from the document, and
+    writes the image parts added since the last flush to the zip file and releases their content, so the memory is
+    bounded by the content of a single section instead of the whole report. The body is buffered in a temporary file,
+    since the zip file takes one member at a time, and written as `document.xml` when the writer is closed together
+    with the other parts (styles, headers, footers and relationships). The written parts are identical to the ones
+    written by `Document.save`. The zip file is written next to the path and replaces the file at the path only when
+    the writer is closed, so an aborted writer keeps a previous report.
+    """
+
+    def __init__(self, document: Document, path: Path | str):
+        """
+        Initialize the streaming writer of a document
+
+        Parameters
+        ----------
+        document : docx.document.Document
+            The document to stream, headers, footers and styles have to be set up before
+        path : Path | str
+            The path of the docx file to write
+        """
+        self.document = document
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        self._body = document.element.body
+        # an empty copy of the document and body element, which every chunk is serialized in, so the namespaces are
+        # declared once by the document element like in a complete serialization
+        root = document.element
+        self._skeleton = etree.Element(root.tag, attrib=dict(root.attrib), nsmap=root.nsmap)
+        self._skeleton_body = etree.SubElement(self._skeleton, self._body.tag)
+
+        empty_xml = self._serialize([])
+        root_end = empty_xml.rindex(b"<")
+        body_start = empty_xml.rindex(b"<", 0, root_end)
+        self._head = empty_xml[:body_start] + empty_xml[body_start:root_end - 2] + b">"
+        self._tail = b"</" + empty_xml[body_start + 1:root_end - 2] + b">" + empty_xml[root_end:]
+
+        self._zip_file: zipfile.ZipFile | None = None
+        self._stream = None
+        # the image parts already written to the zip file
+        self._written_media: set = set()
+        self._media_count = 0
+
+    def __enter__(self) -> 'StreamingDocxWriter':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
+
+    def _serialize(self, elements: list) -> bytes:
+        """
+        Serialize the body elements inside the document skeleton, moving them out of the document
+
+        Parameters
+        ----------
+        elements : list
+            The elements of the body
+
+        Returns
+        -------
+        bytes
+            The xml of the document skeleton containing the elements
+        """
+        for element in elements:
+            self._skeleton_body.append(element)
+        xml = etree.tostring(self._skeleton, encoding="UTF-8", xml_declaration=False)
+        for element in elements:
+            self._skeleton_body.remove(element)
+        return xml
+
+    def open(self) -> None:
+        """
+        Create the temporary docx file and the buffer of the `document.xml` and write its start
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._zip_file = zipfile.ZipFile(self._tmp_path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._stream = tempfile.TemporaryFile(prefix="report_generator_body_")
+        self._stream.write(_XML_DECLARATION + self._head)
+
+    def flush(self) -> None:
+        """
+        Write the body content and the image parts added since the last flush and remove them from the document
+        """
+        sect_pr = self._body.sectPr
+        elements = [element for element in self._body if element is not sect_pr]
+        if elements:
+            self._stream.write(self._serialize(elements)[len(self._head):-len(self._tail)])
+        self._write_media()
+
+    def _write_media(self) -> None:
+        """
+        Write the image parts added since the last call to the zip file and release their content, the image header
+        (size, resolution, file name) stays available for further pictures of the same image
+        """
+        image_parts = self.document.part.package.image_parts
+        if len(image_parts) == self._media_count:
+            return
+        for part in list(image_parts)[self._media_count:]:
+            self._zip_file.writestr(part.partname.membername, part.blob)
+            image = part.image
+            part._blob = image._blob = b""
+            self._written_media.add(part.partname)
+        self._media_count = len(image_parts)
+
+    def close(self) -> None:
+        """
+        Write the remaining body content and the section properties, then all other parts of the package, and replace
+        the file at the path by the written docx file
+        """
+        self.flush()
+        sect_pr = self._body.sectPr
+        if sect_pr is not None:
+            self._stream.write(self._serialize([sect_pr])[len(self._head):])
+            self._body.append(sect_pr)
+        else:
+            self._stream.write(self._tail)
+        self._stream.seek(0)
+        with self._zip_file.open(self.document.part.partname.membername, "w", force_zip64=True) as member:
+            shutil.copyfileobj(self._stream, member)
+        self._stream.close()
+        self._stream = None
+
+        # the remaining parts are written like `docx.opc.pkgwriter.PackageWriter` does
+        package = self.document.part.package
+        parts = list(package.iter_parts())
+        for part in parts:
+            part.before_marshal()
+        self._zip_file.writestr(CONTENT_TYPES_URI[1:], _ContentTypesItem.from_parts(parts).blob)
+        self._zip_file.writestr(PACKAGE_URI.rels_uri[1:], package.rels.xml)
+        for part in parts:
+            if part is not self.document.part and part.partname not in self._written_media:
+                self._zip_file.writestr(part.partname.membername, part.blob)
+            if len(part.rels):
+                self._zip_file.writestr(part.partname.rels_uri[1:], part.rels.xml)
+        self._zip_file.close()
+        self._zip_file = None
+        os.replace(self._tmp_path, self.path)
+
+    def _abort(self) -> None:
+        """
+        Close and remove the incomplete docx file, the file at the path is kept
+        """
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._zip_file is not None:
+            self._zip_file.close()
+            self._zip_file = None
+        self._tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the section rendering time of reports with an increasing number of synthetic cases.
+
+The time per case should stay nearly constant from small to large reports, otherwise the rendering scales
+super-linearly with the report length.
+
+Usage: python -m scripts.benchmark_render --cases 10 100 1000 5000
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from docx import Document
+
+from report_generator.common.generate_interface import ReportGenerator
+from report_generator.common.render_context import RenderContext
+from report_generator.common.section_interface import CaseSection
+
+
+_IMAGE_PATH = Path("tests/data/img.png")
+
+
+def argparser(args: list | None = None) -> argparse.Namespace:
+    """An argument parser for the render benchmark
+
+    Parameters
+    ----------
+    args : list, optional
+        The input arguments when run script
+
+    Returns
+    -------
+    argparse.Namespace
+        The Namespace of argument parser
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the section rendering with synthetic cases")
+    parser.add_argument('--cases', type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="The numbers of cases to render. (default: 10 100 1000 5000)")
+    return parser.parse_args(args)
+
+
+def synthesize_cases(case_count: int, image_index_path: Path) -> list[dict]:
+    """Create a list of synthetic cases and write the image index of the cases
+
+    Parameters
+    ----------
+    case_count : int
+        The number of cases
+    image_index_path : Path
+        The path to write the image index to
+
+    Returns
+    -------
+    list[dict]
+        The case dictionaries
+    """
+    cases = []
+    image_index = {}
+    for i in range(case_count):
+        title = f"CCRs_AEB_benchmark_case_{i}"
+        result = i % 3 != 0
+        cases.append({
+            "title": title,
+            "result": "PASSED" if result else "FAILED",
+            "settings": {"gvt": "30km/h", "ol": "-50%", "vut": f"{20 + i % 40}km/h"},
+            "condition_result": {
+                f"file{j}": [(['external_relative_longitudinal_distance > 0', 'all'], result),
+                             (['SG_TTC > 1.5', 'any'], True)] for j in range(1, 3)
+            },
+            "image_path": str(image_index_path)
+        })
+        image_index[title] = {"File 1": [str(_IMAGE_PATH)]}
+    image_index_path.write_text(json.dumps([image_index]), encoding="utf-8")
+    return cases
+
+
+def run_benchmark(case_count: int, work_dir: Path) -> float:
+    """Render a report with synthetic cases and return the rendering time
+
+    Parameters
+    ----------
+    case_count : int
+        The number of cases
+    work_dir : Path
+        A directory for the synthetic input files
+
+    Returns
+    -------
+    float
+        The rendering time of all sections in seconds
+    """
+    cases = synthesize_cases(case_count, work_dir.joinpath(f"image_index_{case_count}.json"))
+    doc = Document()
+    ReportGenerator.global_setup(doc)
+    sections = []
+    for case in cases:
+        section = CaseSection(case)
+        section.create_section()
+        sections.append(section)
+
+    start = time.perf_counter()
+    context = RenderContext(doc)
+    for section in sections:
+        section.render(doc, context)
+    return time.perf_counter() - start
+
+
+def main(args: list | None = None) -> None:
+    """Main function of the render benchmark."""
+    arguments = argparser(args)
+    print(f"{'cases':>8} | {'total [s]':>10} | {'per case [ms]':>14}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for case_count in arguments.cases:
+            duration = run_benchmark(case_count, Path(work_dir))
+            print(f"{case_count:>8} | {duration:>10.3f} | {duration / case_count * 1000:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the report generation with synthetic case lists at scale.
+
+Every case count is benchmarked in a fresh process, so the peak resident memory belongs to that case count only. The
+results are stored as json file per commit and compared with a baseline, by default the latest stored result of another
+commit on the same platform and python version. Every duration is the best of repeated runs. A metric which is slower or
+larger than the baseline by more than the threshold fails the run.
+
+Usage: python -m scripts.benchmark_suite --cases 10 100 1000 10000 --threshold 0.2
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+from docx import Document
+
+from report_generator.common.element_interface import GlobalSetupBuilder, Image, Table, Tables
+from report_generator.common.generate_interface import ReportGenerator
+from report_generator.common.logger import configure_logger
+from report_generator.common.render_context import RenderContext
+from report_generator.common.section_interface import CaseSection
+from report_generator.compontent.global_setting_interface import set_global_formatting
+from report_generator.compontent.settings import get_config
+from report_generator.module.image_registry import ImageRegistry, get_image_bytes_cache
+from report_generator.module.pdf_backend import PdfConversionQueue, create_pdf_backend
+
+
+_RESULT_IMAGES = sorted(Path("tests/data_and_request/result_images").glob("*.png"))
+_CONDITIONS = [['external_relative_longitudinal_distance > 0', 'all'], ['SG_TTC > 1.5', 'any'],
+               ['SG_In_VXH_POI1 < 25', 'all[2.0:5.5]'], ['abs(SG_In_DXH_POI1) > 0.5', 'any'],
+               ['SG_TTC < 4 and SG_In_VXH_POI1 > 0', 'any[3:]'], ['SG_In_DXH_POI1 > 0', 'all']]
+# the metrics compared with the baseline, all of them are better when smaller
+_METRICS = ["create_section", "table_render", "image_render", "generate", "output_size", "peak_rss"]
+
+
+def argparser(args: list | None = None) -> argparse.Namespace:
+    """An argument parser for the benchmark suite
+
+    Parameters
+    ----------
+    args : list, optional
+        The input arguments when run script
+
+    Returns
+    -------
+    argparse.Namespace
+        The Namespace of argument parser
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the report generation with synthetic case lists")
+    parser.add_argument('--cases', type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="The numbers of cases to benchmark. (default: 10 100 1000 10000)")
+    parser.add_argument('--results-dir', type=Path, default=Path("test_results/benchmarks"),
+                        help="The directory of the stored results per commit. (default: test_results/benchmarks)")
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help="The result file to compare with. (default: the latest result of another commit)")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="The relative increase of a metric over the baseline which fails the run. (default: 0.2)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="The number of runs per case count, the best duration is compared. (default: 3)")
+    return parser.parse_args(args)
+
+
+def synthesize_cases(case_count: int, work_dir: Path) -> list[dict]:
+    """Create a list of synthetic cases with condition tables and write the image index of the cases
+
+    The cases have one to three measurement files with two to six conditions each and use one to five of the bundled
+    result images per file.
+
+    Parameters
+    ----------
+    case_count : int
+        The number of cases
+    work_dir : Path
+        The directory to write the image index to
+
+    Returns
+    -------
+    list[dict]
+        The case dictionaries
+    """
+    image_index_path = work_dir.joinpath(f"image_index_{case_count}.json")
+    cases = []
+    image_index = {}
+    for i in range(case_count):
+        title = f"CCRs_AEB_benchmark_case_{i}"
+        file_keys = [f"file{j}" for j in range(1, i % 3 + 2)]
+        condition_result = {file_key: [(condition, (i + k) % 7 != 0) for k, condition in
+                                       enumerate(_CONDITIONS[:2 + (i + j) % 5])]
+                            for j, file_key in enumerate(file_keys)}
+        passed = all(result for results in condition_result.values() for _, result in results)
+        cases.append({
+            "title": title,
+            "result": "PASSED" if passed else "FAILED",
+            "settings": {"gvt": "30km/h", "ol": "-50%", "vut": f"{20 + i % 40}km/h"},
+            "condition_result": condition_result,
+            "image_path": str(image_index_path)
+        })
+        image_index[title] = {f"File {j}": [str(path) for path in _RESULT_IMAGES[:1 + (i + j) % len(_RESULT_IMAGES)]]
+                              for j in range(1, len(file_keys) + 1)}
+    image_index_path.write_text(json.dumps([image_index]), encoding="utf-8")
+    return cases
+
+
+def _peak_rss() -> int | None:
+    """Get the peak resident memory of the process in bytes, None where it is not available"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # the peak is given in bytes on macOS and in kilobytes on Linux
+    return peak if platform.system() == "Darwin" else peak * 1024
+
+
+def _render_elements(cases: list[dict]) -> tuple[float, float]:
+    """Render the condition tables and the images of the cases into separate documents
+
+    Returns
+    -------
+    tuple[float, float]
+        The time of all `Table.render` and all `Image.render` calls in seconds
+    """
+    tables = [Table(data=Tables._format_condition_result(condition_list))
+              for case in cases for condition_list in case["condition_result"].values()]
+    document = Document()
+    context = RenderContext(document)
+    start = time.perf_counter()
+    for table in tables:
+        table.render(document, context)
+    table_time = time.perf_counter() - start
+
+    images = [Image(case_name=case["title"], image_path=case["image_path"]) for case in cases]
+    document = Document()
+    context = RenderContext(document)
+    start = time.perf_counter()
+    for image in images:
+        image.render(document, context)
+    return table_time, time.perf_counter() - start
+
+
+def _generate_once(cases: list[dict], output: Path) -> dict:
+    """Create the sections of the cases, render their elements and generate the report once
+
+    Returns
+    -------
+    dict
+        The durations of the steps in seconds
+    """
+    start = time.perf_counter()
+    sections = []
+    for case in cases:
+        section = CaseSection(case)
+        section.create_section()
+        sections.append(section)
+    create_time = time.perf_counter() - start
+    table_time, image_time = _render_elements(cases)
+
+    generator = ReportGenerator(pdf_queue=PdfConversionQueue(create_pdf_backend("none")), render_workers=1)
+    for section in sections:
+        generator.add_section(section)
+    start = time.perf_counter()
+    generator.generate(str(output))
+    generate_time = time.perf_counter() - start
+    generator.pdf_queue.shutdown()
+    return {"create_section": create_time, "table_render": table_time, "image_render": image_time,
+            "generate": generate_time}
+
+
+def benchmark_case_count(case_count: int, work_dir: Path, repeat: int = 3) -> dict:
+    """Benchmark the report generation for a number of cases, run in a fresh process
+
+    Parameters
+    ----------
+    case_count : int
+        The number of cases
+    work_dir : Path
+        A directory for the synthetic input files and the report
+    repeat : int, optional
+        The number of runs, by default 3
+
+    Returns
+    -------
+    dict
+        The best durations of the runs in seconds, the output size and the peak resident memory in bytes
+    """
+    configure_logger({"name": "report_generator", "level": "warning"})
+    cases = synthesize_cases(case_count, work_dir)
+    output = work_dir.joinpath(f"report_{case_count}.docx")
+    runs = [_generate_once(cases, output) for _ in range(max(1, repeat))]
+    metrics = {name: min(run[name] for run in runs) for name in runs[0]}
+    return {**metrics, "output_size": output.stat().st_size, "peak_rss": _peak_rss()}
+
+
+def benchmark_global_setup(repeat: int = 20) -> float:
+    """Benchmark the `GlobalSetupBuilder` rendering the header and footer into a new document
+
+    Parameters
+    ----------
+    repeat : int, optional
+        The number of repetitions, by default 20
+
+    Returns
+    -------
+    float
+        The best time of a header and footer rendering in seconds
+    """
+    configure_logger({"name": "report_generator", "level": "warning"})
+    settings = get_config().settings
+    durations = []
+    for _ in range(repeat):
+        document = Document()
+        set_global_formatting(document)
+        registry = ImageRegistry(document.part.package, get_image_bytes_cache())
+        start = time.perf_counter()
+        builder = GlobalSetupBuilder(doc=document, left_header_text=settings.header_text,
+                                     footer_text=settings.footer_text, middle_footer_text=settings.middle_footer_text,
+                                     image_path=settings.logo_path or None, image_registry=registry)
+        builder.header_render(document).footer_render(document)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def benchmark_document_setup(repeat: int = 20) -> float:
+    """Benchmark the setup of a new report document, cloned from the base document template after the first report
+
+    Parameters
+    ----------
+    repeat : int, optional
+        The number of repetitions, by default 20
+
+    Returns
+    -------
+    float
+        The best time of the setup of a report document in seconds
+    """
+    configure_logger({"name": "report_generator", "level": "warning"})
+    # the first document builds the template, which happens once per process
+    ReportGenerator()._new_document()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ReportGenerator()._new_document()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def _run_isolated(function, *args):
+    """Run a benchmark function in a fresh spawned process and return its result"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def _git_commit() -> str:
+    """Get the short hash of the checked out commit, 'unknown' outside a git repository"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def is_comparable(results: dict, baseline: dict) -> bool:
+    """Check whether the baseline results are measured on the same platform with the same python version
+
+    Parameters
+    ----------
+    results : dict
+        The benchmark results
+    baseline : dict
+        The benchmark results to compare with
+
+    Returns
+    -------
+    bool
+        True if the durations of both results are comparable
+    """
+    return all(results.get(key) == baseline.get(key) for key in ("platform", "python"))
+
+
+def compare_results(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Compare the results with the baseline results, which have to be comparable, see `is_comparable`
+
+    Parameters
+    ----------
+    results : dict
+        The benchmark results
+    baseline : dict
+        The benchmark results to compare with
+    threshold : float
+        The relative increase of a metric which is a regression, e.g. 0.2 for 20 percent
+
+    Returns
+    -------
+    list[str]
+        The description of every regression
+    """
+    regressions = []
+    pairs = [(name, results.get(name), baseline.get(name)) for name in ("global_setup", "document_setup")]
+    for case_count, metrics in results.get("cases", {}).items():
+        baseline_metrics = baseline.get("cases", {}).get(case_count, {})
+        pairs.extend((f"{case_count} cases {metric}", metrics.get(metric), baseline_metrics.get(metric))
+                     for metric in _METRICS)
+    for name, value, baseline_value in pairs:
+        if value is not None and baseline_value and value > baseline_value * (1 + threshold):
+            regressions.append(f"{name}: {value:.4g} vs. {baseline_value:.4g} (+{value / baseline_value - 1:.0%})")
+    return regressions
+
+
+def _find_baseline(results_dir: Path, results: dict) -> Path | None:
+    """Find the latest stored result of another commit, which is comparable with the results"""
+    candidates = []
+    for path in results_dir.glob("*.json"):
+        if path.stem == results["commit"]:
+            continue
+        try:
+            baseline = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if is_comparable(results, baseline):
+            candidates.append(path)
+    return max(candidates, key=lambda path: path.stat().st_mtime, default=None)
+
+
+def main(args: list | None = None) -> None:
+    """Main function of the benchmark suite."""
+    arguments = argparser(args)
+    commit = _git_commit()
+    results = {"commit": commit, "date": datetime.now().isoformat(timespec="seconds"),
+               "python": platform.python_version(), "platform": platform.platform(),
+               "global_setup": _run_isolated(benchmark_global_setup),
+               "document_setup": _run_isolated(benchmark_document_setup), "cases": {}}
+    print(f"global setup: {results['global_setup'] * 1000:.3f} ms")
+    print(f"document setup: {results['document_setup'] * 1000:.3f} ms")
+    print(f"{'cases':>8} | {'create [s]':>10} | {'tables [s]':>10} | {'images [s]':>10} | {'generate [s]':>12} | "
+          f"{'size [MB]':>9} | {'peak rss [MB]':>13}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for case_count in arguments.cases:
+            metrics = _run_isolated(benchmark_case_count, case_count, Path(work_dir), arguments.repeat)
+            results["cases"][str(case_count)] = metrics
+            peak_rss = f"{metrics['peak_rss'] / 2 ** 20:>13.1f}" if metrics["peak_rss"] else f"{'-':>13}"
+            print(f"{case_count:>8} | {metrics['create_section']:>10.3f} | {metrics['table_render']:>10.3f} | "
+                  f"{metrics['image_render']:>10.3f} | {metrics['generate']:>12.3f} | "
+                  f"{metrics['output_size'] / 2 ** 20:>9.2f} | {peak_rss}")
+
+    baseline_path = arguments.baseline or _find_baseline(arguments.results_dir, results)
+    arguments.results_dir.mkdir(parents=True, exist_ok=True)
+    result_path = arguments.results_dir.joinpath(f"{commit}.json")
+    result_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Stored the results in {result_path}.")
+    if baseline_path is None:
+        print("No baseline result to compare with.")
+        return
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if not is_comparable(results, baseline):
+        print(f"The baseline {baseline_path} is measured on {baseline.get('platform')} with python "
+              f"{baseline.get('python')}, which is not comparable with {results['platform']} with python "
+              f"{results['python']}.")
+        return
+    regressions = compare_results(results, baseline, arguments.threshold)
+    print(f"Compared with {baseline_path}: {len(regressions)} regressions beyond {arguments.threshold:.0%}.")
+    for regression in regressions:
+        print(f"  {regression}")
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the run formatting throughput of the text formats.
+
+The precomputed run properties of a shared text format are copied into every run in one operation, compared to
+building the format per element and setting the five font properties of every run one after another.
+
+Usage: python -m scripts.benchmark_text_format --runs 100000
+"""
+import argparse
+import time
+
+from docx.oxml import OxmlElement
+from docx.shared import Pt
+from docx.text.run import Run
+
+from report_generator.common.element_interface import NormalTextFormat
+
+
+def argparser(args: list | None = None) -> argparse.Namespace:
+    """An argument parser for the text format benchmark
+
+    Parameters
+    ----------
+    args : list, optional
+        The input arguments when run script
+
+    Returns
+    -------
+    argparse.Namespace
+        The Namespace of argument parser
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the run formatting of the text formats")
+    parser.add_argument('--runs', type=int, default=100000,
+                        help="The number of runs to format. (default: 100000)")
+    return parser.parse_args(args)
+
+
+def format_runs_per_property(run_count: int) -> float:
+    """Build the format per run and set its font properties one after another, return the duration
+
+    Parameters
+    ----------
+    run_count : int
+        The number of runs
+
+    Returns
+    -------
+    float
+        The duration in seconds
+    """
+    start = time.perf_counter()
+    for _ in range(run_count):
+        text_format = NormalTextFormat()
+        run = Run(OxmlElement('w:r'), None)
+        run.font.name = text_format.font_name
+        run.font.size = Pt(text_format.font_size)
+        run.font.color.rgb = text_format.color
+        run.bold = text_format.bold
+        run.italic = text_format.italic
+    return time.perf_counter() - start
+
+
+def format_runs_shared(run_count: int) -> float:
+    """Copy the precomputed run properties of the shared format into every run, return the duration
+
+    Parameters
+    ----------
+    run_count : int
+        The number of runs
+
+    Returns
+    -------
+    float
+        The duration in seconds
+    """
+    start = time.perf_counter()
+    for _ in range(run_count):
+        NormalTextFormat.shared().apply_format(Run(OxmlElement('w:r'), None))
+    return time.perf_counter() - start
+
+
+def main(args: list | None = None) -> None:
+    """Main function of the text format benchmark."""
+    arguments = argparser(args)
+    print(f"{'method':>14} | {'total [s]':>10} | {'runs per second':>16}")
+    for method, benchmark in [("per property", format_runs_per_property), ("shared rPr", format_runs_shared)]:
+        duration = benchmark(arguments.runs)
+        print(f"{method:>14} | {duration:>10.3f} | {arguments.runs / duration:>16.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""The shared fixtures of the test modules"""
+from typing import Iterable
+
+import pytest
+
+from report_generator.__main__ import EXAMPLE_CASE_LIST
+from report_generator.common.generate_interface import ReportGenerator
+from report_generator.common.section_interface import CaseSection, Section
+from report_generator.module.pdf_backend import PdfBackend, PdfConversionQueue, SkipPdfBackend
+
+
+@pytest.fixture
+def make_generator():
+    """A factory of report generators with the case sections, the PDF conversion queues are shut down after the test
+
+    The factory takes the case dictionaries (by default the example cases), further sections added after them, the
+    PDF backend (by default skipping the conversion), the multiprocessing context of the render workers and the
+    keyword arguments of the `ReportGenerator`.
+    """
+    pdf_queues = []
+
+    def make(cases: list[dict] | None = None, sections: Iterable[Section] = (), pdf_backend: PdfBackend | None = None,
+             mp_context=None, **kwargs) -> ReportGenerator:
+        pdf_queue = PdfConversionQueue(pdf_backend or SkipPdfBackend())
+        pdf_queues.append(pdf_queue)
+        generator = ReportGenerator(pdf_queue=pdf_queue, **kwargs)
+        generator.mp_context = mp_context
+        for case in EXAMPLE_CASE_LIST if cases is None else cases:
+            section = CaseSection(case)
+            section.create_section()
+            generator.add_section(section)
+        for section in sections:
+            generator.add_section(section)
+        return generator
+
+    yield make
+    for pdf_queue in pdf_queues:
+        pdf_queue.shutdown()
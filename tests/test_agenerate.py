@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""A test module for the asynchronous generation of reports"""
+import asyncio
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from report_generator.common.section_interface import Section
+
+
+class _TrackingSection(Section):
+    """Render nothing but record the renderings and the most renderings at once, optionally blocked until released
+    or until the renderings of the other parties of a barrier are running"""
+
+    def __init__(self, tracker: dict, release: threading.Event | None = None, barrier: threading.Barrier | None = None):
+        super().__init__()
+        self.tracker = tracker
+        self.release = release
+        self.barrier = barrier
+
+    def render(self, document, context=None) -> None:
+        with self.tracker["lock"]:
+            self.tracker["active"] += 1
+            self.tracker["rendered"] += 1
+            self.tracker["max_active"] = max(self.tracker["max_active"], self.tracker["active"])
+        self.tracker["started"].set()
+        if self.release is not None:
+            self.release.wait(5)
+        if self.barrier is not None:
+            self.barrier.wait()
+        # a third concurrent rendering would be recorded while the parties of the barrier are still active
+        time.sleep(0.05)
+        with self.tracker["lock"]:
+            self.tracker["active"] -= 1
+
+
+def _tracker() -> dict:
+    """A new tracker of the renderings"""
+    return {"lock": threading.Lock(), "started": threading.Event(), "active": 0, "rendered": 0, "max_active": 0}
+
+
+class TestAgenerate:
+    def test_concurrent_reports_limited_by_semaphore(self, tmp_path: Path, make_generator) -> None:
+        """The concurrently generated reports equal the synchronously generated report, at most two at once"""
+        tracker = _tracker()
+        barrier = threading.Barrier(2, timeout=5)
+        make_generator(sections=[_TrackingSection(_tracker())]).generate(str(tmp_path.joinpath("sync.docx")))
+
+        async def generate_all() -> list:
+            semaphore = asyncio.Semaphore(2)
+            generators = [make_generator(sections=[_TrackingSection(tracker, barrier=barrier)]) for _ in range(4)]
+            return await asyncio.gather(*(generator.agenerate(str(tmp_path.joinpath(f"async_{i}.docx")), semaphore=semaphore)
+                                          for i, generator in enumerate(generators)))
+
+        jobs = asyncio.run(generate_all())
+        assert [job.docx_path.name for job in jobs] == [f"async_{i}.docx" for i in range(4)]
+        assert tracker["rendered"] == 4 and tracker["max_active"] == 2
+        with zipfile.ZipFile(tmp_path.joinpath("sync.docx")) as a, zipfile.ZipFile(tmp_path.joinpath("async_3.docx")) as b:
+            assert a.read("word/document.xml") == b.read("word/document.xml")
+
+    def test_cancellation_between_sections(self, tmp_path: Path, make_generator) -> None:
+        """A cancelled generation stops at the next section without saving, the next generation renders all again"""
+        tracker = _tracker()
+        release = threading.Event()
+        path = tmp_path.joinpath("report.docx")
+        generator = make_generator(sections=[_TrackingSection(tracker, release), _TrackingSection(tracker)])
+
+        async def generate_and_cancel() -> None:
+            task = asyncio.create_task(generator.agenerate(str(path)))
+            await asyncio.to_thread(tracker["started"].wait, 5)
+            task.cancel()
+            await asyncio.sleep(0.1)
+            release.set()
+            await task
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(generate_and_cancel())
+        assert tracker["rendered"] == 1 and not path.exists()
+
+        generator.generate(str(path))
+        assert tracker["rendered"] == 3 and path.exists()
+
+    def test_cancellation_keeps_previous_report(self, tmp_path: Path, make_generator) -> None:
+        """A cancelled generation keeps the file at the path as it was, also when streaming"""
+        path = tmp_path.joinpath("report.docx")
+        path.write_bytes(b"previous report")
+        for streaming in (False, True):
+            tracker = _tracker()
+            release = threading.Event()
+            generator = make_generator(sections=[_TrackingSection(tracker, release), _TrackingSection(tracker)],
+                                       streaming=streaming)
+
+            async def generate_and_cancel() -> None:
+                task = asyncio.create_task(generator.agenerate(str(path)))
+                await asyncio.to_thread(tracker["started"].wait, 5)
+                task.cancel()
+                await asyncio.sleep(0.1)
+                release.set()
+                await task
+
+            with pytest.raises(asyncio.CancelledError):
+                asyncio.run(generate_and_cancel())
+            assert list(tmp_path.iterdir()) == [path] and path.read_bytes() == b"previous report"
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""A test module for the benchmark suite"""
+import json
+from pathlib import Path
+
+from scripts.benchmark_suite import _find_baseline, compare_results, is_comparable, synthesize_cases
+
+
+class TestBenchmarkSuite:
+    def test_synthetic_cases_have_images(self, tmp_path: Path) -> None:
+        """Every synthetic case has condition tables and bundled result images in its image index"""
+        cases = synthesize_cases(30, tmp_path)
+        image_index = json.loads(Path(cases[0]["image_path"]).read_text(encoding="utf-8"))[0]
+        assert len(cases) == len(image_index) == 30
+        assert all(case["condition_result"] for case in cases)
+        assert all(Path(path).is_file() for files in image_index.values() for paths in files.values() for path in paths)
+
+    def test_regressions_beyond_threshold(self) -> None:
+        """Only metrics increased beyond the threshold are regressions"""
+        baseline = {"global_setup": 0.010, "cases": {"10": {"generate": 1.0, "output_size": 1000, "peak_rss": None}}}
+        results = {"global_setup": 0.011, "cases": {"10": {"generate": 1.5, "output_size": 1000, "peak_rss": 5}}}
+        regressions = compare_results(results, baseline, threshold=0.2)
+        assert len(regressions) == 1 and regressions[0].startswith("10 cases generate")
+
+    def test_baseline_of_same_platform_and_python(self, tmp_path: Path) -> None:
+        """Only a result of another commit on the same platform and python version is a baseline"""
+        results = {"commit": "c", "platform": "Linux-x86_64", "python": "3.11.7"}
+        for commit, platform, python in (("a", "Linux-x86_64", "3.11.7"), ("b", "Windows-10", "3.11.7"),
+                                         ("c", "Linux-x86_64", "3.11.7"), ("d", "Linux-x86_64", "3.12.1")):
+            content = {"commit": commit, "platform": platform, "python": python}
+            tmp_path.joinpath(f"{commit}.json").write_text(json.dumps(content), encoding="utf-8")
+        tmp_path.joinpath("broken.json").write_text("{", encoding="utf-8")
+        assert _find_baseline(tmp_path, results) == tmp_path.joinpath("a.json")
+        assert not is_comparable(results, {"platform": "Linux-x86_64", "python": "3.12.1"})
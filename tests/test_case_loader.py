@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""A test module for loading the case list and generating the report of it in a single pass"""
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from docx import Document
+
+from report_generator.__main__ import EXAMPLE_CASE_LIST, main
+from report_generator.common.section_interface import CaseSection
+from report_generator.module.case_loader import load_case_list
+
+
+class _CountingSection(CaseSection):
+    """A case section counting its renderings"""
+
+    def __init__(self, section_dict: dict) -> None:
+        super().__init__(section_dict)
+        self.renderings = 0
+        self.create_section()
+
+    def render(self, document, context=None) -> None:
+        self.renderings += 1
+        super().render(document, context)
+
+
+def _cases(title: str) -> list[dict]:
+    """The example cases renamed with the title as prefix"""
+    return [{**case, "title": f"{title}_{case['title']}"} for case in EXAMPLE_CASE_LIST]
+
+
+def _paragraphs(path: Path) -> list[str]:
+    """The texts of the paragraphs of a docx file"""
+    return [paragraph.text for paragraph in Document(str(path)).paragraphs]
+
+
+class TestLoadCaseList:
+    def test_json_list(self, tmp_path: Path) -> None:
+        """A json file with a list of cases is loaded in order"""
+        path = tmp_path.joinpath("cases.json")
+        path.write_text(json.dumps(_cases("a")), encoding="utf-8")
+        assert [case["title"] for case in load_case_list(str(path))] == [case["title"] for case in _cases("a")]
+
+    def test_json_lines(self, tmp_path: Path) -> None:
+        """A json-lines file is loaded with one case per line, skipping empty lines"""
+        path = tmp_path.joinpath("cases.jsonl")
+        path.write_text("\n".join(json.dumps(case) for case in _cases("a")) + "\n\n", encoding="utf-8")
+        assert [case["title"] for case in load_case_list(str(path))] == [case["title"] for case in _cases("a")]
+
+    def test_stdin(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The json list is read from stdin for '-'"""
+        monkeypatch.setattr(sys, "stdin", io.StringIO(json.dumps([{"title": "case"}])))
+        assert load_case_list("-") == [{"title": "case"}]
+
+    def test_invalid_input(self, tmp_path: Path) -> None:
+        """A missing file, invalid json and a json object instead of a list are rejected"""
+        with pytest.raises(FileNotFoundError):
+            load_case_list(str(tmp_path.joinpath("missing.json")))
+        path = tmp_path.joinpath("cases.json")
+        path.write_text("[{", encoding="utf-8")
+        with pytest.raises(json.JSONDecodeError):
+            load_case_list(str(path))
+        path.write_text(json.dumps({"title": "case"}), encoding="utf-8")
+        with pytest.raises(ValueError, match="must contain a list"):
+            load_case_list(str(path))
+
+
+class TestSinglePass:
+    def test_second_generate_renders_new_sections(self, tmp_path: Path, make_generator) -> None:
+        """A second generate call renders only the sections added after the first call"""
+        first = [_CountingSection(case) for case in _cases("first")]
+        generator = make_generator([], first)
+        generator.generate(str(tmp_path.joinpath("report.docx")))
+        second = [_CountingSection(case) for case in _cases("second")]
+        for section in second:
+            generator.add_section(section)
+        generator.generate(str(tmp_path.joinpath("report.docx")))
+
+        assert [section.renderings for section in first + second] == [1] * 4
+        paragraphs = _paragraphs(tmp_path.joinpath("report.docx"))
+        assert all(any(case["title"] in text for text in paragraphs) for case in _cases("first") + _cases("second"))
+
+    def test_append_reuses_report(self, tmp_path: Path, make_generator) -> None:
+        """In append mode the report at the path is the prefix of the new sections"""
+        path = tmp_path.joinpath("report.docx")
+        for title, append in (("first", False), ("second", True)):
+            sections = [_CountingSection(case) for case in _cases(title)]
+            make_generator([], sections).generate(str(path), append=append)
+            assert [section.renderings for section in sections] == [1, 1]
+
+        paragraphs = _paragraphs(path)
+        titles = [next(i for i, text in enumerate(paragraphs) if case["title"] in text)
+                  for case in _cases("first") + _cases("second")]
+        assert titles == sorted(titles)
+
+    def test_cli_cases_appended(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The command line renders the case list file and appends a second list to the same report"""
+        output = tmp_path.joinpath("report.docx")
+        for title, extra_args in (("first", []), ("second", ["--append"])):
+            cases_path = tmp_path.joinpath(f"{title}.jsonl")
+            cases_path.write_text("\n".join(json.dumps(case) for case in _cases(title)), encoding="utf-8")
+            monkeypatch.setattr(sys, "argv", ["report_generator", "--cases", str(cases_path), "--output", str(output),
+                                              "--pdf-backend", "none", *extra_args])
+            main()
+
+        paragraphs = _paragraphs(output)
+        assert all(any(case["title"] in text for text in paragraphs) for case in _cases("first") + _cases("second"))
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""A test module for the vectorized condition engine"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from report_generator.module.condition_engine import ConditionEngine, compile_condition
+from report_generator.module.measurement_loader import load_measurement
+
+
+_MEASUREMENT_PATH = Path("tests/data_and_request/CCRs_100_20_ECE_MM_20231106_171436.txt")
+
+
+class TestConditionEngine:
+    def test_condition_result_of_files(self) -> None:
+        """The engine returns the condition result structure of a case, aliases are resolved to signals"""
+        engine = ConditionEngine(aliases={"external_relative_longitudinal_distance": "SG_In_DXH_POI1"})
+        conditions = [['external_relative_longitudinal_distance > 0', 'all'], ['SG_TTC > 1.5', 'any']]
+        result = engine.evaluate({"file1": _MEASUREMENT_PATH, "file2": _MEASUREMENT_PATH}, conditions)
+        assert result == {file_key: [(conditions[0], True), (conditions[1], True)] for file_key in ("file1", "file2")}
+
+    def test_vectorized_equals_sample_loop(self) -> None:
+        """The vectorized evaluation with time window equals a loop over the valid samples"""
+        measurement = load_measurement(_MEASUREMENT_PATH, signals=["Time", "SG_TTC", "SG_In_VXH_POI1"])
+        expected = any(ttc < 2.0 and 0 < velocity < 25 for t, ttc, velocity in
+                       zip(measurement["Time"], measurement["SG_TTC"], measurement["SG_In_VXH_POI1"])
+                       if 5.0 <= t <= 12.0 and not np.isnan(ttc) and not np.isnan(velocity))
+        result = ConditionEngine().evaluate_file(_MEASUREMENT_PATH, [['SG_TTC < 2.0 and 0 < SG_In_VXH_POI1 < 25', 'any[5:12]']])
+        assert result[0][1] == expected
+
+    def test_signals_of_conditions_loaded(self) -> None:
+        """Only the signals of the conditions are loaded, with the time signal for a time window"""
+        engine = ConditionEngine(aliases={"distance": "SG_In_DXH_POI1"})
+        assert set(engine.load_signals(_MEASUREMENT_PATH, [['distance > 0', 'all']])) == {"SG_In_DXH_POI1"}
+        assert set(engine.load_signals(_MEASUREMENT_PATH, [['distance > 0', 'all'], ['SG_TTC > 1.5', 'any[5:12]']])) \
+            == {"SG_In_DXH_POI1", "SG_TTC", "Time"}
+
+    def test_compiled_once(self) -> None:
+        """A condition is compiled once and reused"""
+        assert compile_condition(['SG_TTC > 1.5', 'all']) is compile_condition(['SG_TTC > 1.5', 'all'])
+
+    @pytest.mark.parametrize("condition", [['__import__("os")', 'all'], ['SG_TTC >', 'all'], ['SG_TTC > 1', 'most']])
+    def test_invalid_condition_rejected(self, condition: list[str]) -> None:
+        """Calls, syntax errors and unknown quantifiers are rejected"""
+        with pytest.raises(ValueError):
+            compile_condition(condition)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""A test module for the columnar condition result store and its rendering in the tables element"""
+import pickle
+
+import numpy as np
+import pytest
+from docx import Document
+
+from report_generator.common.element_interface import Tables
+from report_generator.module.condition_result_store import ConditionResultStore
+
+_CONDITION_RESULTS = [
+    {"file1": [(["x > 0", "all"], True), (["y < 2", "any"], False)], "file2": [(["x > 0", "all"], True)]},
+    {},
+    {"file1": [(["x > 0", "all"], True), (["z > 1", "all[2.0:5.5]"], True)]},
+]
+
+
+@pytest.fixture
+def store() -> ConditionResultStore:
+    """A store of three cases, one of them without files"""
+    store = ConditionResultStore()
+    for i, condition_result in enumerate(_CONDITION_RESULTS):
+        store.add_case(f"case_{i}", condition_result)
+    return store
+
+
+class TestConditionResultStore:
+    def test_summary_equals_python_verdicts(self, store: ConditionResultStore) -> None:
+        """The vectorized verdicts and pass rates equal the verdicts of the condition lists"""
+        summary = store.summary()
+        assert summary.case_passed.tolist() == [all(result for pairs in condition_result.values() for _, result in pairs)
+                                                for condition_result in _CONDITION_RESULTS]
+        assert summary.file_passed.tolist() == [False, True, True]
+        assert np.allclose(summary.case_pass_rate, [2 / 3, 1.0, 1.0])
+        assert store.case(0).passed is False and store.case(1).passed is True
+
+    def test_case_view_is_condition_result_mapping(self, store: ConditionResultStore) -> None:
+        """The view of a case equals its condition result dictionary and is pickled without the store"""
+        for i, condition_result in enumerate(_CONDITION_RESULTS):
+            assert dict(store.case(i)) == condition_result
+        restored = pickle.loads(pickle.dumps(store.case(2)))
+        assert restored == store.case(2) and len(restored.store) == 1
+        with pytest.raises(ValueError, match="last added case"):
+            store.add_file(0, "file3", [["x > 0", "all"]], [True])
+
+    def test_tables_rendered_from_store(self, store: ConditionResultStore) -> None:
+        """The tables of a stored case are rendered like the tables of its dictionary"""
+        documents = []
+        for condition_result in (_CONDITION_RESULTS[0], store.case(0)):
+            document = Document()
+            Tables(condition_result=condition_result).render(document)
+            documents.append(document.element.body.xml)
+        assert documents[0] == documents[1]
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""A test module for the base document template cloned for every new report"""
+from docx import Document
+
+from report_generator.common.document_template import clear_document_templates, get_document_template
+from report_generator.common.generate_interface import ReportGenerator
+from report_generator.compontent.settings import configure, get_config
+
+
+class TestDocumentTemplate:
+    def test_clones_are_independent(self) -> None:
+        """A change of a cloned document changes neither the template nor the next clone"""
+        builds = []
+
+        def build():
+            builds.append(Document())
+            return builds[-1]
+
+        clear_document_templates()
+        first = get_document_template("test", build).clone()
+        first.add_paragraph("only in the first clone")
+        second = get_document_template("test", build).clone()
+        assert len(builds) == 1
+        assert len(second.paragraphs) == len(builds[0].paragraphs) == len(first.paragraphs) - 1
+        assert first.part.package is not second.part.package
+
+    def test_cloned_document_equals_new_document(self) -> None:
+        """The cloned base document equals a document set up from scratch, also after the configuration changed"""
+        try:
+            for header_text in (get_config().settings.header_text, "Another header"):
+                configure(header_text=header_text)
+                expected = Document()
+                ReportGenerator.global_setup(expected)
+                for _ in range(2):
+                    doc = ReportGenerator()._new_document()
+                    assert doc.element.xml == expected.element.xml
+                    assert doc.sections[0].header._element.xml == expected.sections[0].header._element.xml
+        finally:
+            configure(reset=True)
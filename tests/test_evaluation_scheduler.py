@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""A test module for the evaluation scheduler of the measurement files"""
+from pathlib import Path
+
+from report_generator.module.condition_engine import ConditionEngine
+from report_generator.module.evaluation_scheduler import EvaluationScheduler
+
+
+_MEASUREMENT_PATH = Path("tests/data_and_request/CCRs_100_20_ECE_MM_20231106_171436.txt")
+_ALIASES = {"external_relative_longitudinal_distance": "SG_In_DXH_POI1"}
+
+
+class TestEvaluationScheduler:
+    def test_cases_evaluated_in_order(self, tmp_path: Path) -> None:
+        """The cases are yielded in order with the condition results of the condition engine"""
+        conditions = [['external_relative_longitudinal_distance > 0', 'all'], ['SG_TTC < 0.5', 'any']]
+        cases = [
+            {"title": "case_1", "measurements": {"file1": _MEASUREMENT_PATH, "file2": _MEASUREMENT_PATH},
+             "conditions": conditions},
+            {"title": "case_2", "result": "PASSED", "condition_result": {"file1": [(conditions[0], True)]}},
+            {"title": "case_3", "measurements": {"file1": _MEASUREMENT_PATH}, "conditions": {"file1": conditions[:1]}},
+        ]
+        scheduler = EvaluationScheduler(workers=2, aliases=_ALIASES, cache_dir=tmp_path)
+        result = list(scheduler.evaluate_cases(cases))
+
+        expected = ConditionEngine(aliases=_ALIASES).evaluate({"file1": _MEASUREMENT_PATH}, conditions)["file1"]
+        assert [case["title"] for case in result] == ["case_1", "case_2", "case_3"]
+        assert result[0]["condition_result"] == {"file1": expected, "file2": expected}
+        assert result[0]["result"] == ("PASSED" if all(passed for _, passed in expected) else "FAILED")
+        assert result[1] is cases[1]
+        assert result[2]["condition_result"] == {"file1": expected[:1]}
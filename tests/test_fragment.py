@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""A test module for the parallel rendering of sections into merged fragments"""
+import json
+import pickle
+import zipfile
+from multiprocessing import get_context
+from pathlib import Path
+
+from docx import Document
+
+from report_generator.__main__ import EXAMPLE_CASE_LIST
+from report_generator.common.element_interface import NormalTextFormat, Paragraph, Title
+from report_generator.common.section_interface import CaseSection, Section
+from report_generator.compontent.settings import DEFAULT_CONFIG_PATH, configure
+
+
+class TestFragment:
+    def test_sections_pickled_with_elements(self) -> None:
+        """A pickled section is restored with all its elements, also after its text formats were used"""
+        section = CaseSection(EXAMPLE_CASE_LIST[0])
+        section.create_section()
+        section.add_element(Paragraph(title="Note", text="Added", text_format=NormalTextFormat.shared()))
+        section.render(Document())
+        plain = Section()
+        plain.add_element(Title(text="Plain", level=1))
+        for original in (section, plain):
+            restored = pickle.loads(pickle.dumps(original))
+            assert [type(element) for element in restored.elements] == [type(element) for element in original.elements]
+        assert restored.elements[0].text == "Plain"
+
+    def test_added_elements_rendered_in_workers(self, tmp_path: Path, make_generator) -> None:
+        """Elements added to a section and sections of the base class are rendered by the workers as well"""
+        def sections() -> list[Section]:
+            case_section = CaseSection(EXAMPLE_CASE_LIST[0])
+            case_section.create_section()
+            case_section.add_element(Paragraph(title="Note", text="Added", text_format=NormalTextFormat.shared()))
+            plain = Section()
+            plain.add_element(Title(text="Plain", level=1))
+            plain.add_element(Paragraph(title="", text="Plain text", text_format=NormalTextFormat.shared()))
+            return [case_section, plain, case_section]
+
+        for name, render_workers in (("sequential", 1), ("parallel", 2)):
+            make_generator([], sections(), render_workers=render_workers).generate(str(tmp_path.joinpath(f"{name}.docx")))
+        with zipfile.ZipFile(tmp_path.joinpath("sequential.docx")) as a, zipfile.ZipFile(tmp_path.joinpath("parallel.docx")) as b:
+            assert a.read("word/document.xml") == b.read("word/document.xml")
+            assert b"Plain text" in b.read("word/document.xml")
+
+    def test_parallel_rendering_equals_sequential_rendering(self, tmp_path: Path, make_generator) -> None:
+        """The merged fragments of the worker processes result in the same docx file as the sequential rendering"""
+        make_generator(EXAMPLE_CASE_LIST * 2, render_workers=1).generate(str(tmp_path.joinpath("sequential.docx")))
+        make_generator(EXAMPLE_CASE_LIST * 2, render_workers=2).generate(str(tmp_path.joinpath("parallel.docx")))
+        with zipfile.ZipFile(tmp_path.joinpath("sequential.docx")) as a, zipfile.ZipFile(tmp_path.joinpath("parallel.docx")) as b:
+            assert sorted(a.namelist()) == sorted(b.namelist())
+            for name in a.namelist():
+                assert a.read(name) == b.read(name)
+
+    def test_spawned_workers_use_configuration(self, tmp_path: Path, make_generator) -> None:
+        """Spawned workers render with the configured file and overrides instead of the default configuration"""
+        config = json.loads(Path(DEFAULT_CONFIG_PATH).read_text(encoding="utf-8"))
+        config["TEXT_FORMAT"]["TITLE"]["L1"]["font_size"] = 30
+        config_path = tmp_path.joinpath("config.json")
+        config_path.write_text(json.dumps(config), encoding="utf-8")
+        configure(config_path, header_text="Spawned header")
+        try:
+            make_generator(EXAMPLE_CASE_LIST * 2, render_workers=1).generate(str(tmp_path.joinpath("sequential.docx")))
+            make_generator(EXAMPLE_CASE_LIST * 2, render_workers=2,
+                           mp_context=get_context("spawn")).generate(str(tmp_path.joinpath("spawned.docx")))
+        finally:
+            configure(DEFAULT_CONFIG_PATH, reset=True)
+        with zipfile.ZipFile(tmp_path.joinpath("sequential.docx")) as a, zipfile.ZipFile(tmp_path.joinpath("spawned.docx")) as b:
+            assert a.read("word/document.xml") == b.read("word/document.xml")
+            assert b'w:val="60"' in b.read("word/document.xml")
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""A test module for the persistent cache of the rendered section fragments"""
+import json
+import os
+import zipfile
+from multiprocessing import get_context
+from pathlib import Path
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from report_generator.__main__ import EXAMPLE_CASE_LIST
+from report_generator.common.fragment import FragmentRelationship, RenderedFragment, render_fragment
+from report_generator.common.element_interface import Paragraph
+from report_generator.common.section_interface import CaseSection
+from report_generator.compontent.settings import DEFAULT_CONFIG_PATH, configure
+from report_generator.module.fragment_cache import FragmentCache
+
+
+def _section_fragment() -> RenderedFragment:
+    """Render the first example case into a fragment"""
+    section = CaseSection(EXAMPLE_CASE_LIST[0])
+    section.create_section()
+    return render_fragment([section], {})
+
+
+def _image_fragment(blob: bytes) -> RenderedFragment:
+    """A fragment of an empty body referring to a single image"""
+    return RenderedFragment(body_xml=b"<w:body/>", relationships={"rId1": FragmentRelationship(RT.IMAGE, "image.png", blob=blob)})
+
+
+class TestFragmentCache:
+    def test_cached_report_equals_rendered_report(self, tmp_path: Path, make_generator) -> None:
+        """A report merged from a warm cache results in the same docx file as the rendered report"""
+        make_generator().generate(str(tmp_path.joinpath("rendered.docx")))
+        cold_cache = FragmentCache(tmp_path.joinpath("cache"))
+        make_generator(fragment_cache=cold_cache).generate(str(tmp_path.joinpath("cold.docx")))
+        warm_cache = FragmentCache(tmp_path.joinpath("cache"))
+        make_generator(fragment_cache=warm_cache).generate(str(tmp_path.joinpath("warm.docx")))
+        assert (cold_cache.statistics.misses, cold_cache.statistics.stores) == (2, 2)
+        assert (warm_cache.statistics.hits, warm_cache.statistics.misses) == (2, 0)
+        for name in ("cold.docx", "warm.docx"):
+            with zipfile.ZipFile(tmp_path.joinpath("rendered.docx")) as a, zipfile.ZipFile(tmp_path.joinpath(name)) as b:
+                assert sorted(a.namelist()) == sorted(b.namelist())
+                for member in a.namelist():
+                    assert a.read(member) == b.read(member)
+
+    def test_changed_element_missed(self, tmp_path: Path, make_generator) -> None:
+        """A section with an element added or changed after its creation is rendered again instead of taken from the
+        cache"""
+        def sections(note: str | None) -> list[CaseSection]:
+            sections = [CaseSection(case) for case in EXAMPLE_CASE_LIST]
+            for section in sections:
+                section.create_section()
+            if note is not None:
+                sections[1].add_element(Paragraph(title="Note", text=note, text_format=None))
+            return sections
+
+        make_generator([], sections(None), fragment_cache=FragmentCache(tmp_path.joinpath("cache"))).generate(
+            str(tmp_path.joinpath("cold.docx")))
+        for note in ("EXTRA_NOTE", "CHANGED_NOTE"):
+            cache = FragmentCache(tmp_path.joinpath("cache"))
+            make_generator([], sections(note), fragment_cache=cache).generate(str(tmp_path.joinpath("warm.docx")))
+            assert (cache.statistics.hits, cache.statistics.misses) == (1, 1)
+            with zipfile.ZipFile(tmp_path.joinpath("warm.docx")) as report:
+                assert note.encode() in report.read("word/document.xml")
+
+    def test_key_changes_with_image_content(self, tmp_path: Path) -> None:
+        """The key of a section changes when the content of one of its images changes"""
+        image_path = tmp_path.joinpath("image.png")
+        image_path.write_bytes(b"first")
+        key = FragmentCache.key("section", [str(image_path)], "config")
+        assert FragmentCache.key("section", [str(image_path)], "config") == key
+        image_path.write_bytes(b"second content")
+        assert FragmentCache.key("section", [str(image_path)], "config") != key
+
+    def test_least_recently_used_evicted(self, tmp_path: Path) -> None:
+        """The cache is kept below its size limit by evicting the least recently used entries and their media"""
+        cache = FragmentCache(tmp_path, max_bytes=15_000)
+        for i, key in enumerate(("b", "a")):
+            cache.put(key * 64, _image_fragment(key.encode() * 6_000))
+            # the entries are used one second apart, "b" least recently
+            os.utime(next(tmp_path.joinpath("entries").rglob(f"{key * 64}.pkl")), (i, i))
+        cache.put("c" * 64, _image_fragment(b"c" * 6_000))
+        assert cache.statistics.evictions == 1
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64).relationships["rId1"].blob == b"a" * 6_000
+        assert len(list(tmp_path.joinpath("media").iterdir())) == 2
+
+    def test_corrupt_entry_dropped(self, tmp_path: Path) -> None:
+        """An unreadable entry is a miss and removed from the cache"""
+        cache = FragmentCache(tmp_path)
+        cache.put("d" * 64, _section_fragment())
+        entry_path = next(tmp_path.joinpath("entries").rglob("*.pkl"))
+        entry_path.write_bytes(b"not a pickle")
+        assert cache.get("d" * 64) is None
+        assert not entry_path.exists()
+
+    def test_spawned_workers_store_configured_fragments(self, tmp_path: Path, make_generator) -> None:
+        """The fragments rendered by spawned workers are rendered with the configuration of their cache key"""
+        config = json.loads(Path(DEFAULT_CONFIG_PATH).read_text(encoding="utf-8"))
+        config["TEXT_FORMAT"]["TITLE"]["L1"]["font_size"] = 30
+        config_path = tmp_path.joinpath("config.json")
+        config_path.write_text(json.dumps(config), encoding="utf-8")
+        configure(config_path)
+        try:
+            make_generator().generate(str(tmp_path.joinpath("rendered.docx")))
+            cache = FragmentCache(tmp_path.joinpath("cache"))
+            make_generator(fragment_cache=cache, render_workers=2,
+                           mp_context=get_context("spawn")).generate(str(tmp_path.joinpath("spawned.docx")))
+            make_generator(fragment_cache=FragmentCache(tmp_path.joinpath("cache"))).generate(str(tmp_path.joinpath("cached.docx")))
+        finally:
+            configure(DEFAULT_CONFIG_PATH, reset=True)
+        assert cache.statistics.stores == 2
+        with zipfile.ZipFile(tmp_path.joinpath("rendered.docx")) as rendered:
+            for name in ("spawned.docx", "cached.docx"):
+                with zipfile.ZipFile(tmp_path.joinpath(name)) as other:
+                    assert rendered.read("word/document.xml") == other.read("word/document.xml")
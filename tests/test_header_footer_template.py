@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""A test module for the header and footer template"""
+from docx import Document
+
+from report_generator.common.element_interface import GlobalSetupBuilder
+from report_generator.common.header_footer_template import get_header_footer_template
+
+
+_LOGO_PATH = "resources/icons/IAV_Logo.png"
+
+
+def _build_document() -> Document:
+    """Render a header with logo and a footer into a new document"""
+    document = Document()
+    builder = GlobalSetupBuilder(doc=document, left_header_text="Header", footer_text="Footer",
+                                 middle_footer_text="Middle", image_path=_LOGO_PATH)
+    builder.header_render(document).footer_render(document)
+    return document
+
+
+class TestHeaderFooterTemplate:
+    def test_template_built_once_per_fingerprint(self) -> None:
+        """The template of a fingerprint is built on the first request only"""
+        builds = []
+
+        def build() -> Document:
+            builds.append(1)
+            return _build_document()
+
+        first = get_header_footer_template("test_fingerprint", build)
+        assert get_header_footer_template("test_fingerprint", build) is first
+        assert len(builds) == 1
+
+    def test_attached_template_equals_rendered_header_and_footer(self) -> None:
+        """A document with the attached template has the same header and footer parts as a directly rendered one"""
+        rendered = _build_document()
+        attached = Document()
+        get_header_footer_template("test_attach", _build_document).attach(attached)
+
+        for expected, actual in [(rendered.sections[0].header.part, attached.sections[0].header.part),
+                                 (rendered.sections[0].footer.part, attached.sections[0].footer.part)]:
+            assert actual.blob == expected.blob
+            assert [rel.target_part.blob for rel in actual.rels.values()] == \
+                [rel.target_part.blob for rel in expected.rels.values()]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""A test module for the image index loading"""
+import json
+import os
+from pathlib import Path
+
+from report_generator.module import image_index
+from report_generator.module.image_index import load_image_index
+
+
+_INDEX_PATH = Path("tests/data_and_request/image_index.json")
+
+
+def _write_index(path: Path, content: list, mtime_ns: int) -> None:
+    """Write an image index file with a fixed modification time"""
+    path.write_text(json.dumps(content), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestImageIndex:
+    def test_cases_mapped_to_files(self) -> None:
+        """Every case of the index is mapped to the image paths of its files"""
+        index = load_image_index(_INDEX_PATH)
+        assert list(index.get("CCRs_AEB_test_case_2")) == ["File 1", "File 2"]
+        assert len(index.get("CCRs_AEB_test_case_2")["File 2"]) == 5
+        assert index.get("unknown_case") == {}
+
+    def test_index_parsed_once(self) -> None:
+        """Loading the same unchanged index again returns the shared index"""
+        assert load_image_index(_INDEX_PATH) is load_image_index(str(_INDEX_PATH))
+
+    def test_changed_index_reloaded(self, tmp_path: Path) -> None:
+        """An index file with a new modification time is parsed again"""
+        index_path = tmp_path.joinpath("image_index.json")
+        _write_index(index_path, [{"case": {"File 1": ["a.png"]}}], mtime_ns=1_000_000_000)
+        first = load_image_index(index_path)
+        _write_index(index_path, [{"case": {"File 1": ["b.png"]}}], mtime_ns=2_000_000_000)
+        second = load_image_index(index_path)
+        assert first is not second
+        assert second.get("case") == {"File 1": ["b.png"]}
+
+    def test_compiled_cache_reused(self, tmp_path: Path) -> None:
+        """The compiled index in the cache directory is written once and reused while the index is unchanged"""
+        index_path = tmp_path.joinpath("image_index.json")
+        cache_dir = tmp_path.joinpath("cache")
+        _write_index(index_path, [{"case": {"File 1": ["a.png"]}}], mtime_ns=1_000_000_000)
+        load_image_index(index_path, cache_dir=cache_dir)
+        assert len(list(cache_dir.iterdir())) == 1
+        # a new process only has the compiled index, which is used as long as modification time and size match
+        image_index._index_cache.clear()
+        _write_index(index_path, [{"case": {"File 1": ["c.png"]}}], mtime_ns=1_000_000_000)
+        assert load_image_index(index_path, cache_dir=cache_dir).get("case") == {"File 1": ["a.png"]}
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""A test module for the image pipeline"""
+from pathlib import Path
+
+import pytest
+from docx.shared import Inches
+
+pytest.importorskip("PIL")
+from PIL import Image as PILImage  # noqa: E402
+
+from report_generator.module.image_pipeline import ImagePipeline, _process_image  # noqa: E402
+
+
+_SMALL_IMAGE = "tests/data/img.png"
+_RESULT_IMAGE = "tests/data_and_request/result_images/CCRs_100_20_ECE_MM_20231106_171436__1Warning.png"
+
+
+class TestImagePipeline:
+    def test_downscaled_to_target_dpi(self, tmp_path: Path) -> None:
+        """A large plot is resampled to the displayed width at the target resolution"""
+        pipeline = ImagePipeline(tmp_path, target_dpi=100, workers=1)
+        processed = pipeline.process([_RESULT_IMAGE], Inches(4))
+        with PILImage.open(processed[_RESULT_IMAGE]) as image:
+            assert image.width == 400
+            assert image.height == round(3340 * 400 / 10022)
+            assert tuple(round(value) for value in image.info["dpi"]) == (100, 100)
+        assert pipeline.stats.bytes_after < pipeline.stats.bytes_before
+
+    def test_cache_hit_on_second_run(self, tmp_path: Path) -> None:
+        """Processing the same image again reuses the processed image of the cache"""
+        processed = ImagePipeline(tmp_path, target_dpi=100, workers=1).process([_RESULT_IMAGE], Inches(4))
+        mtime_ns = Path(processed[_RESULT_IMAGE]).stat().st_mtime_ns
+
+        pipeline = ImagePipeline(tmp_path, target_dpi=100, workers=1)
+        assert pipeline.process([_RESULT_IMAGE], Inches(4)) == processed
+        assert pipeline.stats.cached == 1
+        assert Path(processed[_RESULT_IMAGE]).stat().st_mtime_ns == mtime_ns
+
+    def test_smaller_original_kept(self, tmp_path: Path) -> None:
+        """The original image is used when the processed image is not smaller"""
+        pipeline = ImagePipeline(tmp_path, image_format="jpeg", workers=1)
+        processed = pipeline.process([_SMALL_IMAGE], Inches(6))
+        assert processed == {_SMALL_IMAGE: _SMALL_IMAGE}
+        assert pipeline.stats.bytes_saved == 0
+
+    def test_jpeg_alpha_flattened(self, tmp_path: Path) -> None:
+        """Transparent pixels are flattened onto white when encoding jpeg"""
+        source = tmp_path.joinpath("transparent.png")
+        with PILImage.open(_SMALL_IMAGE) as image:
+            rgba = image.convert("RGBA")
+        rgba.putalpha(0)
+        rgba.save(source)
+
+        target = tmp_path.joinpath("flattened.jpg")
+        _process_image(str(source), str(target), 1000, "jpeg", 85, 150)
+        with PILImage.open(target) as image:
+            assert image.mode == "RGB"
+            assert min(image.convert("L").getdata()) >= 250
+
+    def test_unsupported_format(self, tmp_path: Path) -> None:
+        """An unknown target format is rejected"""
+        with pytest.raises(ValueError, match="Unsupported image format"):
+            ImagePipeline(tmp_path, image_format="gif")
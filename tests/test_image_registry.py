@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""A test module for the report-wide image registry"""
+from pathlib import Path
+
+from docx import Document
+
+from report_generator.common.render_context import RenderContext
+from report_generator.module.image_registry import ImageBytesCache, ImageRegistry
+
+
+_IMAGE_DIR = Path("tests/data_and_request/result_images")
+
+
+class TestImageRegistry:
+    def test_repeated_picture_shares_part_and_relationship(self) -> None:
+        """Every occurrence of an image reuses one image part and one relationship, the file is read once"""
+        document = Document()
+        bytes_cache = ImageBytesCache(max_bytes=10 * 1024 * 1024)
+        context = RenderContext(document, ImageRegistry(document.part.package, bytes_cache))
+        image_path = next(_IMAGE_DIR.glob("*1Warning.png"))
+        for _ in range(5):
+            context.add_picture(image_path)
+
+        image_rels = [rel for rel in document.part.rels.values() if rel.reltype.endswith("/image")]
+        assert len(document.part.package.image_parts) == 1
+        assert len(image_rels) == 1
+        assert bytes_cache.misses == 1
+
+    def test_bytes_cache_evicts_least_recently_used(self) -> None:
+        """The cache keeps the most recently read images within its byte budget"""
+        image_paths = sorted(str(path) for path in _IMAGE_DIR.glob("*.png"))[:3]
+        sizes = [Path(path).stat().st_size for path in image_paths]
+        bytes_cache = ImageBytesCache(max_bytes=sizes[1] + sizes[2])
+        for image_path in image_paths:
+            bytes_cache.read(image_path)
+        bytes_cache.read(image_paths[2])
+        bytes_cache.read(image_paths[0])
+
+        assert bytes_cache.hits == 1
+        assert bytes_cache.size <= bytes_cache.max_bytes
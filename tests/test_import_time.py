@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""A test module for the import time and the import side effects of the package"""
+import subprocess
+import sys
+
+
+# the cumulative import time of the package, the settings and the logger in microseconds, importing python-docx alone
+# takes about twice as long
+_IMPORT_TIME_BUDGET_US = 100_000
+_HEAVY_MODULES = ["docx", "docx2pdf", "colorlog", "document", "lxml", "argparse"]
+
+
+def _run_python(code: str) -> subprocess.CompletedProcess:
+    """Run the code in a new python interpreter with import time logging"""
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+
+
+class TestImportTime:
+    def test_import_without_side_effects(self) -> None:
+        """Importing the package, the settings and the logger neither loads heavy modules nor parses the configuration"""
+        result = _run_python(
+            "import sys\n"
+            "import report_generator\n"
+            "from report_generator.compontent.settings import SETTINGS\n"
+            "from report_generator.common.logger import logger\n"
+            f"print(sorted(name for name in {_HEAVY_MODULES!r} if name in sys.modules))\n"
+            "print(repr(SETTINGS))\n"
+        )
+        assert result.stdout.splitlines() == ["[]", "LazyConfig('SETTINGS', loaded=False)"]
+
+    def test_import_within_budget(self) -> None:
+        """The cumulative import time of the package stays within the budget"""
+        result = _run_python("import report_generator.compontent.settings, report_generator.common.logger")
+        import_times = [line.split("|") for line in result.stderr.splitlines() if line.startswith("import time:")]
+        cumulative_us = {name.strip(): int(cumulative) for _, cumulative, name in import_times[1:]}
+        # the package is imported as parent of the settings module, so it is included in its cumulative time
+        assert cumulative_us["report_generator.compontent.settings"] + cumulative_us["report_generator.common.logger"] \
+            < _IMPORT_TIME_BUDGET_US
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""A test module for the incremental PDF conversion of the report fragments"""
+import copy
+from pathlib import Path
+
+import pytest
+from docx import Document
+from docx.oxml.ns import qn
+
+from report_generator.__main__ import EXAMPLE_CASE_LIST
+from report_generator.common.element_interface import Paragraph
+from report_generator.common.generate_interface import ReportGenerator
+from report_generator.common.section_interface import CaseSection
+from report_generator.compontent.settings import configure
+from report_generator.module.incremental_pdf import PdfFragmentCache, prepare_fragment_document
+from report_generator.module.pdf_backend import PdfBackend
+
+# pypdf is an optional dependency of the incremental PDF conversion
+pypdf = pytest.importorskip("pypdf")
+
+
+class _BlankPdfBackend(PdfBackend):
+    """Convert every docx file to a PDF of two blank pages and keep the converted documents"""
+    name = "blank"
+    max_parallel = 2
+
+    def __init__(self):
+        self.documents = []
+
+    def convert(self, docx_path: Path) -> Path | None:
+        self.documents.append(Document(str(docx_path)))
+        writer = pypdf.PdfWriter()
+        for _ in range(2):
+            writer.add_blank_page(width=612, height=792)
+        writer.write(str(docx_path.with_suffix(".pdf")))
+        return docx_path.with_suffix(".pdf")
+
+
+@pytest.fixture
+def pdf_fragment_cache_dir(tmp_path: Path):
+    """A temporary directory of the PDF fragment cache, configured during the test"""
+    configure(pdf_fragment_cache_dir=str(tmp_path.joinpath("pdf_fragments")))
+    yield tmp_path.joinpath("pdf_fragments")
+    configure(reset=True)
+
+
+@pytest.fixture
+def generate_incremental(make_generator):
+    """Generate a report of the cases with the incremental PDF conversion, returning the backend and the merged PDF"""
+    def generate(path: Path, cases: list[dict], **kwargs) -> tuple[_BlankPdfBackend, Path]:
+        backend = _BlankPdfBackend()
+        job = make_generator(cases, pdf_backend=backend, incremental_pdf=True, **kwargs).generate(str(path)).result()
+        return backend, job.pdf_path
+
+    return generate
+
+
+class TestIncrementalPdf:
+    def test_fragments_merged_with_page_numbers(self, tmp_path: Path, pdf_fragment_cache_dir: Path, generate_incremental) -> None:
+        """Every section is converted without page number fields and the merged pages are numbered"""
+        backend, pdf_path = generate_incremental(tmp_path.joinpath("report.docx"), EXAMPLE_CASE_LIST)
+        assert len(backend.documents) == 2
+        for document in backend.documents:
+            assert document.sections[0].footer._element.find(f".//{qn('w:instrText')}") is None
+            assert document.element.body[-2].find(f".//{qn('w:br')}") is None
+        assert [page.extract_text() for page in pypdf.PdfReader(pdf_path).pages] == ["1 / 4", "2 / 4", "3 / 4", "4 / 4"]
+
+    def test_only_changed_sections_converted(self, tmp_path: Path, pdf_fragment_cache_dir: Path, generate_incremental) -> None:
+        """The fragments of unchanged sections are taken from the cache"""
+        generate_incremental(tmp_path.joinpath("report.docx"), EXAMPLE_CASE_LIST)
+        backend, _ = generate_incremental(tmp_path.joinpath("report.docx"), EXAMPLE_CASE_LIST)
+        assert backend.documents == []
+
+        cases = copy.deepcopy(EXAMPLE_CASE_LIST)
+        cases[1]["result"] = "PASSED"
+        backend, pdf_path = generate_incremental(tmp_path.joinpath("report.docx"), cases)
+        assert len(backend.documents) == 1
+        assert len(pypdf.PdfReader(pdf_path).pages) == 4
+
+    def test_changed_element_converted(self, tmp_path: Path, pdf_fragment_cache_dir: Path, generate_incremental) -> None:
+        """The fragment of a section with an element added after its creation is converted again"""
+        def sections(note: str | None) -> list[CaseSection]:
+            sections = [CaseSection(case) for case in EXAMPLE_CASE_LIST]
+            for section in sections:
+                section.create_section()
+            if note is not None:
+                sections[1].add_element(Paragraph(title="Note", text=note, text_format=None))
+            return sections
+
+        generate_incremental(tmp_path.joinpath("report.docx"), [], sections=sections(None))
+        backend, _ = generate_incremental(tmp_path.joinpath("report.docx"), [], sections=sections("EXTRA_NOTE"))
+        assert len(backend.documents) == 1
+        assert "EXTRA_NOTE" in backend.documents[0].element.body.xml
+
+    def test_fragments_taken_from_rendered_report(self, tmp_path: Path, generate_incremental) -> None:
+        """The fragment documents equal the sections rendered on their own, also when rendered by workers or streamed"""
+        expected = []
+        for case in EXAMPLE_CASE_LIST:
+            section = CaseSection(case)
+            section.create_section()
+            document, _ = ReportGenerator()._base_document()
+            section.render(document)
+            prepare_fragment_document(document)
+            expected.append(document.element.body.xml)
+        # without the fragment cache every fragment is converted
+        configure(pdf_fragment_cache_dir=None)
+        try:
+            for i, kwargs in enumerate(({}, {"render_workers": 2}, {"streaming": True})):
+                backend, _ = generate_incremental(tmp_path.joinpath(f"report_{i}.docx"), EXAMPLE_CASE_LIST, **kwargs)
+                assert sorted(document.element.body.xml for document in backend.documents) == sorted(expected)
+        finally:
+            configure(reset=True)
+
+    def test_pinned_fragment_survives_eviction(self, tmp_path: Path) -> None:
+        """A pinned cached fragment stays readable when the cache evicts it"""
+        pdf_path = tmp_path.joinpath("fragment.pdf")
+        pdf_path.write_bytes(b"%PDF-fragment")
+        cache = PdfFragmentCache(tmp_path.joinpath("cache"))
+        cache.put("b" * 40, pdf_path)
+        pinned = cache.pin("b" * 40, tmp_path.joinpath("pinned.pdf"))
+        PdfFragmentCache(tmp_path.joinpath("cache"), max_bytes=0).put("c" * 40, pdf_path)
+        assert cache.get("b" * 40) is None and pinned.read_bytes() == b"%PDF-fragment"
+        assert cache.pin("b" * 40, tmp_path.joinpath("missing.pdf")) is None
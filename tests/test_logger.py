@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""A test module for the asynchronous logger and its json lines file"""
+import json
+import logging
+import logging.handlers
+import threading
+from pathlib import Path
+
+import pytest
+
+from report_generator.__main__ import EXAMPLE_CASE_LIST
+from report_generator.common import logger as logger_module
+from report_generator.common.logger import Logger, configure_logger
+from report_generator.common.section_interface import CaseSection
+
+
+class TestLogger:
+    def test_async_json_lines_file(self, tmp_path: Path) -> None:
+        """All records of the asynchronous logger are written as json lines once it is stopped"""
+        async_logger = Logger(name="test_async", level="info", log_path=tmp_path, async_logging=True, json_logfile=True)
+        logger = async_logger.singleton_logger
+        assert len(logger.handlers) == 1 and isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+        for i in range(100):
+            logger.info("Initialize a CaseSection for case %s", f"case_{i}")
+        logger.debug("Not written below the level %s", "info")
+        async_logger.stop()
+
+        records = [json.loads(line) for line in next(tmp_path.glob("test_async_*.jsonl")).read_text(encoding="utf-8").splitlines()]
+        assert [record["message"] for record in records] == [f"Initialize a CaseSection for case case_{i}" for i in range(100)]
+        assert records[0]["level"] == "INFO" and records[0]["function"] == "test_async_json_lines_file"
+
+    def test_messages_formatted_lazily(self, tmp_path: Path) -> None:
+        """The arguments of a message below the level are never formatted"""
+        class Unformattable:
+            def __str__(self) -> str:
+                raise AssertionError("The message was formatted.")
+
+        async_logger = Logger(name="test_lazy", level="info", log_path=tmp_path, async_logging=True)
+        async_logger.singleton_logger.debug("Argument %s", Unformattable())
+        async_logger.stop()
+
+    def test_messages_formatted_in_background(self, tmp_path: Path) -> None:
+        """The records are queued unchanged and formatted by the background thread"""
+        threads = []
+
+        class Recording:
+            def __str__(self) -> str:
+                threads.append(threading.current_thread())
+                return "recorded"
+
+        async_logger = Logger(name="test_background", level="info", log_path=tmp_path, async_logging=True,
+                              save_logfile=True)
+        async_logger.singleton_logger.info("Argument %s", Recording())
+        async_logger.stop()
+        assert threads and threading.current_thread() not in threads
+        assert "Argument recorded" in next(tmp_path.glob("test_background_*.log")).read_text(encoding="utf-8")
+
+    def test_written_synchronously_after_stop(self, tmp_path: Path) -> None:
+        """The records logged after stopping the background thread are written by the handlers directly"""
+        async_logger = Logger(name="test_stopped", level="info", log_path=tmp_path, async_logging=True,
+                              json_logfile=True)
+        async_logger.stop()
+        async_logger.singleton_logger.info("After %s", "stop")
+        assert not any(isinstance(handler, logging.handlers.QueueHandler) for handler in async_logger.singleton_logger.handlers)
+        assert "After stop" in next(tmp_path.glob("test_stopped_*.jsonl")).read_text(encoding="utf-8")
+
+    def test_configure_logger_closes_handlers(self, tmp_path: Path) -> None:
+        """Replacing the singleton logger removes and closes the handlers of the previous logger"""
+        config = {"name": "test_configured", "level": "info", "log_path": str(tmp_path), "save_logfile": True,
+                  "async_logging": True}
+        previous = logger_module._singleton_logger
+        try:
+            first = configure_logger(config)
+            first.info("First %s", "logger")
+            file_handlers = [handler for handler in first.handlers[0].listener.handlers
+                             if isinstance(handler, logging.FileHandler)]
+            second = configure_logger(config)
+            assert first.handlers == []
+            assert all(handler.stream is None for handler in file_handlers)
+            assert second is not first
+            configure_logger({**config, "async_logging": False})
+        finally:
+            logger_module._singleton_logger = previous
+
+    def test_no_records_per_case_at_info_level(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Creating case sections creates no log records at the info level"""
+        records = []
+        info_logger = logging.getLogger("test_per_case")
+        monkeypatch.setattr(info_logger, "level", logging.INFO)
+        monkeypatch.setattr(info_logger, "handle", records.append)
+        monkeypatch.setattr(logger_module, "_singleton_logger", info_logger)
+        for case in EXAMPLE_CASE_LIST * 50:
+            CaseSection(case).create_section()
+        assert records == []
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""A test module for the measurement file loader"""
+from pathlib import Path
+
+import numpy as np
+
+from report_generator.module.measurement_loader import load_measurement
+
+
+_MEASUREMENT_PATH = Path("tests/data_and_request/CCRs_100_20_ECE_MM_20231106_171436.txt")
+
+
+class TestMeasurementLoader:
+    def test_signals_with_units(self) -> None:
+        """The header names the signals, the units row gives their units, empty for signals without unit"""
+        measurement = load_measurement(_MEASUREMENT_PATH)
+        assert len(measurement) == 1601
+        assert measurement.units["SG_TTC"] == "s"
+        assert measurement.units["SG_Audio"] == ""
+        assert measurement["SG_In_DXH_POI1"][0] == 58.244138242355
+
+    def test_projection_in_file_order(self) -> None:
+        """Only the requested signals are loaded, in the order of the file"""
+        measurement = load_measurement(_MEASUREMENT_PATH, signals=["SG_TTC", "Time"])
+        assert measurement.names == ["Time", "SG_TTC"]
+
+    def test_cached_signals_memory_mapped(self, tmp_path: Path) -> None:
+        """Parsed signals are cached per signal and loaded memory-mapped with the same values"""
+        parsed = load_measurement(_MEASUREMENT_PATH, signals=["SG_TTC"], chunk_rows=100)
+        load_measurement(_MEASUREMENT_PATH, signals=["SG_TTC"], cache_dir=tmp_path)
+        cached = load_measurement(_MEASUREMENT_PATH, signals=["SG_TTC"], cache_dir=tmp_path)
+        assert isinstance(cached["SG_TTC"], np.memmap)
+        assert np.array_equal(cached["SG_TTC"], parsed["SG_TTC"], equal_nan=True)
+        assert len(list(tmp_path.glob("*/*.npy"))) == 1
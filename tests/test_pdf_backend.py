@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""A test module for the PDF backends and the PDF conversion queue"""
+import threading
+from pathlib import Path
+
+import pytest
+
+from report_generator.module import pdf_backend
+from report_generator.module.pdf_backend import (LibreOfficeBackend, PdfBackend, PdfConversionQueue, SkipPdfBackend,
+                                                 create_pdf_backend)
+
+
+class _RecordingPdfBackend(PdfBackend):
+    """Record the converted files, optionally blocked until released"""
+    name = "recording"
+
+    def __init__(self, release: threading.Event | None = None, prepare_error: Exception | None = None):
+        self.release = release
+        self.prepare_error = prepare_error
+        self.converted = []
+        self.started = threading.Event()
+        self.closed = False
+
+    def prepare(self) -> None:
+        if self.prepare_error is not None:
+            raise self.prepare_error
+
+    def convert(self, docx_path: Path) -> Path | None:
+        self.started.set()
+        if self.release is not None:
+            self.release.wait(5)
+        self.converted.append(docx_path.name)
+        return docx_path.with_suffix(".pdf")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestPdfBackend:
+    def test_create_pdf_backend(self) -> None:
+        """The backends are created by their name, an unknown name is rejected"""
+        assert isinstance(create_pdf_backend("none"), SkipPdfBackend)
+        with pytest.raises(ValueError, match="Unknown PDF backend"):
+            create_pdf_backend("pdfprinter")
+        with pytest.raises(FileNotFoundError, match="LibreOffice"):
+            LibreOfficeBackend(soffice="soffice-which-does-not-exist")
+
+    def test_skip_backend_creates_no_pdf(self, tmp_path: Path) -> None:
+        """The skipped conversion finishes without a PDF file"""
+        pdf_queue = PdfConversionQueue(SkipPdfBackend())
+        job = pdf_queue.submit(tmp_path.joinpath("report.docx")).result()
+        pdf_queue.shutdown()
+        assert job.pdf_path is None and job.conversion_time >= 0 and pdf_queue.queue_depth == 0
+
+
+class TestPdfConversionQueue:
+    def test_conversions_in_submission_order(self, tmp_path: Path) -> None:
+        """A backend without parallel conversions converts the reports in submission order"""
+        backend = _RecordingPdfBackend()
+        pdf_queue = PdfConversionQueue(backend)
+        futures = [pdf_queue.submit(tmp_path.joinpath(f"report_{i}.docx")) for i in range(3)]
+        jobs = [future.result() for future in futures]
+        assert backend.converted == ["report_0.docx", "report_1.docx", "report_2.docx"]
+        assert [job.queue_depth for job in jobs] == [1, 2, 3]
+        assert [job.pdf_path.name for job in jobs] == ["report_0.pdf", "report_1.pdf", "report_2.pdf"]
+        pdf_queue.shutdown()
+        assert backend.closed
+
+    def test_queued_conversion_cancelled(self, tmp_path: Path) -> None:
+        """A queued conversion can be cancelled and leaves the queue depth, the running one finishes"""
+        release = threading.Event()
+        backend = _RecordingPdfBackend(release)
+        pdf_queue = PdfConversionQueue(backend)
+        running = pdf_queue.submit(tmp_path.joinpath("running.docx"))
+        assert backend.started.wait(5)
+        queued = pdf_queue.submit(tmp_path.joinpath("queued.docx"))
+        assert pdf_queue.queue_depth == 2
+        assert queued.cancel()
+        assert pdf_queue.queue_depth == 1
+        release.set()
+        pdf_queue.shutdown()
+        assert running.result().pdf_path.name == "running.pdf"
+        assert backend.converted == ["running.docx"] and pdf_queue.queue_depth == 0
+
+    def test_prepare_error_logged(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A failed preparation is logged and the conversions still run"""
+        errors = []
+        monkeypatch.setattr(pdf_backend, "logger", type("Logger", (), {
+            "error": staticmethod(lambda *args, **kwargs: errors.append((args, kwargs))),
+            "info": staticmethod(lambda *args, **kwargs: None)})())
+        pdf_queue = PdfConversionQueue(_RecordingPdfBackend(prepare_error=RuntimeError("no profile")))
+        pdf_queue.submit(tmp_path.joinpath("report.docx")).result()
+        pdf_queue.shutdown()
+        assert len(errors) == 1 and isinstance(errors[0][1]["exc_info"], RuntimeError)
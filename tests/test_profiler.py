@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""A test module for the instrumentation of the render pipeline"""
+import json
+from pathlib import Path
+
+from docx import Document
+
+from report_generator.__main__ import EXAMPLE_CASE_LIST
+from report_generator.common.profiler import PROFILER
+from report_generator.common.render_context import RenderContext
+from report_generator.common.section_interface import CaseSection
+
+
+class TestProfiler:
+    def test_disabled_profiler_records_nothing(self) -> None:
+        """A stage of the disabled profiler provides no record"""
+        with PROFILER.stage("render") as record:
+            assert record is None
+
+    def test_section_stages_exported(self, tmp_path: Path) -> None:
+        """The section and element stages are recorded with counts and exported as profile and trace"""
+        section = CaseSection(EXAMPLE_CASE_LIST[0])
+        section.create_section()
+        document = Document()
+        PROFILER.start()
+        try:
+            section.render(document, RenderContext(document))
+        finally:
+            PROFILER.stop()
+        PROFILER.export_json(tmp_path / "profile.json")
+        PROFILER.export_chrome_trace(tmp_path / "trace.json")
+
+        summary = json.loads((tmp_path / "profile.json").read_text(encoding="utf-8"))["summary"]
+        assert summary["CaseSection"]["calls"] == 1
+        assert summary["CaseSection"]["counts"]["cells"] == 8
+        assert summary["CaseSection"]["counts"]["pictures"] > 0
+        assert {"Title", "Paragraph", "Tables", "Image"} <= set(summary)
+        events = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))["traceEvents"]
+        assert len(events) == len(PROFILER.records)
+        assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
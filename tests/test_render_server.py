@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""A test module for the render daemon and its job api"""
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import zipfile
+from multiprocessing import get_context
+from pathlib import Path
+
+import pytest
+
+from report_generator.__main__ import EXAMPLE_CASE_LIST
+from report_generator.compontent.settings import configure
+from report_generator.module.render_server import RenderServer, create_http_server
+
+
+@pytest.fixture
+def server_url():
+    """Run a render server with one worker and one pending job on a free local port"""
+    render_server = RenderServer(workers=1, max_pending=1, pdf_backend="none")
+    http_server = create_http_server(render_server, port=0)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{http_server.server_port}"
+    http_server.shutdown()
+    http_server.server_close()
+    render_server.shutdown()
+
+
+def _request(url: str, method: str = "GET", content: dict | None = None) -> tuple[int, dict]:
+    """Send a json request and return the status code and the json response"""
+    data = json.dumps(content).encode("utf-8") if content is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, method=method)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestRenderServer:
+    def test_job_rendered_with_backpressure(self, server_url: str, tmp_path: Path) -> None:
+        """A submitted job is rendered, further jobs are rejected while it is pending and it cannot be cancelled after"""
+        job = {"cases": EXAMPLE_CASE_LIST, "output": str(tmp_path.joinpath("report.docx"))}
+        status, submitted = _request(f"{server_url}/jobs", "POST", job)
+        assert status == 202
+        assert _request(f"{server_url}/jobs", "POST", job)[0] == 429
+
+        deadline = time.monotonic() + 60
+        while _request(f"{server_url}/jobs/{submitted['id']}")[1]["status"] in ("queued", "running"):
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+        assert _request(f"{server_url}/jobs/{submitted['id']}")[1]["status"] == "done"
+        assert tmp_path.joinpath("report.docx").is_file()
+        assert _request(f"{server_url}/jobs/{submitted['id']}", "DELETE")[0] == 409
+
+    def test_invalid_and_unknown_jobs(self, server_url: str) -> None:
+        """A job without cases is rejected and an unknown job is not found"""
+        assert _request(f"{server_url}/jobs", "POST", {"output": "report.docx"})[0] == 400
+        assert _request(f"{server_url}/jobs/unknown")[0] == 404
+
+    def test_queued_jobs_cancelled(self, tmp_path: Path) -> None:
+        """Every job waiting for a free worker can be cancelled, the jobs are rendered with the configured overrides"""
+        configure(header_text="Daemon header")
+        try:
+            render_server = RenderServer(workers=1, max_pending=3, pdf_backend="none", mp_context=get_context("spawn"))
+        finally:
+            configure(reset=True)
+        jobs = [render_server.submit(EXAMPLE_CASE_LIST, str(tmp_path.joinpath(f"report_{i}.docx"))) for i in range(3)]
+        assert [job.status for job in jobs] == ["running", "queued", "queued"]
+        assert render_server.cancel(jobs[1].id) and render_server.cancel(jobs[2].id)
+        jobs[0].future.result(timeout=60)
+        render_server.shutdown()
+        assert [job.status for job in jobs] == ["done", "cancelled", "cancelled"]
+        assert not tmp_path.joinpath("report_1.docx").exists() and not tmp_path.joinpath("report_2.docx").exists()
+        with zipfile.ZipFile(tmp_path.joinpath("report_0.docx")) as report:
+            assert any(b"Daemon header" in report.read(name) for name in report.namelist() if "header" in name)
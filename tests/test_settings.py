@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""A test module for the validated configuration, its hot reload and the cached settings parser"""
+import dataclasses
+import json
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from report_generator.common.element_interface import NormalTextFormat
+from report_generator.common.settings_parser import SettingsParser
+from report_generator.compontent.settings import (DEFAULT_CONFIG_PATH, configure, get_config, reload_config,
+                                                  worker_configuration)
+
+
+@pytest.fixture
+def config_path(tmp_path: Path):
+    """A copy of the default configuration file, which is configured during the test"""
+    path = tmp_path / "config.json"
+    path.write_text(Path(DEFAULT_CONFIG_PATH).read_text(encoding="utf-8"), encoding="utf-8")
+    configure(path)
+    yield path
+    configure(DEFAULT_CONFIG_PATH, reset=True)
+
+
+def _modify(path: Path, change) -> None:
+    """Change the json content of a file and move its modification time forward"""
+    content = json.loads(path.read_text(encoding="utf-8"))
+    change(content)
+    path.write_text(json.dumps(content), encoding="utf-8")
+    mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestConfig:
+    def test_config_typed_and_frozen(self, config_path: Path) -> None:
+        """The configuration is validated into frozen slotted objects"""
+        config = get_config()
+        assert config.text_formats["TITLE.L1"].bold is True and config.text_formats["TITLE.L1"].color == (0, 0, 0)
+        assert config.settings.signal_aliases["external_relative_longitudinal_distance"] == "SG_In_DXH_POI1"
+        assert not hasattr(config.settings, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.settings.render_workers = 4
+
+    def test_invalid_config_rejected(self, config_path: Path) -> None:
+        """A value of the wrong type is rejected when the configuration is parsed"""
+        _modify(config_path, lambda content: content["TEXT_FORMAT"]["PARAGRAPH"].update(font_size="large"))
+        with pytest.raises(ValueError, match="PARAGRAPH.font_size"):
+            get_config()
+
+    def test_reload_modified_config(self, config_path: Path) -> None:
+        """A modified configuration file is parsed again once and clears the shared text formats"""
+        text_format = NormalTextFormat.shared()
+        assert reload_config() is False
+        _modify(config_path, lambda content: content["TEXT_FORMAT"]["PARAGRAPH"].update(font_size=9))
+        assert reload_config() is True
+        assert reload_config() is False
+        assert NormalTextFormat.shared() is not text_format
+        assert NormalTextFormat.shared().font_size == 9
+
+    def test_overrides_reset(self, config_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The overrides are kept until they are reset, a relative path is stored as absolute path"""
+        configure(render_workers=3)
+        configure(pdf_workers=4)
+        assert (get_config().settings.render_workers, get_config().settings.pdf_workers) == (3, 4)
+        configure(reset=True, pdf_workers=5)
+        assert (get_config().settings.render_workers, get_config().settings.pdf_workers) == (1, 5)
+
+        monkeypatch.chdir(config_path.parent)
+        configure(config_path.name, reset=True)
+        monkeypatch.chdir(config_path.parent.parent)
+        assert worker_configuration() == (str(config_path), {})
+        assert get_config().path == str(config_path)
+
+    def test_null_spacing_and_margins_default(self, config_path: Path) -> None:
+        """A null line spacing or margin falls back to 1.0, other null values are still rejected"""
+        _modify(config_path, lambda content: content["SETTINGS"].update(line_spacing=None, top_margin=None,
+                                                                        left_margin=None))
+        settings = get_config().settings
+        assert (settings.line_spacing, settings.top_margin, settings.left_margin) == (1.0, 1.0, 1.0)
+        _modify(config_path, lambda content: content["SETTINGS"].update(pdf_workers=None))
+        configure(config_path)
+        with pytest.raises(ValueError, match="SETTINGS.pdf_workers"):
+            get_config()
+
+    def test_default_config_independent_of_working_directory(self, tmp_path: Path,
+                                                             monkeypatch: pytest.MonkeyPatch) -> None:
+        """The packaged configuration is found from any working directory"""
+        monkeypatch.chdir(tmp_path)
+        configure(DEFAULT_CONFIG_PATH, reset=True)
+        assert worker_configuration()[0] == str(Path(DEFAULT_CONFIG_PATH))
+        assert get_config().settings.pdf_backend
+
+
+class TestSettingsParser:
+    def test_sections_cached_until_modified(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The converted sections are kept while the settings file is unchanged"""
+        conversions = []
+        convert = SettingsParser._convert_dict_string_value
+        monkeypatch.setattr(SettingsParser, "_convert_dict_string_value",
+                            staticmethod(lambda kv_dict: conversions.append(kv_dict) or convert(kv_dict)))
+        path = tmp_path / "settings.ini"
+        path.write_text("[logger]\nlevel = info\nsave_logfile = False\n", encoding="utf-8")
+        parser = SettingsParser(path)
+        assert parser.get("logger") == {"level": "info", "save_logfile": False}
+        assert parser.get("logger", "level") == "info"
+        assert len(conversions) == 1
+
+        path.write_text("[logger]\nlevel = debug\n", encoding="utf-8")
+        mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        assert parser.get("logger") == {"level": "debug"}
+
+    def test_section_of_replaced_parser_not_cached(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A section converted while another thread reads the modified file is not kept for the new content"""
+        path = tmp_path / "settings.ini"
+        path.write_text("[logger]\nlevel = info\n", encoding="utf-8")
+        parser = SettingsParser(path)
+        convert = SettingsParser._convert_dict_string_value
+        readers = []
+
+        def convert_while_modified(kv_dict: dict) -> dict:
+            if not readers:
+                path.write_text("[logger]\nlevel = debug\n", encoding="utf-8")
+                mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+                os.utime(path, ns=(mtime_ns, mtime_ns))
+                readers.append(threading.Thread(target=parser.get, args=("logger",)))
+                readers[0].start()
+                readers[0].join(0.2)
+            return convert(kv_dict)
+
+        monkeypatch.setattr(SettingsParser, "_convert_dict_string_value", staticmethod(convert_while_modified))
+        assert parser.get("logger", "level") == "info"
+        readers[0].join(5)
+        assert parser.get("logger", "level") == "debug"
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""A test module for the streaming docx writer"""
+import zipfile
+from pathlib import Path
+
+import pytest
+from docx import Document
+
+from report_generator.module.image_registry import ImageBytesCache, ImageRegistry
+from report_generator.module.streaming_writer import StreamingDocxWriter
+
+_IMAGE = Path(__file__).parent.joinpath("data", "img.png")
+
+
+def _add_content(document, index: int) -> None:
+    """Add a heading, a paragraph and a table to the document"""
+    document.add_heading(f"Section {index}", level=1)
+    document.add_paragraph(f"Paragraph  with   spaces {index}")
+    document.add_table(rows=2, cols=2).cell(0, 0).text = str(index)
+
+
+def _add_picture(document, registry: ImageRegistry, image_path: Path, shape_id: int) -> None:
+    """Add a paragraph with a picture of the image to the document"""
+    registry.add_picture(document.add_paragraph().add_run(), str(image_path), shape_id=shape_id)
+
+
+class TestStreamingDocxWriter:
+    def test_streamed_document_equals_saved_document(self, tmp_path: Path) -> None:
+        """The streamed docx file contains the same parts as the one saved at once"""
+        saved, streamed = Document(), Document()
+        for index in range(3):
+            _add_content(saved, index)
+        saved.save(tmp_path.joinpath("saved.docx"))
+        with StreamingDocxWriter(streamed, tmp_path.joinpath("streamed.docx")) as writer:
+            for index in range(3):
+                _add_content(streamed, index)
+                writer.flush()
+                assert len(streamed.element.body) == 1
+
+        with zipfile.ZipFile(tmp_path.joinpath("saved.docx")) as a, zipfile.ZipFile(tmp_path.joinpath("streamed.docx")) as b:
+            assert sorted(a.namelist()) == sorted(b.namelist())
+            for name in a.namelist():
+                assert a.read(name) == b.read(name)
+
+    def test_failed_rendering_removes_file(self, tmp_path: Path) -> None:
+        """An incomplete docx file is removed when the rendering fails, a previous file at the path is kept"""
+        path = tmp_path.joinpath("streamed.docx")
+        with pytest.raises(RuntimeError):
+            with StreamingDocxWriter(Document(), path):
+                raise RuntimeError("rendering failed")
+        assert list(tmp_path.iterdir()) == []
+
+        path.write_bytes(b"previous report")
+        with pytest.raises(RuntimeError):
+            with StreamingDocxWriter(Document(), path) as writer:
+                writer.flush()
+                raise RuntimeError("rendering failed")
+        assert list(tmp_path.iterdir()) == [path] and path.read_bytes() == b"previous report"
+
+    def test_media_released_after_flush(self, tmp_path: Path) -> None:
+        """The distinct images are written at the flush of their section and not kept in the document"""
+        image_paths = []
+        for index in range(20):
+            # bytes after the end of the png make every image distinct
+            image_paths.append(tmp_path.joinpath(f"image_{index}.png"))
+            image_paths[-1].write_bytes(_IMAGE.read_bytes() + index.to_bytes(4, "big"))
+        saved, streamed = Document(), Document()
+        saved_registry = ImageRegistry(saved.part.package, ImageBytesCache(0))
+        streamed_registry = ImageRegistry(streamed.part.package, ImageBytesCache(0))
+        for shape_id, image_path in enumerate(image_paths + image_paths[:2], start=1):
+            _add_picture(saved, saved_registry, image_path, shape_id)
+        saved.save(tmp_path.joinpath("saved.docx"))
+        with StreamingDocxWriter(streamed, tmp_path.joinpath("streamed.docx")) as writer:
+            for shape_id, image_path in enumerate(image_paths + image_paths[:2], start=1):
+                _add_picture(streamed, streamed_registry, image_path, shape_id)
+                writer.flush()
+                assert sum(len(part.blob) for part in streamed.part.package.image_parts) == 0
+
+        assert len(streamed.part.package.image_parts) == 20
+        with zipfile.ZipFile(tmp_path.joinpath("saved.docx")) as a, zipfile.ZipFile(tmp_path.joinpath("streamed.docx")) as b:
+            assert sorted(a.namelist()) == sorted(b.namelist())
+            for name in a.namelist():
+                assert a.read(name) == b.read(name)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""A test module for the bulk table writer"""
+from docx import Document
+from docx.enum.text import WD_LINE_SPACING, WD_PARAGRAPH_ALIGNMENT
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Inches
+from lxml import etree
+
+from report_generator.common.element_interface import Table, TableTextFormat
+from report_generator.common.render_context import RenderContext
+
+
+def _render_with_cell_api(document, data: list) -> None:
+    """The table rendering through the python-docx cell api, as reference for the bulk table writer"""
+    text_format = TableTextFormat()
+    table = document.add_table(rows=len(data), cols=len(data[0]))
+    for cell in table.columns[0].cells:
+        cell.width = Inches(8.0)
+    for i, row_data in enumerate(data):
+        row = table.rows[i]
+        for j, cell_data in enumerate(row_data):
+            cell = row.cells[j]
+            tcPr = cell._element.get_or_add_tcPr()
+            for line in ['top', 'start', 'bottom', 'end']:
+                tcBorders = tcPr.find(qn('w:tcBorders'))
+                if tcBorders is None:
+                    tcBorders = OxmlElement('w:tcBorders')
+                    tcPr.append(tcBorders)
+                line_border = OxmlElement(f'w:{line}')
+                line_border.set(qn('w:val'), 'single')
+                line_border.set(qn('w:sz'), '4')
+                line_border.set(qn('w:space'), '0')
+                line_border.set(qn('w:color'), '000000')
+                tcBorders.append(line_border)
+            cell.text = ""
+            paragraph = cell.paragraphs[0]
+            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
+            paragraph.paragraph_format.line_spacing = text_format.line_spacing
+            text_format.apply_format(paragraph.add_run(str(cell_data)))
+            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT if j == 0 else WD_PARAGRAPH_ALIGNMENT.RIGHT
+
+
+def _table_xml(data: list, bulk: bool) -> bytes:
+    """Render the data as the only table of a new document and return its xml"""
+    document = Document()
+    if bulk:
+        Table(data=data).render(document, RenderContext(document))
+    else:
+        _render_with_cell_api(document, data)
+    return etree.tostring(document.tables[0]._tbl)
+
+
+class TestBulkTableWriter:
+    def test_condition_table_identical_to_cell_api(self) -> None:
+        """The bulk written condition table equals the table written through the cell api"""
+        data = [["Expected Result", "Result"]]
+        data += [[f"SG_TTC > {i}, all", "Passed" if i % 2 else "Failed"] for i in range(50)]
+        assert _table_xml(data, bulk=True) == _table_xml(data, bulk=False)
+
+    def test_special_texts_identical_to_cell_api(self) -> None:
+        """Numbers, surrounding whitespace, tabs, line breaks and empty texts are written like python-docx"""
+        data = [[" leading", "trailing "], ["tab\tseparated", "line\nbreak"], [1.5, ""], [None, 3]]
+        assert _table_xml(data, bulk=True) == _table_xml(data, bulk=False)
+
+    def test_short_rows_keep_plain_cells(self) -> None:
+        """Cells missing in a short row are left as plain cells like python-docx"""
+        data = [["a", "b", "c"], ["d"]]
+        assert _table_xml(data, bulk=True) == _table_xml(data, bulk=False)
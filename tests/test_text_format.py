@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""A test module for the shared text formats"""
+from docx.oxml import OxmlElement
+from docx.shared import Pt
+from docx.text.run import Run
+
+from report_generator.common.element_interface import NormalTextFormat, TitleTextFormat
+
+
+class TestTextFormat:
+    def test_shared_format_built_once(self) -> None:
+        """The shared format is built once per format class and arguments"""
+        assert NormalTextFormat.shared() is NormalTextFormat.shared()
+        assert TitleTextFormat.shared(level=1) is TitleTextFormat.shared(level=1)
+        assert TitleTextFormat.shared(level=1) is not TitleTextFormat.shared(level=2)
+
+    def test_precomputed_run_properties_equal_property_setters(self) -> None:
+        """Copying the precomputed run properties gives the same xml as setting the font properties one by one"""
+        text_format = NormalTextFormat.shared()
+        copied, reference = Run(OxmlElement('w:r'), None), Run(OxmlElement('w:r'), None)
+        text_format.apply_format(copied)
+        text_format.apply_format(copied)
+        reference.font.name = text_format.font_name
+        reference.font.size = Pt(text_format.font_size)
+        reference.font.color.rgb = text_format.color
+        reference.bold = text_format.bold
+        reference.italic = text_format.italic
+        assert copied._r.xml == reference._r.xml